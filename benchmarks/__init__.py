@@ -0,0 +1,4 @@
+"""
+Jephthah Benchmarks
+Standalone performance checks, run with: python -m benchmarks.<name>
+"""
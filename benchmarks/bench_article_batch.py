@@ -0,0 +1,64 @@
+"""
+Benchmark: one generate_article call per article vs generate_articles batches
+
+    python -m benchmarks.bench_article_batch --topics 200 --per-topic 5
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import brain.content_engine as engine_module
+from brain.content_engine import ContentEngine
+from brain.knowledge_graph import KnowledgeGraph
+from brain.pattern_memory import PatternMemory
+from brain.storage import QueryCounter
+
+
+def build_graph(kg: KnowledgeGraph, topics: int):
+    for i in range(topics):
+        kg.add_entity(f"topic {i}", "technology", description=f"Topic {i} is a field of study")
+    for i in range(topics):
+        for j in (1, 2, 3, 7):
+            kg.add_relationship(f"topic {i}", f"topic {(i + j) % topics}", "related_to", 0.5 + j / 20)
+        kg.add_fact(f"topic {i}", "used_for", f"building system {i}")
+        kg.add_fact(f"topic {i}", "is_a", f"discipline number {i}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--per-topic", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kg = KnowledgeGraph(Path(tmp) / "kg.db")
+        pm = PatternMemory(Path(tmp) / "patterns.db")
+        build_graph(kg, args.topics)
+        engine_module.knowledge_graph = kg
+        engine_module.pattern_memory = pm
+        ce = ContentEngine()
+
+        topics = [f"topic {i}" for i in range(args.topics)]
+        total = args.topics * args.per_topic
+
+        with QueryCounter(kg.engine, pm.engine) as queries:
+            start = time.perf_counter()
+            for topic in topics:
+                for _ in range(args.per_topic):
+                    ce.generate_article(topic)
+            loop = total / (time.perf_counter() - start)
+        print(f"generate_article loop:      {loop:8,.0f} articles/s, "
+              f"{queries.count / total:.3f} queries/article ({queries.count} total)")
+
+        pm.selector.drop_pools(pm.selector.pools())
+        ce.generate_articles(topics, n=args.per_topic)
+        batch = ce.last_batch
+        print(f"generate_articles:          {batch['articles_per_sec']:8,.0f} articles/s, "
+              f"{batch['queries_per_article']:.3f} queries/article ({batch['queries']} total)")
+        pm.close()
+
+
+if __name__ == "__main__":
+    main()
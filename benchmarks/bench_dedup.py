@@ -0,0 +1,68 @@
+"""
+Benchmark: near-duplicate checks for sentence patterns (MinHash/LSH)
+
+    python -m benchmarks.bench_dedup --patterns 50000
+
+Builds an index over synthetic generalized sentences (a fraction of them
+lightly edited copies), then reports the per-insert check latency and how
+many near-duplicates the one-off merge pass finds.
+"""
+
+import argparse
+import random
+import time
+
+from brain.dedup import MinHashLSH
+
+WORDS = ("teams developers deploy scale data cloud tests release users product build "
+         "faster cost review api model latency design code ship learn market growth").split()
+SLOTS = ("{TOPIC}", "{NUMBER}", "{TECHNOLOGY}")
+
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+    for _ in range(rng.randint(1, 2)):
+        words.insert(rng.randrange(len(words)), rng.choice(SLOTS))
+    return " ".join(words).capitalize() + "."
+
+
+def edit(text: str, rng: random.Random) -> str:
+    words = text.rstrip(".").split()
+    words.insert(rng.randrange(len(words)), rng.choice(WORDS))
+    return " ".join(words) + "."
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patterns", type=int, default=50000)
+    parser.add_argument("--dup-ratio", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    texts = []
+    for _ in range(args.patterns):
+        if texts and rng.random() < args.dup_ratio:
+            texts.append(edit(rng.choice(texts), rng))
+        else:
+            texts.append(sentence(rng))
+
+    index = MinHashLSH(threshold=args.threshold)
+    start = time.perf_counter()
+    duplicates = sum(1 for i, text in enumerate(texts) if index.add_unique(i, text) is not None)
+    elapsed = time.perf_counter() - start
+
+    print(f"patterns:          {args.patterns:,} ({args.dup_ratio:.0%} edited copies)")
+    print(f"indexed (unique):  {len(index):,}")
+    print(f"near-duplicates:   {duplicates:,}")
+    print(f"check + insert:    {elapsed / len(texts) * 1e6:.1f} us per pattern")
+
+    probes = [sentence(rng) for _ in range(2000)]
+    start = time.perf_counter()
+    for text in probes:
+        index.query(text)
+    print(f"check at {len(index):,}:    {(time.perf_counter() - start) / len(probes) * 1e6:.1f} us per lookup")
+
+
+if __name__ == "__main__":
+    main()
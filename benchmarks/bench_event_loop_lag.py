@@ -0,0 +1,88 @@
+"""
+Event loop lag benchmark
+How long the loop stalls while workers hammer memory, sync vs async API
+
+    python -m benchmarks.bench_event_loop_lag [--workers 20] [--ops 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from brain.memory import JephthahMemory, MemoryType
+from brain.async_memory import AsyncJephthahMemory
+
+
+TICK = 0.005  # probe interval in seconds
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    """Sleep TICK repeatedly and record how late each wakeup is"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, loop.time() - start - TICK))
+
+
+async def sync_worker(mem: JephthahMemory, seed: int, ops: int):
+    rng = random.Random(seed)
+    for i in range(ops):
+        key = f"key_{rng.randrange(100)}"
+        if rng.random() < 0.5:
+            mem.remember(key, {"i": i, "pad": "x" * 500}, MemoryType.KNOWLEDGE)
+        else:
+            mem.log_action("bench", "lag probe", key, "success")
+        await asyncio.sleep(0)
+
+
+async def async_worker(mem: AsyncJephthahMemory, seed: int, ops: int):
+    rng = random.Random(seed)
+    for i in range(ops):
+        key = f"key_{rng.randrange(100)}"
+        if rng.random() < 0.5:
+            await mem.remember(key, {"i": i, "pad": "x" * 500}, MemoryType.KNOWLEDGE)
+        else:
+            await mem.log_action("bench", "lag probe", key, "success")
+
+
+async def measure(label: str, workers):
+    lags = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(f"  {label:6} loop lag mean {statistics.mean(lags_ms):7.2f} ms  "
+          f"p99 {p99:7.2f} ms  max {lags_ms[-1]:7.2f} ms  ({elapsed:.1f}s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = JephthahMemory(db_path=Path(tmp) / "lag.db")
+        amem = AsyncJephthahMemory(mem)
+
+        print(f"workers={args.workers} ops/worker={args.ops}")
+        await measure("sync", [sync_worker(mem, n, args.ops) for n in range(args.workers)])
+        await measure("async", [async_worker(amem, n, args.ops) for n in range(args.workers)])
+
+        await amem.close()
+        mem.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
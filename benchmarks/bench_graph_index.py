@@ -0,0 +1,60 @@
+"""
+Graph index benchmark
+Build time and neighbor / multi-hop query latency of AdjacencyIndex
+
+    python -m benchmarks.bench_graph_index [--nodes 200000] [--edges 1000000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from brain.graph_index import AdjacencyIndex
+
+
+def timed_us(fn, samples):
+    timings = []
+    for arg in samples:
+        start = time.perf_counter()
+        fn(arg)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.mean(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rel_types = ["is_a", "part_of", "related_to", "used_for"]
+    edges = [
+        (rng.randrange(1, args.nodes), rng.randrange(1, args.nodes), rng.choice(rel_types), rng.random())
+        for _ in range(args.edges)
+    ]
+
+    index = AdjacencyIndex()
+    start = time.perf_counter()
+    index.build(edges)
+    print(f"build: {args.edges} edges / {args.nodes} nodes in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        index.add_edge(rng.randrange(1, args.nodes), rng.randrange(1, args.nodes), "related_to", 0.5)
+    print(f"add_edge: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us/edge (incl. rebuilds)")
+
+    samples = [rng.randrange(1, args.nodes) for _ in range(args.queries)]
+    mean, p99 = timed_us(lambda n: index.neighbors(n, limit=10), samples)
+    print(f"neighbors(limit=10):      mean {mean:8.1f} us  p99 {p99:8.1f} us")
+    mean, p99 = timed_us(lambda n: index.neighbors(n, rel_type="is_a", limit=10), samples)
+    print(f"neighbors(rel_type=is_a): mean {mean:8.1f} us  p99 {p99:8.1f} us")
+    mean, p99 = timed_us(lambda n: index.neighborhood(n, depth=2, limit=20), samples)
+    print(f"neighborhood(depth=2):    mean {mean:8.1f} us  p99 {p99:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: job store recovery time and claim throughput, with processes contending
+
+    python -m benchmarks.bench_jobstore --jobs 20000 --workers 4
+
+Every worker process tries to claim every job; each job must be won exactly once.
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+
+from brain.jobstore import JobStore
+
+
+def claim_all(db_path: Path, owner: str, keys: list) -> list:
+    logger.disable("brain.jobstore")
+    store = JobStore(db_path, owner=owner)
+    won = [key for key in keys if store.claim(key)]
+    for key in won:
+        store.complete(key)
+    return won
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    logger.disable("brain.jobstore")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "jobs.db"
+        store = JobStore(db)
+        now = time.time()
+        keys = [f"job-{i}" for i in range(args.jobs)]
+        start = time.perf_counter()
+        for i, key in enumerate(keys):
+            store.add(key, "planner", key, now - 1, payload={"i": i})
+        add_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pending = JobStore(db).recover("planner")
+        recover_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(claim_all, [db] * args.workers,
+                                    [f"worker:{w}" for w in range(args.workers)],
+                                    [keys] * args.workers))
+        claim_time = time.perf_counter() - start
+        won = [key for result in results for key in result]
+
+        print(f"add:           {add_time / args.jobs * 1e6:8.1f} us/job")
+        print(f"recover:       {recover_time * 1000:8.1f} ms for {len(pending):,} pending jobs")
+        print(f"claims:        {args.jobs * args.workers / claim_time:8,.0f} attempts/s "
+              f"across {args.workers} processes")
+        print(f"won:           {len(won):,} total, {len(set(won)):,} distinct "
+              f"({'no' if len(won) == len(set(won)) == args.jobs else 'DOUBLE'} double runs)")
+        print(f"per worker:    {[len(result) for result in results]}")
+
+
+if __name__ == "__main__":
+    main()
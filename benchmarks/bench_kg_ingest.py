@@ -0,0 +1,60 @@
+"""
+Knowledge graph ingestion benchmark
+Documents/sec for per-document learn_from_text vs batched learn_from_texts
+
+    python -m benchmarks.bench_kg_ingest [--docs 500]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from brain.knowledge_graph import KnowledgeGraph
+
+
+WORDS = ["python", "data", "cloud", "model", "server", "network", "api", "system",
+         "pipeline", "database", "framework", "service", "platform", "engine"]
+NAMES = ["Python", "Django", "React", "Docker", "Kubernetes", "Postgres", "Redis",
+         "Linux", "Rust", "Flask", "Kafka", "Spark", "Terraform", "Ansible", "Nginx"]
+
+
+def make_doc(rng: random.Random, sentences: int = 60) -> str:
+    out = []
+    for _ in range(sentences):
+        a, b = rng.sample(NAMES, 2)
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(f"{a} is a {rng.choice(WORDS)} used with {b} in production")
+        elif kind < 0.7:
+            out.append(f"{a} is used for {rng.choice(WORDS)} and pairs with {b}")
+        else:
+            out.append(f"Teams combine {a} and {b} to ship {rng.choice(WORDS)} faster")
+    return ". ".join(out) + "."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    docs = [make_doc(rng) for _ in range(args.docs)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ("per-document", lambda kg: [kg.learn_from_text(d) for d in docs]),
+            ("batched", lambda kg: kg.learn_from_texts(docs)),
+        ]
+        for i, (label, run) in enumerate(runs):
+            kg = KnowledgeGraph(db_path=Path(tmp) / f"kg_{i}.db")
+            start = time.perf_counter()
+            run(kg)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:22} {args.docs / elapsed:8.1f} docs/sec  ({elapsed:.2f}s)")
+            kg.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
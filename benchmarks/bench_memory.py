@@ -0,0 +1,90 @@
+"""
+Memory storage benchmark
+Mixed read/write ops/sec for JephthahMemory, bare engine vs tuned engine
+
+    python -m benchmarks.bench_memory [--threads 8] [--ops 2000] [--reads 0.7] [--write-behind]
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from brain.memory import JephthahMemory, MemoryType
+
+
+def run_workload(mem: JephthahMemory, threads: int, ops: int, read_ratio: float) -> float:
+    """Run a mixed workload across threads, return ops/sec"""
+    keys = [f"key_{i}" for i in range(200)]
+    for key in keys[:50]:
+        mem.remember(key, {"seed": key}, MemoryType.KNOWLEDGE)
+
+    errors = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        try:
+            for i in range(ops):
+                roll = rng.random()
+                if roll < read_ratio:
+                    mem.recall(rng.choice(keys), MemoryType.KNOWLEDGE)
+                elif roll < read_ratio + (1 - read_ratio) / 2:
+                    mem.remember(rng.choice(keys), {"i": i, "pad": "x" * 200}, MemoryType.KNOWLEDGE)
+                else:
+                    mem.log_action("bench", "benchmark op", "bench", "success", {"i": i})
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        print(f"  {len(errors)} worker errors, first: {errors[0]}")
+    return (threads * ops) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--reads", type=float, default=0.7)
+    parser.add_argument("--write-behind", action="store_true",
+                        help="also run the tuned engine with batched writes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = Path(tmp) / "before.db"
+        before = JephthahMemory(db_path=before_path,
+                                engine=create_engine(f"sqlite:///{before_path}"))
+        after = JephthahMemory(db_path=Path(tmp) / "after.db")
+
+        print(f"threads={args.threads} ops/thread={args.ops} read_ratio={args.reads}")
+        before_ops = run_workload(before, args.threads, args.ops, args.reads)
+        print(f"  before (bare engine):   {before_ops:10.0f} ops/sec")
+        after_ops = run_workload(after, args.threads, args.ops, args.reads)
+        print(f"  after  (pooled + WAL):  {after_ops:10.0f} ops/sec")
+        print(f"  speedup: {after_ops / before_ops:.2f}x")
+
+        if args.write_behind:
+            batched = JephthahMemory(db_path=Path(tmp) / "batched.db")
+            batched.enable_write_behind()
+            batched_ops = run_workload(batched, args.threads, args.ops, args.reads)
+            batched.close()
+            print(f"  after  (+ write-behind): {batched_ops:9.0f} ops/sec")
+            batched.engine.dispose()
+
+        before.engine.dispose()
+        after.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: PageRank over the CSR adjacency, cold vs warm-started
+
+    python -m benchmarks.bench_pagerank --nodes 200000 --edges 1000000
+"""
+
+import argparse
+import random
+import time
+
+from brain.centrality import pagerank
+from brain.graph_index import AdjacencyIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=200000)
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--new-edges", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    index = AdjacencyIndex()
+    # Preferential-ish attachment: low ids are hubs, like popular topics
+    index.build(
+        (int(rng.paretovariate(1.2)) % args.nodes, rng.randrange(args.nodes), "related_to", rng.random())
+        for _ in range(args.edges)
+    )
+    nodes = range(args.nodes)
+
+    start = time.perf_counter()
+    scores, iterations = pagerank(index, nodes)
+    print(f"cold:  {time.perf_counter() - start:.2f}s, {iterations} iterations")
+
+    for _ in range(args.new_edges):
+        index.add_edge(rng.randrange(args.nodes), rng.randrange(args.nodes), "related_to", 0.5)
+
+    start = time.perf_counter()
+    _, iterations = pagerank(index, nodes, start=scores)
+    print(f"warm after {args.new_edges} new edges: {time.perf_counter() - start:.2f}s, {iterations} iterations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: sentence pattern selection, per-call SQL vs the in-memory bandit
+
+    python -m benchmarks.bench_pattern_selection --patterns 5000 --calls 20000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from brain.pattern_memory import PatternMemory, SentencePattern
+
+
+def sql_select(pm: PatternMemory, pattern_type: str) -> str:
+    """The previous get_random_pattern: top-20 query, weighted choice, usage UPDATE"""
+    patterns = pm.get_patterns(pattern_type=pattern_type, category="general", limit=20)
+    selected = random.choices(patterns, weights=[p.success_score for p in patterns], k=1)[0]
+    session = pm.Session()
+    try:
+        session.query(SentencePattern).filter_by(id=selected.id).first().usage_count += 1
+        session.commit()
+    finally:
+        session.close()
+    return selected.pattern
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patterns", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    types = ["intro", "body", "conclusion", "cta"]
+    with tempfile.TemporaryDirectory() as tmp:
+        pm = PatternMemory(Path(tmp) / "patterns.db")
+        for i in range(args.patterns):
+            pm.add_sentence_pattern(f"Pattern {i} about {{TOPIC}}", types[i % 4])
+
+        sql_calls = max(1, args.calls // 20)
+        start = time.perf_counter()
+        for i in range(sql_calls):
+            sql_select(pm, types[i % 4])
+        old = sql_calls / (time.perf_counter() - start)
+
+        # True success rate grows with the id, so the bandit has something to find
+        start = time.perf_counter()
+        for i in range(args.calls):
+            pattern_id, _ = pm.select_pattern(types[i % 4], category="general")
+            pm.update_pattern_success(pattern_id, random.random() < (pattern_id % 100) / 100)
+        new = args.calls / (time.perf_counter() - start)
+
+        flushed = pm.flush()
+        pm.close()
+        print(f"SQL per call:     {old:,.0f} selections/s")
+        print(f"Thompson bandit:  {new:,.0f} selections/s ({new / old:.0f}x), {flushed} arms flushed")
+
+
+if __name__ == "__main__":
+    main()
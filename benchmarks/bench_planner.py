@@ -0,0 +1,106 @@
+"""
+Benchmark: planner task ordering under a synthetic daily load, simulated time
+
+    python -m benchmarks.bench_planner --tasks 2000 --load 1.0
+
+One worker serves a day of arrivals (busier 9:00-17:00) with a mix of
+priorities, some with deadlines. Compares the previous priority-only order
+with the virtual-deadline order on deadline misses and how long each
+priority waits; tasks still queued at the end of the day are starved.
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+from brain.planner import Task, TaskPriority
+
+MIX = [(TaskPriority.CRITICAL, 0.05), (TaskPriority.HIGH, 0.25), (TaskPriority.MEDIUM, 0.35),
+       (TaskPriority.LOW, 0.25), (TaskPriority.IDLE, 0.10)]
+DAY = timedelta(hours=24)
+
+
+class LegacyTask(Task):
+    """The previous ordering: priority only"""
+
+    def __lt__(self, other):
+        return self.priority.value < other.priority.value
+
+
+def arrivals(count: int, seed: int):
+    """(arrival offset seconds, priority, deadline offset or None), busier during work hours"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < count:
+        t = rng.uniform(0, DAY.total_seconds())
+        if not 9 * 3600 <= t < 17 * 3600 and rng.random() < 0.5:
+            continue  # half the rate outside work hours
+        priority = rng.choices([p for p, _ in MIX], [w for _, w in MIX])[0]
+        deadline = t + rng.uniform(20 * 60, 4 * 3600) if rng.random() < 0.3 else None
+        out.append((t, priority, deadline))
+    return sorted(out, key=lambda a: a[0])
+
+
+def simulate(task_cls, load, service_mean: float, seed: int):
+    rng = random.Random(seed + 1)
+    start = datetime(2024, 1, 1)
+    queue, finished, pending = [], [], list(load)
+    now = 0.0
+    while pending or queue:
+        # Admit everything that arrived by now
+        while pending and pending[0][0] <= now:
+            t, priority, deadline = pending.pop(0)
+            task = task_cls(f"t{len(finished) + len(queue)}", "sim", "run", priority=priority,
+                            deadline=start + timedelta(seconds=deadline) if deadline else None)
+            task.created_at = start + timedelta(seconds=t)
+            task.refresh_order()
+            heapq.heappush(queue, task)
+        if not queue:
+            now = pending[0][0]
+            continue
+        if now >= DAY.total_seconds():
+            break
+        task = heapq.heappop(queue)
+        waited = now - (task.created_at - start).total_seconds()
+        now += rng.expovariate(1 / service_mean)
+        finished.append((task, waited, start + timedelta(seconds=now)))
+    return finished, queue
+
+
+def report(label, finished, starved):
+    with_deadline = [(t, done) for t, _, done in finished if t.deadline] + \
+                    [(t, None) for t in starved if t.deadline]
+    missed = sum(1 for t, done in with_deadline if done is None or done > t.deadline)
+    print(f"{label:<8} ran {len(finished):5,}  starved {len(starved):5,}  "
+          f"deadline misses {missed / max(1, len(with_deadline)):6.1%} of {len(with_deadline):,}")
+    for priority, _ in MIX:
+        waits = sorted(w / 60 for t, w, _ in finished if t.priority is priority)
+        left = sum(1 for t in starved if t.priority is priority)
+        if waits:
+            print(f"    {priority.name:<8} wait p50 {statistics.median(waits):7.1f} min  "
+                  f"p99 {waits[int(0.99 * (len(waits) - 1))]:7.1f} min  max {waits[-1]:7.1f} min  "
+                  f"starved {left:4,}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--load", type=float, default=1.0, help="offered load (1.0 = worker always busy)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    logger.disable("brain")
+
+    service_mean = args.load * DAY.total_seconds() / args.tasks
+    load = arrivals(args.tasks, args.seed)
+    print(f"{args.tasks:,} tasks/day, mean service {service_mean:.0f}s, offered load {args.load:.2f}")
+    for label, task_cls in (("priority", LegacyTask), ("edf", Task)):
+        finished, starved = simulate(task_cls, load, service_mean, args.seed)
+        report(label, finished, starved)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: get_random_knowledge, ORDER BY random() vs the alias-table sampler
+
+    python -m benchmarks.bench_random_knowledge --entities 200000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import func
+
+from brain.knowledge_graph import KnowledgeGraph, Entity
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=200000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kg = KnowledgeGraph(Path(tmp) / "kg.db")
+        types = ["concept", "technology", "topic", "company"]
+        with kg.engine.begin() as conn:
+            conn.execute(Entity.__table__.insert(), [
+                {"name": f"entity-{i}", "entity_type": types[i % len(types)], "description": "",
+                 "properties": {}, "importance": (i % 10) / 10, "access_count": i % 7,
+                 "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+                for i in range(args.entities)
+            ])
+        start = time.perf_counter()
+        kg._load_sampler()
+        print(f"sampler build: {time.perf_counter() - start:.2f}s for {args.entities} entities")
+
+        session = kg.Session()
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            session.query(Entity).filter_by(entity_type="technology").order_by(func.random()).limit(5).all()
+        old = (time.perf_counter() - start) / args.calls
+        session.close()
+
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            kg.get_random_knowledge("technology", limit=5)
+        new = (time.perf_counter() - start) / args.calls
+
+        print(f"ORDER BY random(): {old * 1000:.2f} ms/call")
+        print(f"alias sampler:     {new * 1000:.2f} ms/call ({old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
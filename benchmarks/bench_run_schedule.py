@@ -0,0 +1,94 @@
+"""
+Benchmark: planner daily workload, one task at a time vs parallel run_schedule
+
+    python -m benchmarks.bench_run_schedule --scale 0.002
+
+Handlers sleep for a scaled version of each task type's real duration
+(browser work about a minute, I/O-only work a few seconds) and fail their
+first attempt at --fail-rate. Browser types share --browser-slots slots.
+"""
+
+import argparse
+import asyncio
+import heapq
+import random
+import time
+
+from loguru import logger
+
+from brain.planner import TaskScheduler, Task, TaskPriority
+
+# task type -> (tasks per day, seconds per task)
+WORKLOAD = {
+    "freelance": (50, 60),
+    "social": (10, 45),
+    "content": (1, 600),
+    "learning": (2, 900),
+    "email": (60, 5),
+    "communication": (40, 3),
+}
+
+
+def build(scheduler: TaskScheduler, scale: float, fail_rate: float, seed: int):
+    rng = random.Random(seed)
+    flaky = set()
+
+    async def handler(task):
+        await asyncio.sleep(WORKLOAD[task.task_type][1] * scale)
+        if task.name in flaky and task.attempts == 1:
+            raise RuntimeError("transient failure")
+        return True
+
+    for task_type in WORKLOAD:
+        scheduler.register_handler(task_type, handler)
+    for task_type, (count, _) in WORKLOAD.items():
+        for i in range(count):
+            name = f"{task_type}_{i}"
+            if rng.random() < fail_rate:
+                flaky.add(name)
+            scheduler.add_task(Task(name, task_type, "run", priority=rng.choice(list(TaskPriority))))
+
+
+async def sequential(scheduler: TaskScheduler, gap: float):
+    """The previous loop: pop, await, pause, with failures re-queued at once"""
+    while True:
+        if scheduler.delayed:
+            scheduler._enqueue(heapq.heappop(scheduler.delayed)[2])
+            continue
+        task = scheduler.get_next_task()
+        if task is None:
+            return
+        await scheduler.execute_task(task)
+        await asyncio.sleep(gap)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=0.002, help="real seconds per simulated second")
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=4)
+    parser.add_argument("--browser-slots", type=int, default=1, help="browser pool size (parallel only)")
+    args = parser.parse_args()
+    logger.disable("brain")
+
+    total = sum(count for count, _ in WORKLOAD.values())
+    for label in ("sequential", "parallel"):
+        scheduler = TaskScheduler(pools={"browser": args.browser_slots, "io": 8},
+                                  retry_base_seconds=30 * args.scale, retry_max_seconds=600 * args.scale)
+        scheduler.pool_gaps = {"browser": 5 * args.scale}
+        build(scheduler, args.scale, args.fail_rate, args.seed)
+        start = time.perf_counter()
+        if label == "sequential":
+            asyncio.run(sequential(scheduler, 5 * args.scale))
+        else:
+            asyncio.run(scheduler.run_schedule(stop_when_idle=True))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {total} tasks in {elapsed / args.scale / 3600:5.2f} simulated hours "
+              f"({elapsed:.2f}s), completed {scheduler.completed_today}")
+        for task_type, stats in scheduler.get_throughput().items():
+            print(f"    {task_type:<14} {stats['completed']:3} done  {stats['retried']:2} retried  "
+                  f"{stats['per_hour'] * args.scale:8.1f} per simulated hour")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: scheduling latency and jitter, sorted list + 1s polling vs heap + call_at
+
+    python -m benchmarks.bench_scheduler --jobs 5000 --recurring 500 --seconds 5
+    python -m benchmarks.bench_scheduler --slow 0.5   # head-of-line blocking
+
+Every job records how late it started relative to its scheduled time.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+from brain.scheduler import Scheduler
+
+
+class LegacyScheduler:
+    """The previous implementation: re-sort on add, linear scan, one job per poll"""
+
+    def __init__(self):
+        self.tasks = []
+        self.recurring = []
+
+    def add(self, name, func, delay_seconds=0):
+        run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+        self.tasks.append({"name": name, "func": func, "run_at": run_at})
+        self.tasks.sort(key=lambda x: x["run_at"])
+
+    def add_recurring(self, name, func, interval_minutes):
+        self.recurring.append({"name": name, "func": func,
+                               "interval": timedelta(minutes=interval_minutes), "last_run": None})
+
+    async def run_next(self):
+        now = datetime.utcnow()
+        for task in self.tasks:
+            if task["run_at"] <= now:
+                await task["func"]()
+                self.tasks.remove(task)
+                return True
+        for rec in self.recurring:
+            if rec["last_run"] is None or (now - rec["last_run"]) >= rec["interval"]:
+                await rec["func"]()
+                rec["last_run"] = now
+                return True
+        return False
+
+    async def run_forever(self):
+        while True:
+            if not await self.run_next():
+                await asyncio.sleep(1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def measure(scheduler, jobs: int, recurring: int, seconds: float, interval: float,
+                  slow: float):
+    rng = random.Random(5)
+    lateness = []
+
+    def make(due):
+        async def job():
+            lateness.append(time.monotonic() - due[0])
+            due[0] += interval  # next expected run, for recurring jobs
+        return job
+
+    start = time.perf_counter()
+    for i in range(jobs):
+        delay = rng.uniform(0, seconds * 0.8)
+        scheduler.add(f"job-{i}", make([time.monotonic() + delay]), delay_seconds=delay)
+    for i in range(recurring):
+        scheduler.add_recurring(f"every-{i}", make([time.monotonic()]), interval_minutes=interval / 60)
+    if slow:
+        async def slow_job():  # e.g. a browser session; not measured itself
+            await asyncio.sleep(slow)
+        scheduler.add_recurring("slow", slow_job, interval_minutes=interval / 60)
+    add_time = time.perf_counter() - start
+
+    runner = asyncio.create_task(scheduler.run_forever())
+    await asyncio.sleep(seconds)
+    runner.cancel()
+    return add_time, lateness
+
+
+def report(label, add_time, lateness, jobs):
+    ms = [x * 1000 for x in lateness]
+    print(f"{label:<8} add {add_time / jobs * 1e6:7.1f} us/job | ran {len(ms):6,} | "
+          f"lateness p50 {percentile(ms, 0.5):8.2f} ms  p99 {percentile(ms, 0.99):8.2f} ms  "
+          f"max {max(ms, default=0):8.2f} ms | jitter (stdev) {statistics.pstdev(ms) if ms else 0:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--recurring", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="recurring interval, seconds")
+    parser.add_argument("--slow", type=float, default=0.0,
+                        help="add one recurring job that takes this many seconds")
+    args = parser.parse_args()
+    logger.disable("brain.scheduler")  # one log line per job
+
+    for label, scheduler in (("legacy", LegacyScheduler()), ("heap", Scheduler())):
+        add_time, lateness = asyncio.run(
+            measure(scheduler, args.jobs, args.recurring, args.seconds, args.interval, args.slow))
+        report(label, add_time, lateness, args.jobs + args.recurring)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: knowledge graph cold start, database scan vs mapped snapshot
+
+    python -m benchmarks.bench_snapshot --entities 1000000 --edges 1000000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from brain.knowledge_graph import KnowledgeGraph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=1000000)
+    parser.add_argument("--edges", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    types = ["concept", "technology", "topic", "company"]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "kg.db"
+        kg = KnowledgeGraph(db_path)
+        now = datetime.utcnow()
+        with kg.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO entities (id, name, entity_type, description, properties, importance, "
+                "access_count, created_at, updated_at) VALUES (?, ?, ?, '', '{}', ?, 0, ?, ?)",
+                [(i, f"Entity {i}", types[i % 4], rng.random(), now, now) for i in range(1, args.entities + 1)])
+            conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO entity_relationships (source_id, target_id, relationship_type, "
+                "strength, context, created_at) VALUES (?, ?, 'related_to', ?, '', ?)",
+                [(rng.randint(1, args.entities), rng.randint(1, args.entities), rng.random(), now)
+                 for _ in range(args.edges)])
+        kg.engine.dispose()
+
+        start = time.perf_counter()
+        kg = KnowledgeGraph(db_path)
+        print(f"cold start from database: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        path = kg.export_snapshot()
+        print(f"export: {time.perf_counter() - start:.2f}s, {path.stat().st_size / 1e6:.0f} MB")
+        kg.engine.dispose()
+
+        start = time.perf_counter()
+        kg = KnowledgeGraph(db_path, snapshot_path=path)
+        print(f"cold start from snapshot: {time.perf_counter() - start:.2f}s")
+
+        path = kg.export_snapshot()  # the constructor consumed the first one
+        start = time.perf_counter()
+        kg.load_snapshot(path)
+        print(f"  of which load_snapshot: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        kg.get_random_knowledge(limit=5)
+        kg.get_neighborhood("Entity 1")
+        print(f"first queries after load: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: placeholder filling, str.replace chains vs compiled templates
+
+    python -m benchmarks.bench_templates --iterations 100000
+"""
+
+import argparse
+import time
+
+from brain.templates import compile_template
+
+ARTICLE = [
+    "In today's fast-paced {INDUSTRY} landscape, {TOPIC} has become essential.",
+    "The most important thing to understand about {TOPIC} is {KEY_POINT}.",
+    "In conclusion, {TOPIC} offers tremendous value for {AUDIENCE}.",
+]
+ARTICLE_VALUES = {"INDUSTRY": "tech", "TOPIC": "python", "KEY_POINT": "readability",
+                  "AUDIENCE": "developers and businesses", "BENEFIT": "speed", "PROBLEM": "scaling",
+                  "SUMMARY": "it works", "RECOMMENDATION": "start today", "ACTION": "practice"}
+
+PROPOSAL = [
+    "Hi! I read your job description carefully and I'm excited about this opportunity. {JOB_SPECIFIC_HOOK}",
+    "I have {YEARS} years of experience in {SKILLS}. Recently, I {RECENT_PROJECT}.",
+    "For your project, I would start by {FIRST_STEP}, then {SECOND_STEP}. My approach ensures {BENEFIT}.",
+    "I'd love to discuss this further. When would be a good time to chat?",
+]
+PROPOSAL_VALUES = {"JOB_SPECIFIC_HOOK": "the requirements align", "YEARS": "3+", "SKILLS": "Python, Django",
+                   "RECENT_PROJECT": "delivered a web solution", "FIRST_STEP": "analyzing requirements",
+                   "SECOND_STEP": "building", "BENEFIT": "quality"}
+
+EMAIL = [
+    "{BENEFIT} for your {BUSINESS_TYPE}",
+    "Hi {NAME},",
+    "I noticed {OBSERVATION_ABOUT_COMPANY}.",
+    "I help businesses like yours {VALUE_PROPOSITION}.",
+    "Recently, I helped {SIMILAR_CLIENT} achieve {RESULT}.",
+]
+EMAIL_VALUES = {"BENEFIT": "growth", "BUSINESS_TYPE": "company", "NAME": "Ada",
+                "OBSERVATION_ABOUT_COMPANY": "your work", "VALUE_PROPOSITION": "ship faster",
+                "SIMILAR_CLIENT": "a client", "RESULT": "20% growth", "TOPIC": "this",
+                "NEW_VALUE_ADD": "new insights"}
+
+
+def replace_chain(templates, values):
+    """The previous approach: one str.replace per known placeholder per template"""
+    out = []
+    for text in templates:
+        for slot, value in values.items():
+            text = text.replace("{" + slot + "}", value)
+        out.append(text)
+    return "\n\n".join(out)
+
+
+def compiled(templates, values):
+    return "\n\n".join(template.render(values) for template in templates)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, templates, values in (("article", ARTICLE, ARTICLE_VALUES),
+                                    ("proposal", PROPOSAL, PROPOSAL_VALUES),
+                                    ("email", EMAIL, EMAIL_VALUES)):
+        compiled_templates = [compile_template(text) for text in templates]
+        assert replace_chain(templates, values) == compiled(compiled_templates, values)
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            replace_chain(templates, values)
+        old = (time.perf_counter() - start) / args.iterations
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            compiled(compiled_templates, values)
+        new = (time.perf_counter() - start) / args.iterations
+
+        print(f"{name:9s} replace: {old * 1e6:6.2f}us  compiled: {new * 1e6:6.2f}us  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
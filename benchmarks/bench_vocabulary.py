@@ -0,0 +1,66 @@
+"""
+Benchmark: Vocabulary startup (database vs mapped snapshot), sampling and autocomplete
+
+    python -m benchmarks.bench_vocabulary --words 200000
+"""
+
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from brain.vocabulary import Vocabulary
+
+
+def timed(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    letters = string.ascii_lowercase[:16]
+    categories = ["general", "tech", "business"]
+    counts = {
+        ("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))), rng.choice(categories)):
+            rng.randint(1, 50)
+        for _ in range(args.words)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "vocabulary.db"
+        vocab = Vocabulary(db)
+        vocab._add_counts(counts)
+        vocab.close()
+
+        start = time.perf_counter()
+        mapped = Vocabulary(db)
+        mapped_start = time.perf_counter() - start
+
+        mapped.snapshot_path.unlink()
+        start = time.perf_counter()
+        Vocabulary(db)
+        db_start = time.perf_counter() - start
+
+        # The previous get_words: list() of the category's set on every call
+        word_set = set(mapped.words["general"].export()[0])
+        old_sample = lambda: random.sample(list(word_set), 5)
+        print(f"words:               {mapped.get_stats()['total_words']:,}")
+        print(f"startup from db:     {db_start * 1000:8.1f} ms")
+        print(f"startup mapped:      {mapped_start * 1000:8.1f} ms")
+        print(f"get_words (set):     {timed(old_sample, 200):8.1f} us")
+        print(f"get_words:           {timed(lambda: mapped.get_words('general', 5), 20000):8.1f} us")
+        print(f"complete('abc'):     {timed(lambda: mapped.complete('abc'), 5000):8.1f} us")
+        print(f"lookup:              {timed(lambda: mapped.lookup('abcdef'), 20000):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
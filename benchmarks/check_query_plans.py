@@ -0,0 +1,30 @@
+"""
+Query plan regression check
+Fails (exit code 1) if any JephthahMemory hot query falls back to a full table scan
+
+    python -m benchmarks.check_query_plans
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from brain.memory import JephthahMemory, MEMORY_MIGRATIONS
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = JephthahMemory(db_path=Path(tmp) / "plans.db")
+        assert mem.schema_version == MEMORY_MIGRATIONS[-1][0]
+
+        offenders = mem.check_query_plans()
+        for name in mem.hot_queries():
+            print(f"  {name:26} {'FULL SCAN' if name in offenders else 'ok'}")
+        mem.engine.dispose()
+
+    print("query plans OK" if not offenders else f"{len(offenders)} hot queries scan a full table")
+    return 1 if offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 from brain.memory import memory, JephthahMemory, MemoryType
+from brain.async_memory import async_memory, AsyncJephthahMemory
+from brain.compaction import memory_compactor, MemoryCompactor
 from brain.goals import goals, GoalManager, GoalCategory
 from brain.learner import learner, LearningEngine
 from brain.planner import scheduler, TaskScheduler, Task, TaskPriority
@@ -19,6 +21,8 @@ from brain.smart import smart, SmartAssistant
 
 __all__ = [
     "memory", "JephthahMemory", "MemoryType",
+    "async_memory", "AsyncJephthahMemory",
+    "memory_compactor", "MemoryCompactor",
     "goals", "GoalManager", "GoalCategory",
     "learner", "LearningEngine",
     "scheduler", "TaskScheduler", "Task", "TaskPriority",
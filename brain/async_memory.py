@@ -0,0 +1,101 @@
+"""
+Jephthah Async Memory
+Non-blocking (aiosqlite) twin of JephthahMemory for use inside the event loop
+
+Every method runs the same operation as its JephthahMemory counterpart (see
+JephthahMemory._run), driven on an AsyncSession instead of a Session. The
+database file, read cache, access counters and write-behind queue are those
+of the sync JephthahMemory it wraps, so sync and async callers see the same data.
+"""
+
+import asyncio
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from brain.memory import memory, JephthahMemory, OPERATIONS
+from brain.storage import create_async_sqlite_engine
+
+
+async def _apply_step(session: AsyncSession, step):
+    """Run one operation step on an AsyncSession (async twin of memory._apply_step)"""
+    kind = step[0]
+    if kind == "first":
+        return (await session.scalars(step[1], step[2])).first()
+    if kind == "all":
+        return (await session.scalars(step[1], step[2])).all()
+    if kind == "row":
+        row = (await session.execute(step[1], step[2])).first()
+        return tuple(row) if row else None
+    if kind == "get":
+        return await session.get(step[1], step[2])
+    if kind == "add":
+        return session.add(step[1])
+    if kind == "execute":
+        return await session.execute(step[1], step[2])
+    if kind == "commit":
+        return await session.commit()
+    raise ValueError(f"Unknown memory step: {kind}")
+
+
+def _coroutine(name: str):
+    """AsyncJephthahMemory.<name>: JephthahMemory._op_<name> on the async driver"""
+    op = getattr(JephthahMemory, f"_op_{name}")
+
+    async def method(self, *args, **kwargs):
+        return await self._run(op(self.sync, *args, **kwargs))
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncJephthahMemory.{name}"
+    method.__doc__ = getattr(JephthahMemory, name).__doc__
+    return method
+
+
+class AsyncJephthahMemory:
+    """Same surface as JephthahMemory, every method is a coroutine"""
+
+    def __init__(self, sync_memory: JephthahMemory):
+        self.sync = sync_memory
+        self.cache = sync_memory.cache
+        self.engine = create_async_sqlite_engine(sync_memory.db_path)
+        self.Session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _run(self, op):
+        """Drive an operation generator on an AsyncSession"""
+        session = None
+        result = None
+        try:
+            while True:
+                step = op.send(result)
+                if step[0] == "flush":
+                    result = await self.flush()
+                    continue
+                if session is None:
+                    session = self.Session()
+                result = await _apply_step(session, step)
+        except StopIteration as done:
+            return done.value
+        finally:
+            if session is not None:
+                await session.close()
+
+    # === MAINTENANCE ===
+
+    async def flush(self) -> int:
+        """Flush the shared write-behind queue without blocking the loop"""
+        return await asyncio.to_thread(self.sync.flush)
+
+    async def close(self):
+        await self.flush()
+        await self.engine.dispose()
+
+    def get_stats(self) -> Dict:
+        return self.sync.get_stats()
+
+
+for _name in OPERATIONS:
+    setattr(AsyncJephthahMemory, _name, _coroutine(_name))
+
+
+# Global async memory instance (shares state with brain.memory.memory)
+async_memory = AsyncJephthahMemory(memory)
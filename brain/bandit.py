@@ -0,0 +1,110 @@
+"""
+Jephthah Bandit
+Thompson-sampling selection over pools of arms, kept entirely in memory
+
+Each arm has a Beta(alpha, beta) posterior over its success rate. A pool is
+the candidate arm list for a key (e.g. pattern_type, category, tone);
+select() draws once per arm and picks the best draw, so good arms win most
+of the time while uncertain ones still get explored. Uses and outcomes are
+accumulated per arm until drained by the owner's periodic flush.
+"""
+
+import random
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class ThompsonSelector:
+    """Beta-Bernoulli Thompson sampling with pending-count bookkeeping"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._arms: Dict[int, List[float]] = {}        # arm -> [alpha, beta]
+        self._pools: Dict[Hashable, List[int]] = {}
+        self._pending: Dict[int, List[int]] = {}       # arm -> [uses, successes, failures]
+        self.selections = 0
+
+    # === POOLS ===
+
+    def has_pool(self, key: Hashable) -> bool:
+        return key in self._pools
+
+    def set_pool(self, key: Hashable, arms: Iterable[Tuple[int, float, float]]):
+        """Install the candidates for key as (arm, alpha, beta); known arms keep their live posterior"""
+        with self._lock:
+            ids = []
+            for arm, alpha, beta in arms:
+                self._arms.setdefault(arm, [alpha, beta])
+                ids.append(arm)
+            self._pools[key] = ids
+
+    def pools(self) -> List[Hashable]:
+        return list(self._pools)
+
+    def drop_pools(self, keys: Iterable[Hashable]):
+        with self._lock:
+            for key in keys:
+                self._pools.pop(key, None)
+
+    # === SELECTION ===
+
+    def select(self, key: Hashable) -> Optional[int]:
+        """Pick an arm from key's pool and count the use"""
+        with self._lock:
+            pool = self._pools.get(key)
+            if not pool:
+                return None
+            betavariate = self.rng.betavariate
+            arms = self._arms
+            best, best_draw = None, -1.0
+            for arm in pool:
+                alpha, beta = arms[arm]
+                draw = betavariate(alpha, beta)
+                if draw > best_draw:
+                    best, best_draw = arm, draw
+            self._pending.setdefault(best, [0, 0, 0])[0] += 1
+            self.selections += 1
+            return best
+
+    def record(self, arm: int, success: bool):
+        """Update the posterior with one outcome"""
+        with self._lock:
+            posterior = self._arms.get(arm)
+            if posterior is not None:
+                posterior[0 if success else 1] += 1
+            self._pending.setdefault(arm, [0, 0, 0])[1 if success else 2] += 1
+
+    def mean(self, arm: int) -> Optional[float]:
+        posterior = self._arms.get(arm)
+        if posterior is None:
+            return None
+        return posterior[0] / (posterior[0] + posterior[1])
+
+    # === FLUSHING ===
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def drain(self) -> Dict[int, List[int]]:
+        """Take the accumulated {arm: [uses, successes, failures]}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: Dict[int, List[int]]):
+        """Put drained counts back (after a failed flush)"""
+        with self._lock:
+            for arm, counts in pending.items():
+                current = self._pending.setdefault(arm, [0, 0, 0])
+                for i in range(3):
+                    current[i] += counts[i]
+
+    def get_stats(self) -> Dict:
+        return {
+            "arms": len(self._arms),
+            "pools": len(self._pools),
+            "selections": self.selections,
+            "pending_arms": len(self._pending),
+        }
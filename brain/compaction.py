@@ -0,0 +1,282 @@
+"""
+Jephthah Memory Compaction
+Keeps memory.db small and fast during months of 24/7 operation
+
+Each pass:
+- Evicts stale, unimportant, rarely recalled memories
+- Summarizes large old memories in place
+- Rolls old action logs up into per-day aggregates
+- Reclaims free pages incrementally and refreshes planner statistics
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.dialects.sqlite import insert
+from loguru import logger
+
+from brain.memory import memory, JephthahMemory, Memory, MemoryType, ActionLog, ActionRollup
+
+_SUMMARIZE_MEMORY = Memory.__table__.update().where(
+    Memory.id == bindparam("memory_id")
+).values(
+    value=bindparam("new_value"),
+    meta_data=bindparam("new_meta", type_=Memory.meta_data.type),
+    updated_at=bindparam("kept_updated_at"),
+)
+
+
+class MemoryCompactor:
+    """Retention and compaction policy for JephthahMemory"""
+
+    # Types that describe identity/state and are never aged out
+    PROTECTED_TYPES = {MemoryType.SKILL, MemoryType.ACCOUNT, MemoryType.GOAL, MemoryType.RELATIONSHIP}
+
+    def __init__(self, mem: JephthahMemory,
+                 evict_after_days: int = 30, evict_below_importance: float = 0.3,
+                 evict_max_access: int = 1,
+                 summarize_after_days: int = 14, summarize_below_importance: float = 0.8,
+                 summarize_max_chars: int = 1000,
+                 action_retention_days: int = 7,
+                 vacuum_pages_per_run: int = 2000, batch_size: int = 500):
+        self.memory = mem
+        self.evict_after = timedelta(days=evict_after_days)
+        self.evict_below_importance = evict_below_importance
+        self.evict_max_access = evict_max_access
+        self.summarize_after = timedelta(days=summarize_after_days)
+        self.summarize_below_importance = summarize_below_importance
+        self.summarize_max_chars = summarize_max_chars
+        self.action_retention = timedelta(days=action_retention_days)
+        self.vacuum_pages_per_run = vacuum_pages_per_run
+        self.batch_size = batch_size
+        self.last_report: Dict = {}
+
+    # === POLICIES ===
+
+    def evict_memories(self) -> int:
+        """Delete old memories that are both unimportant and rarely recalled"""
+        cutoff = datetime.utcnow() - self.evict_after
+        evictable = [t.value for t in MemoryType if t not in self.PROTECTED_TYPES]
+        evicted = 0
+
+        while True:
+            session = self.memory.Session()
+            try:
+                ids = [row.id for row in session.query(Memory.id).filter(
+                    Memory.memory_type.in_(evictable),
+                    Memory.importance < self.evict_below_importance,
+                    Memory.accessed_count <= self.evict_max_access,
+                    Memory.updated_at < cutoff,
+                ).limit(self.batch_size)]
+                if not ids:
+                    break
+                session.query(Memory).filter(Memory.id.in_(ids)).delete(synchronize_session=False)
+                session.commit()
+                evicted += len(ids)
+            finally:
+                session.close()
+
+        return evicted
+
+    def summarize_memories(self) -> int:
+        """Shrink large, old, non-critical memories to a bounded excerpt"""
+        cutoff = datetime.utcnow() - self.summarize_after
+        summarizable = [t.value for t in MemoryType if t not in self.PROTECTED_TYPES]
+        summarized = 0
+        last_id = 0
+
+        while True:
+            session = self.memory.Session()
+            try:
+                rows = session.query(Memory).filter(
+                    Memory.id > last_id,
+                    Memory.memory_type.in_(summarizable),
+                    Memory.importance < self.summarize_below_importance,
+                    Memory.updated_at < cutoff,
+                    func.length(Memory.value) > self.summarize_max_chars,
+                ).order_by(Memory.id).limit(self.batch_size).all()
+                if not rows:
+                    break
+
+                updates = []
+                for row in rows:
+                    last_id = row.id
+                    if (row.meta_data or {}).get("summarized"):
+                        continue
+                    updates.append({
+                        "memory_id": row.id,
+                        "new_value": self._summarize_value(row.value),
+                        "new_meta": dict(row.meta_data or {}, summarized=len(row.value)),
+                        # Keep updated_at: a summary is not a fresh write to age from
+                        "kept_updated_at": row.updated_at,
+                    })
+                if updates:
+                    session.execute(_SUMMARIZE_MEMORY, updates)
+                    session.commit()
+                    summarized += len(updates)
+            finally:
+                session.close()
+
+        return summarized
+
+    def _summarize_value(self, raw: str) -> str:
+        """
+        Truncate long text at a sentence boundary. JSON values stay valid JSON:
+        only the strings inside them are shortened.
+        """
+        try:
+            data = json.loads(raw)
+        except (ValueError, TypeError):
+            return self._excerpt(raw)
+        return json.dumps(self._shrink(data))
+
+    def _shrink(self, data):
+        if isinstance(data, str):
+            return self._excerpt(data)
+        if isinstance(data, dict):
+            return {k: self._shrink(v) for k, v in data.items()}
+        if isinstance(data, list):
+            return [self._shrink(v) for v in data]
+        return data
+
+    def _excerpt(self, text: str) -> str:
+        limit = self.summarize_max_chars
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        boundary = cut.rfind(". ")
+        if boundary > limit // 2:
+            cut = cut[:boundary + 1]
+        return cut.rstrip() + " …"
+
+    def rollup_actions(self) -> Dict:
+        """Fold action logs older than the retention window into per-day rows"""
+        cutoff = datetime.utcnow() - self.action_retention
+        rolled = 0
+        days = set()
+
+        while True:
+            session = self.memory.Session()
+            try:
+                rows = session.query(
+                    ActionLog.id, ActionLog.action_type, ActionLog.result,
+                    ActionLog.duration_seconds, ActionLog.created_at
+                ).filter(ActionLog.created_at < cutoff).order_by(ActionLog.id).limit(self.batch_size).all()
+                if not rows:
+                    break
+
+                buckets: Dict[tuple, List[float]] = {}
+                for row in rows:
+                    day = row.created_at.strftime("%Y-%m-%d")
+                    # NULLs never conflict in the unique key, so store "" instead
+                    key = (day, row.action_type or "", row.result or "")
+                    bucket = buckets.setdefault(key, [0, 0.0])
+                    bucket[0] += 1
+                    bucket[1] += row.duration_seconds or 0.0
+                    days.add(day)
+
+                for (day, action_type, result), (count, duration) in buckets.items():
+                    stmt = insert(ActionRollup).values(
+                        day=day, action_type=action_type, result=result,
+                        count=count, total_duration_seconds=duration
+                    )
+                    session.execute(stmt.on_conflict_do_update(
+                        index_elements=["day", "action_type", "result"],
+                        set_={
+                            "count": ActionRollup.count + stmt.excluded.count,
+                            "total_duration_seconds": ActionRollup.total_duration_seconds
+                            + stmt.excluded.total_duration_seconds,
+                        }
+                    ))
+
+                session.query(ActionLog).filter(
+                    ActionLog.id.in_([row.id for row in rows])
+                ).delete(synchronize_session=False)
+                session.commit()
+                rolled += len(rows)
+            finally:
+                session.close()
+
+        return {"actions_rolled_up": rolled, "rollup_days": len(days)}
+
+    # === SPACE RECLAMATION ===
+
+    def _db_bytes(self, conn) -> int:
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        return page_size * page_count
+
+    def reclaim_space(self, bytes_before: int) -> Dict:
+        """Incremental vacuum plus approximate ANALYZE, returns size figures"""
+        with self.memory.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+                # Switching to incremental mode needs one full VACUUM
+                logger.info("Converting memory.db to incremental auto_vacuum")
+                conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.exec_driver_sql("VACUUM")
+            else:
+                conn.exec_driver_sql(f"PRAGMA incremental_vacuum({self.vacuum_pages_per_run})")
+
+            conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+            conn.exec_driver_sql("ANALYZE")
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            bytes_after = self._db_bytes(conn)
+            free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+        return {
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_reclaimed": max(0, bytes_before - bytes_after),
+            "free_pages_left": free_pages,
+        }
+
+    # === RUNNING ===
+
+    def run_once(self) -> Dict:
+        """Run one full compaction pass and return a report"""
+        start = time.perf_counter()
+        self.memory.flush()
+
+        with self.memory.engine.connect() as conn:
+            bytes_before = self._db_bytes(conn)
+
+        report = {
+            "evicted": self.evict_memories(),
+            "summarized": self.summarize_memories(),
+        }
+        report.update(self.rollup_actions())
+
+        if report["evicted"] or report["summarized"]:
+            self.memory.cache.clear()
+
+        report.update(self.reclaim_space(bytes_before))
+        report["duration_seconds"] = round(time.perf_counter() - start, 3)
+        report["ran_at"] = datetime.utcnow().isoformat()
+
+        self.last_report = report
+        logger.info(
+            f"Memory compaction: evicted {report['evicted']}, summarized {report['summarized']}, "
+            f"rolled up {report['actions_rolled_up']} actions, "
+            f"reclaimed {report['bytes_reclaimed'] / 1024:.0f} KB"
+        )
+        return report
+
+    async def run_forever(self, interval_hours: float = 6):
+        """Background loop; the pass itself runs off the event loop"""
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Memory compaction failed: {e}")
+            await asyncio.sleep(interval_hours * 3600)
+
+
+# Global compactor instance
+memory_compactor = MemoryCompactor(memory)
@@ -11,7 +11,8 @@ Result: Self-sufficient content generation!
 """
 
 import random
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from loguru import logger
@@ -19,6 +20,9 @@ from loguru import logger
 from brain.knowledge_graph import knowledge_graph
 from brain.pattern_memory import pattern_memory
 from brain.vocabulary import vocabulary
+from brain.text_analysis import feed_learners
+from brain.storage import QueryCounter
+from brain.templates import CompiledTemplate, template_cache
 
 
 class ContentEngine:
@@ -31,6 +35,7 @@ class ContentEngine:
         self.articles_generated = 0
         self.proposals_generated = 0
         self.emails_generated = 0
+        self.last_batch: Dict = {}
         logger.info("Content Engine initialized - 100% autonomous mode")
     
     # === ARTICLE GENERATION ===
@@ -42,123 +47,83 @@ class ContentEngine:
         # Get knowledge about the topic
         knowledge = knowledge_graph.get_knowledge_about(topic, depth=2)
         
-        # Generate title
-        title = self._generate_title(topic, knowledge)
-        
-        # Generate intro
-        intro = self._generate_intro(topic, knowledge)
-        
-        # Generate body paragraphs
-        paragraphs = []
-        target_paragraphs = max(3, word_count // 150)
-        
-        for i in range(target_paragraphs):
-            paragraph = self._generate_paragraph(topic, knowledge, i)
-            if paragraph:
-                paragraphs.append(paragraph)
-        
-        # Generate conclusion
-        conclusion = self._generate_conclusion(topic, knowledge)
-        
-        # Assemble article
-        article = f"{title}\n\n{intro}\n\n" + "\n\n".join(paragraphs) + f"\n\n{conclusion}"
-        
+        patterns, used = self._choose_patterns(word_count, knowledge)
+        article = render_article(topic, knowledge, patterns)
         self.articles_generated += 1
-        
-        return {
-            "title": title,
-            "content": article,
-            "word_count": len(article.split()),
-            "topic": topic,
-            "generated_at": datetime.utcnow().isoformat(),
-            "used_api": False  # PURE MEMORY!
-        }
+        return self._finish_article(article, used)
     
-    def _generate_title(self, topic: str, knowledge: Dict) -> str:
-        """Generate article title"""
-        templates = [
-            f"The Ultimate Guide to {topic.title()}",
-            f"Everything You Need to Know About {topic.title()}",
-            f"{topic.title()}: A Comprehensive Overview",
-            f"Mastering {topic.title()} in {random.randint(2026, 2027)}",
-            f"Why {topic.title()} Matters for Your Business",
-            f"{topic.title()} Explained: From Basics to Advanced",
-        ]
-        return random.choice(templates)
+    def generate_articles(self, topics: List[str], n: int = 1, word_count: int = 500) -> List[Dict]:
+        """
+        Generate n articles per topic. Knowledge for every topic and the pattern
+        pools are fetched up front in bulk queries, then patterns are chosen and
+        articles rendered in memory (rendering is plain string templating).
+        Throughput and queries per article are kept in last_batch.
+        """
+        jobs = [topic for topic in topics for _ in range(n)]
+        if not jobs:
+            return []
+        start = time.perf_counter()
+        
+        with QueryCounter(knowledge_graph.engine, pattern_memory.engine) as queries:
+            knowledge = knowledge_graph.get_knowledge_about_many(list(dict.fromkeys(topics)), depth=2)
+            pattern_memory.prefetch_pools(ARTICLE_PATTERN_TYPES, category="general")
+            
+            plans, used = [], []
+            for topic in jobs:
+                patterns, pattern_ids = self._choose_patterns(word_count, knowledge[topic])
+                plans.append((topic, knowledge[topic], patterns))
+                used.append(pattern_ids)
+        
+        rendered = [render_article(*plan) for plan in plans]
+        
+        articles = [self._finish_article(article, ids) for article, ids in zip(rendered, used)]
+        self.articles_generated += len(articles)
+        
+        elapsed = time.perf_counter() - start
+        self.last_batch = {
+            "articles": len(articles),
+            "seconds": round(elapsed, 3),
+            "articles_per_sec": round(len(articles) / elapsed, 1) if elapsed else None,
+            "queries": queries.count,
+            "queries_per_article": round(queries.count / len(articles), 3),
+        }
+        logger.info(f"Generated {len(articles)} articles: {self.last_batch['articles_per_sec']}/s, "
+                    f"{self.last_batch['queries_per_article']} queries/article")
+        return articles
     
-    def _generate_intro(self, topic: str, knowledge: Dict) -> str:
-        """Generate introduction paragraph"""
-        # Get intro pattern
-        pattern = pattern_memory.get_random_pattern("intro", category="general")
-        
-        if pattern:
-            # Fill placeholders
-            intro = pattern.replace("{TOPIC}", topic)
-            intro = intro.replace("{INDUSTRY}", random.choice(["tech", "business", "digital"]))
-            intro = intro.replace("{PROBLEM}", f"understanding {topic}")
-        else:
-            # Fallback
-            intro = f"In today's rapidly evolving landscape, {topic} has become increasingly important. "
-            intro += f"Understanding {topic} can give you a competitive advantage. "
-            intro += f"Let me share everything I've learned about {topic}."
-        
-        return intro
+    def _choose_patterns(self, word_count: int, knowledge: Dict) -> Tuple[Dict, List[int]]:
+        """
+        Bandit-selected patterns for one article, plus the ids used. Body
+        patterns only render facts, so without facts none are drawn: an
+        unrendered pattern must not be counted or credited.
+        """
+        used: List[int] = []
+        has_facts = bool(knowledge.get("facts"))
+        patterns = {
+            "intro": self._pick_pattern("intro", used),
+            "body": [self._pick_pattern("body", used) if has_facts else None
+                     for _ in range(max(3, word_count // 150))],
+            "conclusion": self._pick_pattern("conclusion", used),
+            "cta": self._pick_pattern("cta", used),
+        }
+        return patterns, used
     
-    def _generate_paragraph(self, topic: str, knowledge: Dict, index: int) -> str:
-        """Generate a body paragraph"""
-        paragraphs = []
-        
-        # Get body pattern
-        pattern = pattern_memory.get_random_pattern("body", category="general")
-        
-        if pattern and knowledge.get("facts"):
-            # Use facts from knowledge graph
-            facts = knowledge["facts"][:3]
-            for fact in facts:
-                text = pattern.replace("{TOPIC}", topic)
-                text = text.replace("{BENEFIT}", fact.get("value", "improved efficiency"))
-                text = text.replace("{KEY_POINT}", fact.get("value", "core principles"))
-                paragraphs.append(text)
-        
-        # Use related topics
-        if knowledge.get("related_topics") and index < len(knowledge["related_topics"]):
-            related = knowledge["related_topics"][index]
-            text = f"One important aspect of {topic} is {related['name']}. "
-            if related.get("description"):
-                text += f"{related['description'][:100]}. "
-            text += f"This {related.get('relationship', 'relates to')} {topic} in significant ways."
-            paragraphs.append(text)
-        
-        # Fallback to general statements
-        if not paragraphs:
-            transition = vocabulary.get_transition()
-            statement = f"{transition}, when working with {topic}, it's essential to understand the fundamentals. "
-            statement += f"The key to success with {topic} is consistent practice and continuous learning."
-            paragraphs.append(statement)
-        
-        return " ".join(paragraphs)
+    def _finish_article(self, article: Dict, used: List[int]) -> Dict:
+        article.update({
+            "pattern_ids": used,
+            "generated_at": datetime.utcnow().isoformat(),
+            "used_api": False  # PURE MEMORY!
+        })
+        return article
     
-    def _generate_conclusion(self, topic: str, knowledge: Dict) -> str:
-        """Generate conclusion paragraph"""
-        pattern = pattern_memory.get_random_pattern("conclusion", category="general")
-        
-        if pattern:
-            conclusion = pattern.replace("{TOPIC}", topic)
-            conclusion = conclusion.replace("{AUDIENCE}", "developers and businesses")
-            conclusion = conclusion.replace("{SUMMARY}", f"{topic} is a game-changer")
-            conclusion = conclusion.replace("{RECOMMENDATION}", f"start learning {topic} today")
-            conclusion = conclusion.replace("{ACTION}", "staying informed and practicing regularly")
-        else:
-            conclusion = f"In summary, {topic} represents a significant opportunity for growth. "
-            conclusion += f"By mastering {topic}, you position yourself ahead of the curve. "
-            conclusion += f"Start applying these concepts today and see the results for yourself."
-        
-        # Add CTA
-        cta = pattern_memory.get_random_pattern("cta", category="general")
-        if cta:
-            conclusion += f" {cta.replace('{TOPIC}', topic)}"
-        
-        return conclusion
+    def _pick_pattern(self, pattern_type: str, used: List[int]) -> Optional[CompiledTemplate]:
+        """Bandit-selected compiled pattern, remembering its id in used"""
+        selected = pattern_memory.select_pattern(pattern_type, category="general")
+        if not selected:
+            return None
+        pattern_id, text = selected
+        used.append(pattern_id)
+        return template_cache.get(("sentence", pattern_id), text)
     
     # === PROPOSAL GENERATION ===
     
@@ -176,16 +141,19 @@ class ContentEngine:
         skills = self._extract_skills(job_description)
         
         # Fill template
-        proposal = template.opening.replace("{JOB_SPECIFIC_HOOK}", f"the {job_type} requirements align perfectly with my expertise")
-        proposal += "\n\n" + template.experience_section.replace("{YEARS}", "3+")
-        proposal = proposal.replace("{SKILLS}", ", ".join(skills[:3]))
-        proposal = proposal.replace("{RECENT_PROJECT}", f"delivered a {job_type} solution for a client")
-        
-        proposal += "\n\n" + template.approach_section.replace("{FIRST_STEP}", "analyzing requirements")
-        proposal = proposal.replace("{SECOND_STEP}", "building a robust solution")
-        proposal = proposal.replace("{BENEFIT}", "timely delivery and quality")
-        
-        proposal += "\n\n" + template.closing
+        values = {
+            "JOB_SPECIFIC_HOOK": f"the {job_type} requirements align perfectly with my expertise",
+            "YEARS": "3+",
+            "SKILLS": ", ".join(skills[:3]),
+            "RECENT_PROJECT": f"delivered a {job_type} solution for a client",
+            "FIRST_STEP": "analyzing requirements",
+            "SECOND_STEP": "building a robust solution",
+            "BENEFIT": "timely delivery and quality",
+        }
+        proposal = "\n\n".join(
+            template_cache.render(("proposal", template.id, field), getattr(template, field), values)
+            for field in ("opening", "experience_section", "approach_section", "closing")
+        )
         
         self.proposals_generated += 1
         
@@ -239,30 +207,31 @@ class ContentEngine:
         if not pattern:
             return self._fallback_email(email_type, context)
         
-        # Generate subject
-        subject = pattern.subject_pattern.replace("{BENEFIT}", context.get("benefit", "growth"))
-        subject = subject.replace("{BUSINESS_TYPE}", context.get("business_type", "company"))
-        subject = subject.replace("{TOPIC}", context.get("topic", "collaboration"))
+        values = {
+            "BENEFIT": context.get("benefit", "growth"),
+            "BUSINESS_TYPE": context.get("business_type", "company"),
+            "NAME": context.get("name", "there"),
+            "OBSERVATION_ABOUT_COMPANY": context.get("observation", "your impressive work"),
+            "VALUE_PROPOSITION": context.get("value", "achieve your goals faster"),
+            "SIMILAR_CLIENT": context.get("client", "a recent client"),
+            "RESULT": context.get("result", "20% growth"),
+            "NEW_VALUE_ADD": context.get("value_add", "I have new insights to share"),
+        }
         
-        # Generate body
-        body = pattern.greeting.replace("{NAME}", context.get("name", "there")) + "\n\n"
+        # Generate subject
+        subject = template_cache.render(("email", pattern.id, "subject"), pattern.subject_pattern,
+                                        dict(values, TOPIC=context.get("topic", "collaboration")))
         
-        # Add body paragraphs
+        # Generate body: greeting, paragraphs, closing
+        values["TOPIC"] = context.get("topic", "this opportunity")
+        sections = [template_cache.render(("email", pattern.id, "greeting"), pattern.greeting, values)]
         if isinstance(pattern.body_structure, list):
-            for para_template in pattern.body_structure:
-                para = para_template.replace("{OBSERVATION_ABOUT_COMPANY}", 
-                                            context.get("observation", "your impressive work"))
-                para = para.replace("{VALUE_PROPOSITION}", 
-                                   context.get("value", "achieve your goals faster"))
-                para = para.replace("{SIMILAR_CLIENT}", context.get("client", "a recent client"))
-                para = para.replace("{RESULT}", context.get("result", "20% growth"))
-                para = para.replace("{TOPIC}", context.get("topic", "this opportunity"))
-                para = para.replace("{NEW_VALUE_ADD}", 
-                                   context.get("value_add", "I have new insights to share"))
-                body += para + "\n\n"
-        
-        # Add closing
-        body += pattern.closing
+            sections.extend(
+                template_cache.render(("email", pattern.id, "body", i), paragraph, values)
+                for i, paragraph in enumerate(pattern.body_structure)
+            )
+        sections.append(pattern.closing)
+        body = "\n\n".join(sections)
         
         self.emails_generated += 1
         
@@ -299,11 +268,20 @@ class ContentEngine:
     
     # === LEARNING & IMPROVEMENT ===
     
-    def learn_from_success(self, content_type: str, item_id: int, success: bool):
+    def learn_from_text(self, text, source: str = "web") -> int:
+        """
+        Learn knowledge, sentence patterns and vocabulary from one tokenizer
+        pass. text may be a string or an iterable of chunks (e.g. a file).
+        """
+        return feed_learners(text, [knowledge_graph, pattern_memory, vocabulary], origin=source)
+    
+    def learn_from_success(self, content_type: str, item_id: int, success: bool,
+                           pattern_ids: List[int] = None):
         """Learn from successful/failed content"""
         if content_type == "article":
-            # Would update article template success scores
-            pass
+            # Credit the sentence patterns the article was built from
+            for pattern_id in pattern_ids or []:
+                pattern_memory.update_pattern_success(pattern_id, success)
         elif content_type == "proposal":
             if success:
                 pattern_memory.record_proposal_win(item_id)
@@ -322,6 +300,8 @@ class ContentEngine:
             "articles_generated": self.articles_generated,
             "proposals_generated": self.proposals_generated,
             "emails_generated": self.emails_generated,
+            "last_batch": self.last_batch,
+            "knowledge_cache": knowledge_graph.bundles.stats(),
             "knowledge": kg_stats,
             "patterns": pm_stats,
             "vocabulary": vocab_stats,
@@ -329,5 +309,124 @@ class ContentEngine:
         }
 
 
+# === ARTICLE RENDERING ===
+# Pure functions of (topic, knowledge, chosen patterns): no database access,
+# so a batch renders after all of its lookups are done
+
+ARTICLE_PATTERN_TYPES = ["intro", "body", "conclusion", "cta"]
+
+
+def render_article(topic: str, knowledge: Dict, patterns: Dict) -> Dict:
+    """Assemble an article from its knowledge bundle and chosen patterns"""
+    title = _generate_title(topic)
+    intro = _generate_intro(topic, patterns["intro"])
+    
+    # Generate body paragraphs
+    paragraphs = []
+    for i, pattern in enumerate(patterns["body"]):
+        paragraph = _generate_paragraph(topic, knowledge, i, pattern)
+        if paragraph:
+            paragraphs.append(paragraph)
+    
+    conclusion = _generate_conclusion(topic, patterns["conclusion"], patterns["cta"])
+    
+    # Assemble article
+    article = f"{title}\n\n{intro}\n\n" + "\n\n".join(paragraphs) + f"\n\n{conclusion}"
+    return {
+        "title": title,
+        "content": article,
+        "word_count": len(article.split()),
+        "topic": topic,
+    }
+
+
+def _generate_title(topic: str) -> str:
+    """Generate article title"""
+    templates = [
+        f"The Ultimate Guide to {topic.title()}",
+        f"Everything You Need to Know About {topic.title()}",
+        f"{topic.title()}: A Comprehensive Overview",
+        f"Mastering {topic.title()} in {random.randint(2026, 2027)}",
+        f"Why {topic.title()} Matters for Your Business",
+        f"{topic.title()} Explained: From Basics to Advanced",
+    ]
+    return random.choice(templates)
+
+
+def _generate_intro(topic: str, pattern: Optional[CompiledTemplate]) -> str:
+    """Generate introduction paragraph"""
+    if pattern:
+        # Fill placeholders
+        intro = pattern.render({
+            "TOPIC": topic,
+            "INDUSTRY": random.choice(["tech", "business", "digital"]),
+            "PROBLEM": f"understanding {topic}",
+        })
+    else:
+        # Fallback
+        intro = f"In today's rapidly evolving landscape, {topic} has become increasingly important. "
+        intro += f"Understanding {topic} can give you a competitive advantage. "
+        intro += f"Let me share everything I've learned about {topic}."
+    
+    return intro
+
+
+def _generate_paragraph(topic: str, knowledge: Dict, index: int,
+                        pattern: Optional[CompiledTemplate]) -> str:
+    """Generate a body paragraph"""
+    paragraphs = []
+    
+    if pattern and knowledge.get("facts"):
+        # Use facts from knowledge graph
+        facts = knowledge["facts"][:3]
+        for fact in facts:
+            paragraphs.append(pattern.render({
+                "TOPIC": topic,
+                "BENEFIT": fact.get("value", "improved efficiency"),
+                "KEY_POINT": fact.get("value", "core principles"),
+            }))
+    
+    # Use related topics
+    if knowledge.get("related_topics") and index < len(knowledge["related_topics"]):
+        related = knowledge["related_topics"][index]
+        text = f"One important aspect of {topic} is {related['name']}. "
+        if related.get("description"):
+            text += f"{related['description'][:100]}. "
+        text += f"This {related.get('relationship', 'relates to')} {topic} in significant ways."
+        paragraphs.append(text)
+    
+    # Fallback to general statements
+    if not paragraphs:
+        transition = vocabulary.get_transition()
+        statement = f"{transition}, when working with {topic}, it's essential to understand the fundamentals. "
+        statement += f"The key to success with {topic} is consistent practice and continuous learning."
+        paragraphs.append(statement)
+    
+    return " ".join(paragraphs)
+
+
+def _generate_conclusion(topic: str, pattern: Optional[CompiledTemplate],
+                         cta: Optional[CompiledTemplate]) -> str:
+    """Generate conclusion paragraph"""
+    if pattern:
+        conclusion = pattern.render({
+            "TOPIC": topic,
+            "AUDIENCE": "developers and businesses",
+            "SUMMARY": f"{topic} is a game-changer",
+            "RECOMMENDATION": f"start learning {topic} today",
+            "ACTION": "staying informed and practicing regularly",
+        })
+    else:
+        conclusion = f"In summary, {topic} represents a significant opportunity for growth. "
+        conclusion += f"By mastering {topic}, you position yourself ahead of the curve. "
+        conclusion += f"Start applying these concepts today and see the results for yourself."
+    
+    # Add CTA
+    if cta:
+        conclusion += " " + cta.render({"TOPIC": topic})
+    
+    return conclusion
+
+
 # Global content engine instance
 content_engine = ContentEngine()
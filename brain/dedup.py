@@ -0,0 +1,174 @@
+"""
+Jephthah Dedup
+Near-duplicate detection for short texts (MinHash signatures + LSH banding)
+
+- A text becomes a set of word shingles (placeholders like {TOPIC} are words)
+- MinHash compresses the set into num_perm integers; the fraction of equal
+  positions estimates the Jaccard similarity of two sets
+- The signature is cut into bands; texts sharing any identical band are
+  candidates, and only candidates are compared, so a lookup touches a handful
+  of entries instead of the whole table
+- An optional scope partitions the index: texts are only compared with
+  texts added under the same scope
+"""
+
+import random
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+_TOKEN = re.compile(r"\{[A-Z][A-Z0-9_]*\}|\w+")
+
+# (a * h + b) mod p with h < 2**32 and a < 2**31 stays below 2**64
+_PRIME = 4294967311
+_MAX_A = 2 ** 31 - 1
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, k: int = 2) -> Set[str]:
+    """Word k-grams of the lowercased text (the whole text if it is shorter)"""
+    tokens = [t if t.startswith("{") else t.lower() for t in _TOKEN.findall(text or "")]
+    if len(tokens) <= k:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    """num_perm universal hash functions applied to crc32 shingle hashes"""
+
+    def __init__(self, num_perm: int = 64, k: int = 2, seed: int = 1):
+        self.num_perm = num_perm
+        self.k = k
+        rng = random.Random(seed)
+        self.a = [rng.randint(1, _MAX_A) for _ in range(num_perm)]
+        self.b = [rng.randint(0, _PRIME - 1) for _ in range(num_perm)]
+        if HAS_NUMPY:
+            self._a = np.array(self.a, dtype=np.uint64)
+            self._b = np.array(self.b, dtype=np.uint64)
+
+    def signature(self, text: str) -> Signature:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.k)]
+        if HAS_NUMPY:
+            h = np.array(hashes, dtype=np.uint64)[:, None]
+            return tuple(((h * self._a + self._b) % _PRIME).min(axis=0).tolist())
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes)
+            for a, b in zip(self.a, self.b)
+        )
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class MinHashLSH:
+    """
+    Index of keyed texts answering "is there already something at least
+    `threshold` similar?". bands * rows must equal the hasher's num_perm.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.RLock()
+        self._signatures: Dict[Hashable, Signature] = {}
+        self._scopes: Dict[Hashable, Hashable] = {}
+        # Bucket keys are (scope, band chunk)
+        self._buckets: List[Dict[tuple, Set[Hashable]]] = [defaultdict(set) for _ in range(bands)]
+        self.lookups = 0
+        self.duplicates = 0
+
+    def _bands(self, signature: Signature) -> Iterable[Tuple[int, Signature]]:
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    # === UPDATES ===
+
+    def add(self, key: Hashable, text: str, signature: Optional[Signature] = None,
+            scope: Hashable = None) -> Signature:
+        signature = signature or self.hasher.signature(text)
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            self._scopes[key] = scope
+            for band, chunk in self._bands(signature):
+                self._buckets[band][scope, chunk].add(key)
+        return signature
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        scope = self._scopes.pop(key)
+        for band, chunk in self._bands(signature):
+            bucket = self._buckets[band].get((scope, chunk))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][scope, chunk]
+
+    # === QUERIES ===
+
+    def query(self, text: str, signature: Optional[Signature] = None,
+              scope: Hashable = None) -> Optional[Tuple[Hashable, float]]:
+        """The most similar key in scope as (key, similarity), if any reaches the threshold"""
+        signature = signature or self.hasher.signature(text)
+        best, best_score = None, 0.0
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, chunk in self._bands(signature):
+                bucket = self._buckets[band].get((scope, chunk))
+                if bucket:
+                    candidates |= bucket
+            for key in candidates:
+                score = similarity(signature, self._signatures[key])
+                if score >= self.threshold and score > best_score:
+                    best, best_score = key, score
+            if best is not None:
+                self.duplicates += 1
+        return (best, best_score) if best is not None else None
+
+    def add_unique(self, key: Hashable, text: str, scope: Hashable = None) -> Optional[Tuple[Hashable, float]]:
+        """Index text under key unless a near-duplicate exists in scope; returns that duplicate"""
+        signature = self.hasher.signature(text)
+        with self._lock:
+            found = self.query(text, signature, scope)
+            if found is None:
+                self.add(key, text, signature, scope)
+        return found
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def get_stats(self) -> Dict:
+        return {
+            "indexed": len(self._signatures),
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+        }
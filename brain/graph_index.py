@@ -0,0 +1,254 @@
+"""
+Jephthah Graph Index
+In-memory compressed sparse row (CSR) adjacency for the knowledge graph
+
+Edges are stored undirected in flat arrays:
+- indptr[node] .. indptr[node + 1] is the slice of `node`'s neighbors
+- indices / weights / rel_codes hold neighbor id, strength and relationship type
+
+The CSR part is immutable; edges added after a build go into a small delta
+map and are merged in on the next rebuild, so add_edge stays O(1).
+
+An edge is identified by its unordered node pair and relationship type, so a
+relationship stored in both directions (A->B and B->A) is one edge here with
+the stronger of the two strengths. build() expects edges already collapsed
+that way (see KnowledgeGraph._load_graph); add_edge keeps the stronger.
+"""
+
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class AdjacencyIndex:
+    """Array-backed adjacency with strength-weighted neighborhood queries"""
+
+    def __init__(self, rebuild_ratio: float = 0.1, min_rebuild: int = 4096):
+        self.indptr = array("q", [0])
+        self.indices = array("q")
+        self.weights = array("d")
+        self.rel_codes = array("i")
+        self.rel_types: List[str] = []
+        self._rel_lookup: Dict[str, int] = {}
+
+        # node -> [[other, rel_code, strength], ...] added since the last build
+        self._delta: Dict[int, List[list]] = {}
+        self._delta_edges = 0
+        self._base_edges = 0
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+
+    # === BUILDING ===
+
+    def _rel_code(self, rel_type: str) -> int:
+        code = self._rel_lookup.get(rel_type)
+        if code is None:
+            code = len(self.rel_types)
+            self.rel_types.append(rel_type)
+            self._rel_lookup[rel_type] = code
+        return code
+
+    def build(self, edges: Iterable[Tuple[int, int, str, float]]):
+        """Build the CSR arrays from (source, target, rel_type, strength) tuples"""
+        sources = array("q")
+        targets = array("q")
+        weights = array("d")
+        codes = array("i")
+        max_node = 0
+        for source, target, rel_type, strength in edges:
+            sources.append(source)
+            targets.append(target)
+            weights.append(strength if strength is not None else 0.5)
+            codes.append(self._rel_code(rel_type or "related_to"))
+            max_node = max(max_node, source, target)
+
+        # Counting sort: degree per node, prefix sum, then scatter both directions
+        degree = array("q", bytes(8 * (max_node + 2)))
+        for i in range(len(sources)):
+            degree[sources[i] + 1] += 1
+            if targets[i] != sources[i]:
+                degree[targets[i] + 1] += 1
+        for node in range(1, len(degree)):
+            degree[node] += degree[node - 1]
+        indptr = degree
+
+        total = indptr[-1]
+        indices = array("q", bytes(8 * total))
+        out_weights = array("d", bytes(8 * total))
+        out_codes = array("i", bytes(4 * total))
+        cursor = array("q", indptr[:-1])
+        for i in range(len(sources)):
+            pairs = ((sources[i], targets[i]),) if sources[i] == targets[i] else \
+                ((sources[i], targets[i]), (targets[i], sources[i]))
+            for a, b in pairs:
+                pos = cursor[a]
+                indices[pos] = b
+                out_weights[pos] = weights[i]
+                out_codes[pos] = codes[i]
+                cursor[a] = pos + 1
+
+        self.indptr = indptr
+        self._base_edges = len(sources)
+        self.indices = indices
+        self.weights = out_weights
+        self.rel_codes = out_codes
+        self._delta = {}
+        self._delta_edges = 0
+
+    def rebuild(self):
+        """Fold the delta edges back into the CSR arrays"""
+        self.build(self.edges())
+
+    def load_arrays(self, indptr, indices, weights, rel_codes, rel_types: List[str], edge_count: int):
+        """
+        Adopt prebuilt CSR arrays (e.g. memoryviews over a mapped snapshot)
+        without copying. weights must be writable for in-place strength updates.
+        """
+        self.rel_types = list(rel_types)
+        self._rel_lookup = {rel_type: code for code, rel_type in enumerate(self.rel_types)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.rel_codes = rel_codes
+        self._base_edges = edge_count
+        self._delta = {}
+        self._delta_edges = 0
+
+    def edges(self) -> Iterable[Tuple[int, int, str, float]]:
+        """Yield every undirected edge once (source < target or self-loop)"""
+        for node in range(len(self.indptr) - 1):
+            for pos in range(self.indptr[node], self.indptr[node + 1]):
+                other = self.indices[pos]
+                if node <= other:
+                    yield node, other, self.rel_types[self.rel_codes[pos]], self.weights[pos]
+        for node, row in self._delta.items():
+            for other, code, strength in row:
+                if node <= other:
+                    yield node, other, self.rel_types[code], strength
+
+    def snapshot(self) -> Tuple[array, array, array, List[Tuple[int, int, float]]]:
+        """
+        Copies of (indptr, indices, weights) plus the delta as directed
+        (node, other, strength) entries, safe to read from another thread.
+        """
+        while True:
+            indptr, indices, weights = self.indptr, self.indices, self.weights
+            # A concurrent build() swaps the arrays one by one; retry on a torn read
+            if indptr[-1] != len(indices) or len(weights) != len(indices):
+                continue
+            try:
+                delta = [(node, other, strength)
+                         for node, row in list(self._delta.items())
+                         for other, _, strength in row]
+            except RuntimeError:
+                continue
+            return _copy("q", indptr), _copy("q", indices), _copy("d", weights), delta
+
+    # === UPDATES ===
+
+    def _find(self, node: int, other: int, code: int):
+        """Locate an edge: ('csr', position) or ('delta', entry) or None"""
+        if node < len(self.indptr) - 1:
+            for pos in range(self.indptr[node], self.indptr[node + 1]):
+                if self.indices[pos] == other and self.rel_codes[pos] == code:
+                    return "csr", pos
+        for entry in self._delta.get(node, ()):
+            if entry[0] == other and entry[1] == code:
+                return "delta", entry
+        return None
+
+    def _set(self, node: int, other: int, code: int, strength: float) -> bool:
+        found = self._find(node, other, code)
+        if found is None:
+            return False
+        kind, where = found
+        if kind == "csr":
+            self.weights[where] = max(self.weights[where], strength)
+        else:
+            where[2] = max(where[2], strength)
+        return True
+
+    def add_edge(self, source: int, target: int, rel_type: str, strength: float):
+        """Insert an edge, or raise its strength if it exists (in either direction)"""
+        code = self._rel_code(rel_type)
+        if self._set(source, target, code, strength):
+            if source != target:
+                self._set(target, source, code, strength)
+            return
+
+        self._delta.setdefault(source, []).append([target, code, strength])
+        if source != target:
+            self._delta.setdefault(target, []).append([source, code, strength])
+        self._delta_edges += 1
+
+        if self._delta_edges > max(self.min_rebuild, self.rebuild_ratio * self._base_edges):
+            self.rebuild()
+
+    # === QUERIES ===
+
+    @property
+    def edge_count(self) -> int:
+        return self._base_edges + self._delta_edges
+
+    @property
+    def pending_edges(self) -> int:
+        """Edges in the delta, not yet folded into the CSR arrays"""
+        return self._delta_edges
+
+    def degree(self, node: int) -> int:
+        base = self.indptr[node + 1] - self.indptr[node] if node < len(self.indptr) - 1 else 0
+        return base + len(self._delta.get(node, ()))
+
+    def _row(self, node: int):
+        if node < len(self.indptr) - 1:
+            for pos in range(self.indptr[node], self.indptr[node + 1]):
+                yield self.indices[pos], self.rel_codes[pos], self.weights[pos]
+        for other, code, strength in self._delta.get(node, ()):
+            yield other, code, strength
+
+    def neighbors(self, node: int, rel_type: Optional[str] = None,
+                  limit: int = 20) -> List[Tuple[int, str, float]]:
+        """Strongest direct neighbors as (node, rel_type, strength)"""
+        if rel_type is not None:
+            code = self._rel_lookup.get(rel_type)
+            if code is None:
+                return []
+            row = ((o, c, w) for o, c, w in self._row(node) if c == code)
+        else:
+            row = self._row(node)
+        top = heapq.nlargest(limit, row, key=lambda item: item[2])
+        return [(other, self.rel_types[code], strength) for other, code, strength in top]
+
+    def neighborhood(self, node: int, depth: int = 2, limit: int = 20,
+                     min_score: float = 0.01) -> List[Tuple[int, float, int]]:
+        """
+        Multi-hop neighbors ranked by the best path score, where a path scores
+        the product of its edge strengths. Returns (node, score, hops).
+        """
+        best: Dict[int, Tuple[float, int]] = {node: (1.0, 0)}
+        frontier = {node: 1.0}
+
+        for hop in range(1, depth + 1):
+            next_frontier: Dict[int, float] = {}
+            for current, score in frontier.items():
+                for other, _, strength in self._row(current):
+                    candidate = score * strength
+                    if candidate < min_score:
+                        continue
+                    known = best.get(other)
+                    if known is None or candidate > known[0]:
+                        best[other] = (candidate, hop)
+                        next_frontier[other] = candidate
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        del best[node]
+        top = heapq.nlargest(limit, best.items(), key=lambda item: item[1][0])
+        return [(other, score, hops) for other, (score, hops) in top]
+
+
+def _copy(typecode: str, buffer) -> array:
+    copied = array(typecode)
+    copied.frombytes(memoryview(buffer).cast("B"))
+    return copied
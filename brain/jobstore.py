@@ -0,0 +1,298 @@
+"""
+Jephthah Job Store
+Durable, crash-safe state for the schedulers (brain.scheduler, brain.planner)
+
+Every persisted job is one row keyed by a stable job key:
+- next run time (unix seconds) and interval, so recurring jobs resume on
+  their own schedule after a restart instead of all firing at once
+- attempts, last error and a status (pending, claimed, done, failed)
+- a claim (owner + lease) taken with a single conditional UPDATE, so two
+  processes sharing the database never run the same job
+
+Claims left behind by a process that died are released on startup when the
+owner is known to be gone (its pid is dead, or now belongs to a process that
+started later), and by lease expiry otherwise.
+"""
+
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, Integer, String, Text, Float, JSON, Index, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from loguru import logger
+
+from config.settings import DATA_DIR
+from brain.storage import create_sqlite_engine
+
+Base = declarative_base()
+
+# Tolerance when matching a run to the stored run time (monotonic <-> wall conversion)
+CLAIM_SLACK_SECONDS = 0.05
+
+
+class StoredJob(Base):
+    """One scheduled job's durable state"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_queue_status", "queue", "status", "next_run_at"),
+    )
+
+    key = Column(String(255), primary_key=True)  # stable across restarts
+    queue = Column(String(50))  # scheduler, planner
+    name = Column(String(255))
+    payload = Column(JSON)  # whatever the owner needs to rebuild the job
+    priority = Column(Integer, default=0)
+    next_run_at = Column(Float)  # unix seconds
+    interval = Column(Float)  # seconds, NULL for one-shot jobs
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    status = Column(String(20), default="pending")  # pending, claimed, done, failed
+    claimed_by = Column(String(100))
+    lease_until = Column(Float)
+    last_error = Column(Text)
+    updated_at = Column(Float)
+
+
+def _row(job: StoredJob) -> Dict:
+    return {
+        "key": job.key, "queue": job.queue, "name": job.name, "payload": job.payload or {},
+        "priority": job.priority, "next_run_at": job.next_run_at, "interval": job.interval,
+        "attempts": job.attempts, "max_attempts": job.max_attempts, "status": job.status,
+        "last_error": job.last_error,
+    }
+
+
+def _process_start(pid: int) -> str:
+    """Boot id and start time (clock ticks) of a process, "" where /proc is unavailable"""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot = f.read().strip()[:8]
+        with open(f"/proc/{pid}/stat") as f:
+            # Field 22 (starttime); the command name before it may contain spaces
+            ticks = f.read().rpartition(")")[2].split()[19]
+    except (OSError, IndexError):
+        return ""
+    return f"{boot}.{ticks}"
+
+
+def default_owner() -> str:
+    """host:pid:start, so a reused pid is not mistaken for the original owner"""
+    pid = os.getpid()
+    return f"{socket.gethostname()}:{pid}:{_process_start(pid)}"
+
+
+def _owner_gone(owner: Optional[str]) -> bool:
+    """True when owner is a process on this host that no longer exists"""
+    host, pid, start = ((owner or "").split(":") + ["", ""])[:3]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False  # another machine, or unknown: wait for the lease
+    if int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    # The pid is alive: it is still the owner unless it was reused since
+    current = _process_start(int(pid))
+    return bool(start and current and start != current)
+
+
+class JobStore:
+    """SQLite (WAL) job store shared by the schedulers, and by processes on one host"""
+
+    def __init__(self, db_path: Path = None, owner: str = None, lease_seconds: float = 600,
+                 retention_days: float = 7):
+        db_path = db_path or DATA_DIR / "jobs.db"
+        self.db_path = db_path
+        self.engine = create_sqlite_engine(db_path)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds  # longest a job may run before others may take it
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+
+        self.claims = 0
+        self.contended = 0  # claims lost to another process (or already run)
+        self.recovered = 0
+
+        logger.info(f"Job store initialized at {db_path}")
+
+    # === WRITING ===
+
+    def add(self, key: str, queue: str, name: str, next_run_at: float,
+            interval: float = None, payload: Dict = None, priority: int = 0,
+            max_attempts: int = 3, replace: bool = False) -> bool:
+        """Persist a job; an existing key is kept unless replace. Returns True if written."""
+        values = {
+            "key": key, "queue": queue, "name": name, "payload": payload or {},
+            "priority": priority, "next_run_at": next_run_at, "interval": interval,
+            "attempts": 0, "max_attempts": max_attempts, "status": "pending",
+            "updated_at": time.time(),
+        }
+        stmt = insert(StoredJob).values(**values)
+        if replace:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={k: v for k, v in values.items() if k != "key"},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["key"])
+        with self.engine.begin() as conn:
+            return conn.execute(stmt).rowcount == 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        session = self.Session()
+        try:
+            job = session.get(StoredJob, key)
+            return _row(job) if job else None
+        finally:
+            session.close()
+
+    def remove(self, key: str) -> bool:
+        with self.engine.begin() as conn:
+            return conn.execute(delete(StoredJob).where(StoredJob.key == key)).rowcount == 1
+
+    # === CLAIMS ===
+
+    def claim(self, key: str, due: float = None) -> bool:
+        """
+        Take the job for this process if nobody holds it and its stored run
+        time is not after due (default now), i.e. nobody has run it since.
+        One UPDATE, so it is atomic across connections and processes.
+        """
+        now = time.time()
+        due = due if due is not None else now
+        stmt = (
+            update(StoredJob)
+            .where(
+                StoredJob.key == key,
+                StoredJob.next_run_at <= due + CLAIM_SLACK_SECONDS,
+                (StoredJob.status == "pending")
+                | ((StoredJob.status == "claimed") & (StoredJob.lease_until < now)),
+            )
+            .values(
+                status="claimed", claimed_by=self.owner, lease_until=now + self.lease_seconds,
+                attempts=StoredJob.attempts + 1, updated_at=now,
+            )
+        )
+        with self.engine.begin() as conn:
+            won = conn.execute(stmt).rowcount == 1
+        with self._lock:
+            if won:
+                self.claims += 1
+            else:
+                self.contended += 1
+        return won
+
+    def complete(self, key: str, next_run_at: float = None):
+        """Release a claimed job: reschedule it (recurring) or mark it done"""
+        values = {"claimed_by": None, "lease_until": None, "updated_at": time.time()}
+        if next_run_at is not None:
+            values.update(status="pending", next_run_at=next_run_at, attempts=0, last_error=None)
+        else:
+            values.update(status="done")
+        self._release(key, values)
+
+    def fail(self, key: str, error: str, retry_at: float = None):
+        """
+        Release a claimed job after an error. It runs again at retry_at when
+        it is recurring or has attempts left, otherwise it is marked failed.
+        """
+        session = self.Session()
+        try:
+            job = session.get(StoredJob, key)
+            if job is None or job.claimed_by != self.owner:
+                return
+            retry = retry_at is not None and (job.interval is not None or job.attempts < job.max_attempts)
+            job.status = "pending" if retry else "failed"
+            if retry:
+                job.next_run_at = retry_at
+            job.last_error = str(error)[:1000]
+            job.claimed_by = None
+            job.lease_until = None
+            job.updated_at = time.time()
+            session.commit()
+        finally:
+            session.close()
+
+    def _release(self, key: str, values: Dict):
+        stmt = (
+            update(StoredJob)
+            .where(StoredJob.key == key, StoredJob.claimed_by == self.owner)
+            .values(**values)
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    # === RECOVERY ===
+
+    def recover(self, queue: str) -> List[Dict]:
+        """
+        Startup pass for one queue: release claims of dead processes, prune old
+        finished jobs, and return the pending jobs soonest first.
+        """
+        now = time.time()
+        session = self.Session()
+        try:
+            released = 0
+            claimed = session.query(StoredJob).filter(
+                StoredJob.queue == queue, StoredJob.status == "claimed"
+            ).all()
+            for job in claimed:
+                if job.lease_until < now or _owner_gone(job.claimed_by):
+                    job.status = "pending"
+                    job.claimed_by = None
+                    job.lease_until = None
+                    released += 1
+
+            cutoff = now - self.retention_days * 86400
+            session.execute(
+                delete(StoredJob).where(
+                    StoredJob.queue == queue,
+                    StoredJob.status.in_(("done", "failed")),
+                    StoredJob.updated_at < cutoff,
+                )
+            )
+            session.commit()
+
+            pending = session.execute(
+                select(StoredJob)
+                .where(StoredJob.queue == queue, StoredJob.status == "pending")
+                .order_by(StoredJob.next_run_at)
+            ).scalars().all()
+            rows = [_row(job) for job in pending]
+        finally:
+            session.close()
+
+        self.recovered += len(rows)
+        logger.info(f"Recovered {len(rows)} pending {queue} jobs ({released} stale claims released)")
+        return rows
+
+    def get_stats(self) -> Dict:
+        session = self.Session()
+        try:
+            counts = dict(session.execute(
+                select(StoredJob.status, func.count(StoredJob.key)).group_by(StoredJob.status)
+            ).all())
+        finally:
+            session.close()
+        return {
+            "jobs": sum(counts.values()),
+            "by_status": counts,
+            "claims": self.claims,
+            "contended": self.contended,
+            "recovered": self.recovered,
+            "owner": self.owner,
+        }
+
+
+job_store = JobStore()
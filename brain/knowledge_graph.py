@@ -9,22 +9,35 @@ This allows Jephthah to:
 - Learn from what he reads
 """
 
+import heapq
 import json
+import math
+import threading
+from array import array
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Hashable, List, Optional, Any, Set, Tuple, MutableMapping
 from pathlib import Path
 from collections import defaultdict
-import re
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, Index, func, bindparam
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from loguru import logger
 
 from config.settings import DATA_DIR
+from brain.cache import LRUCache, MISSING
+from brain.storage import create_sqlite_engine
+from brain.graph_index import AdjacencyIndex
+from brain.sampling import ALL, AliasTable, WeightedSampler
+from brain.snapshot import SnapshotError, SortedStringMap, pack_strings, read_snapshot, unpack_strings, write_snapshot
+from brain.migrations import migrate
+from brain.text_analysis import AnalyzedSentence, analyze
 
 Base = declarative_base()
 
+SNAPSHOT_VERSION = 2  # 2: relationship and fact ids, restored as-is
+
 
 class Entity(Base):
     """A concept, topic, or fact in the knowledge graph"""
@@ -35,7 +48,7 @@ class Entity(Base):
     entity_type = Column(String(50), index=True)  # concept, topic, person, company, technology
     description = Column(Text)
     properties = Column(JSON, default={})  # Additional attributes
-    importance = Column(Float, default=0.5)  # 0-1 how important this entity is
+    importance = Column(Float, default=0.5, index=True)  # 0-1, kept in sync with PageRank
     access_count = Column(Integer, default=0)  # How often accessed
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -44,6 +57,9 @@ class Entity(Base):
 class Relationship(Base):
     """Connection between two entities"""
     __tablename__ = "entity_relationships"
+    __table_args__ = (
+        Index("ux_relationships_edge", "source_id", "target_id", "relationship_type", unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     source_id = Column(Integer, ForeignKey("entities.id"), index=True)
@@ -57,6 +73,9 @@ class Relationship(Base):
 class Fact(Base):
     """A learned fact or piece of information"""
     __tablename__ = "facts"
+    __table_args__ = (
+        Index("ux_facts_subject_predicate", "subject_id", "predicate", unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     subject_id = Column(Integer, ForeignKey("entities.id"), index=True)
@@ -68,21 +87,163 @@ class Fact(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+def _dedupe_and_index(conn):
+    """Merge duplicate facts/edges so the upsert unique indexes can be created"""
+    conn.exec_driver_sql(
+        "DELETE FROM facts WHERE id NOT IN "
+        "(SELECT MIN(id) FROM facts GROUP BY subject_id, predicate)"
+    )
+    conn.exec_driver_sql(
+        "DELETE FROM entity_relationships WHERE id NOT IN "
+        "(SELECT MIN(id) FROM entity_relationships GROUP BY source_id, target_id, relationship_type)"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_facts_subject_predicate ON facts (subject_id, predicate)"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_relationships_edge "
+        "ON entity_relationships (source_id, target_id, relationship_type)"
+    )
+
+
+# Columns a snapshot carries; access_count is left out so reads do not stale it
+_TRACKED_COLUMNS = {
+    "entities": "name, entity_type, description, properties, importance",
+    "entity_relationships": "source_id, target_id, relationship_type, strength, context",
+    "facts": "subject_id, predicate, object_value, confidence, source, verified",
+}
+
+
+def _change_counter(conn):
+    """One-row counter bumped by triggers on every write a snapshot would miss"""
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS graph_changes (id INTEGER PRIMARY KEY, counter INTEGER NOT NULL)"
+    )
+    conn.exec_driver_sql("INSERT OR IGNORE INTO graph_changes (id, counter) VALUES (1, 0)")
+    for table, columns in _TRACKED_COLUMNS.items():
+        for event in ("INSERT", "DELETE", f"UPDATE OF {columns}"):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_{event.split()[0].lower()}_changes "
+                f"AFTER {event} ON {table} "
+                "BEGIN UPDATE graph_changes SET counter = counter + 1 WHERE id = 1; END"
+            )
+
+
+KNOWLEDGE_MIGRATIONS = [
+    (1, "unique keys for fact and relationship upserts", [_dedupe_and_index]),
+    (2, "importance index for central topic lookups", [
+        "CREATE INDEX IF NOT EXISTS ix_entities_importance ON entities (importance)",
+    ]),
+    (3, "change counter for snapshot fingerprints", [_change_counter]),
+]
+
+_UPDATE_IMPORTANCE = Entity.__table__.update().where(
+    Entity.id == bindparam("entity_id")
+).values(importance=bindparam("new_importance"))
+_ADD_ACCESS = Entity.__table__.update().where(
+    Entity.id == bindparam("entity_id")
+).values(access_count=Entity.access_count + bindparam("hits"))
+
+
+# === EXTRACTION ===
+# Module-level and side-effect free so it can run in worker processes
+
+def extract_from_sentences(sentences: List[AnalyzedSentence]) -> Dict[str, list]:
+    """
+    Collect entities, facts and co-occurrence relationships from analyzed
+    sentences. Facts are (subject, predicate, object); relationships link
+    consecutive entities mentioned in the same sentence.
+    """
+    entities: Dict[str, None] = {}
+    facts = []
+    relationships = []
+    for sentence in sentences:
+        entities.update(dict.fromkeys(sentence.entities))
+        facts.extend(sentence.facts)
+        for a, b in zip(sentence.entities, sentence.entities[1:]):
+            relationships.append((a, b, "related_to"))
+    return {"entities": list(entities), "facts": facts, "relationships": relationships}
+
+
+def extract_knowledge(text: str) -> Dict[str, list]:
+    """Extract knowledge from one whole document"""
+    return extract_from_sentences(list(analyze(text)))
+
+
+def entity_weight(importance: Optional[float], access_count: Optional[int]) -> float:
+    """Sampling weight: importance, boosted logarithmically by how often it's used"""
+    return max(importance if importance is not None else 0.5, 0.01) * (1.0 + math.log1p(access_count or 0))
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 class KnowledgeGraph:
     """
     Neural-like knowledge storage that grows and improves over time.
     Allows content generation from pure memory without API calls.
     """
     
-    def __init__(self):
-        db_path = DATA_DIR / "knowledge_graph.db"
-        self.engine = create_engine(f"sqlite:///{db_path}")
+    def __init__(self, db_path: Path = None, snapshot_path: Path = None,
+                 bundle_cache_size: int = 1024, bundle_ttl: float = 300,
+                 access_flush_every: int = 200):
+        db_path = db_path or DATA_DIR / "knowledge_graph.db"
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.engine = create_sqlite_engine(db_path)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        migrate(self.engine, KNOWLEDGE_MIGRATIONS, "knowledge_graph.db")
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         
         # In-memory cache for fast access
-        self._entity_cache: Dict[str, int] = {}
-        self._load_cache()
+        self._entity_cache: MutableMapping[str, int] = {}
+        self._entity_names: Dict[int, str] = {}
+        
+        # In-memory adjacency so traversals never touch SQLite
+        self.graph = AdjacencyIndex()
+        
+        # Alias-table sampler for get_random_knowledge. Writes go through
+        # _sampler_add; while _load_sampler rebuilds it they are also logged
+        # and replayed onto the new sampler before the swap.
+        self.sampler = WeightedSampler()
+        self._sampler_lock = threading.Lock()
+        self._sampler_rebuild_lock = threading.Lock()
+        self._sampler_log: Optional[List[tuple]] = None
+        
+        # Latest PageRank scores by entity id (filled by brain.centrality)
+        self.centrality: Dict[int, float] = {}
+        
+        # get_knowledge_about bundles, dropped when their topic entity or one
+        # of its neighbors is written (or after bundle_ttl seconds).
+        # _bundle_deps maps entity id (or the name of a topic with no entity
+        # yet) -> bundle keys built from it.
+        self.bundles = LRUCache(maxsize=bundle_cache_size, ttl=bundle_ttl)
+        self._bundle_deps: Dict[Hashable, Set[tuple]] = defaultdict(set)
+        self._bundle_lock = threading.Lock()
+        self._bundle_generation = 0
+        
+        # Entity access counts, summed here and written in batches on a
+        # background thread instead of a commit per lookup
+        self._access_counts: Dict[int, int] = {}
+        self._access_pending = 0
+        self._access_flush_every = access_flush_every
+        self._access_lock = threading.Lock()
+        self._access_flusher: Optional[threading.Thread] = None
+        
+        # Mapped snapshot backing the zero-copy arrays above (if loaded)
+        self._snapshot_map = None
+        
+        if snapshot_path and Path(snapshot_path).exists() and self.load_snapshot(snapshot_path):
+            # Single use: counts can't see in-place updates (strength, importance)
+            # made after this point, so a crash must not leave it to be reloaded.
+            # A clean shutdown exports a fresh one.
+            Path(snapshot_path).unlink()
+        else:
+            self._load_cache()
+            self._load_graph()
+            self._load_sampler()
         
         logger.info(f"Knowledge Graph initialized at {db_path}")
     
@@ -92,9 +253,55 @@ class KnowledgeGraph:
         try:
             entities = session.query(Entity.id, Entity.name).all()
             self._entity_cache = {e.name.lower(): e.id for e in entities}
+            self._entity_names = {e.id: e.name for e in entities}
         finally:
             session.close()
     
+    def _load_graph(self):
+        """
+        Build the CSR adjacency index from entity_relationships. The index is
+        undirected: A->B and B->A of one type load as one edge, the stronger.
+        """
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT MIN(source_id, target_id), MAX(source_id, target_id), relationship_type, "
+                "MAX(strength) FROM entity_relationships GROUP BY 1, 2, 3"
+            )
+            self.graph.build(rows)
+    
+    def _load_sampler(self):
+        """Build the weighted entity sampler from importance / access_count"""
+        with self._sampler_rebuild_lock:
+            with self._sampler_lock:
+                self._sampler_log = []
+            sampler = WeightedSampler()
+            try:
+                with self.engine.connect() as conn:
+                    rows = conn.exec_driver_sql(
+                        "SELECT id, entity_type, importance, access_count FROM entities"
+                    )
+                    sampler.load(
+                        (entity_id, entity_weight(importance, accessed), entity_type)
+                        for entity_id, entity_type, importance, accessed in rows
+                    )
+            except Exception:
+                with self._sampler_lock:
+                    self._sampler_log = None
+                raise
+            # Swap in whole so concurrent samplers never see a half-loaded table;
+            # writes made while it was built (maybe after its read) are replayed
+            with self._sampler_lock:
+                for entity_id, weight, entity_type in self._sampler_log:
+                    sampler.add(entity_id, weight, entity_type)
+                self._sampler_log = None
+                self.sampler = sampler
+    
+    def _sampler_add(self, entity_id: int, weight: float, entity_type: str):
+        with self._sampler_lock:
+            self.sampler.add(entity_id, weight, entity_type)
+            if self._sampler_log is not None:
+                self._sampler_log.append((entity_id, weight, entity_type))
+    
     # === ENTITY MANAGEMENT ===
     
     def add_entity(self, name: str, entity_type: str, description: str = "",
@@ -118,6 +325,9 @@ class KnowledgeGraph:
             session.commit()
             
             self._entity_cache[name_lower] = entity.id
+            self._entity_names[entity.id] = entity.name
+            self._sampler_add(entity.id, entity_weight(importance, 0), entity_type)
+            self._invalidate_bundles([name_lower])
             logger.debug(f"Added entity: {name} ({entity_type})")
             return entity.id
         finally:
@@ -132,7 +342,7 @@ class KnowledgeGraph:
             ).first()
             if entity:
                 entity.access_count += 1
-                session.commit()
+                self._count_access([entity.id])
             return entity
         finally:
             session.close()
@@ -169,6 +379,8 @@ class KnowledgeGraph:
                 # Strengthen existing relationship
                 existing.strength = min(1.0, existing.strength + 0.1)
                 session.commit()
+                self.graph.add_edge(source_id, target_id, rel_type, existing.strength)
+                self._invalidate_bundles([source_id, target_id])
                 return True
             
             rel = Relationship(
@@ -180,6 +392,8 @@ class KnowledgeGraph:
             )
             session.add(rel)
             session.commit()
+            self.graph.add_edge(source_id, target_id, rel_type, strength)
+            self._invalidate_bundles([source_id, target_id])
             return True
         finally:
             session.close()
@@ -191,26 +405,36 @@ class KnowledgeGraph:
         if not entity_id:
             return []
         
+        neighbors = self.graph.neighbors(entity_id, rel_type=rel_type, limit=limit)
+        if not neighbors:
+            return []
+        
+        # One query for all neighbors instead of one per neighbor
+        entities = self._entities_by_id([other_id for other_id, _, _ in neighbors])
+        return [
+            (entities[other_id], rel, strength)
+            for other_id, rel, strength in neighbors if other_id in entities
+        ]
+    
+    def get_neighborhood(self, entity_name: str, depth: int = 2,
+                         limit: int = 20) -> List[Tuple[str, float, int]]:
+        """
+        Multi-hop related entity names ranked by path strength, as
+        (name, score, hops). Served entirely from the in-memory index.
+        """
+        entity_id = self._entity_cache.get(entity_name.lower())
+        if not entity_id:
+            return []
+        return [
+            (self._entity_names[other_id], score, hops)
+            for other_id, score, hops in self.graph.neighborhood(entity_id, depth=depth, limit=limit)
+            if other_id in self._entity_names
+        ]
+    
+    def _entities_by_id(self, ids: List[int]) -> Dict[int, Entity]:
         session = self.Session()
         try:
-            query = session.query(Relationship).filter(
-                (Relationship.source_id == entity_id) | 
-                (Relationship.target_id == entity_id)
-            )
-            
-            if rel_type:
-                query = query.filter_by(relationship_type=rel_type)
-            
-            relationships = query.order_by(Relationship.strength.desc()).limit(limit).all()
-            
-            results = []
-            for rel in relationships:
-                other_id = rel.target_id if rel.source_id == entity_id else rel.source_id
-                other_entity = session.query(Entity).filter_by(id=other_id).first()
-                if other_entity:
-                    results.append((other_entity, rel.relationship_type, rel.strength))
-            
-            return results
+            return {e.id: e for e in session.query(Entity).filter(Entity.id.in_(ids))}
         finally:
             session.close()
     
@@ -236,6 +460,7 @@ class KnowledgeGraph:
                 existing.verified += 1
                 existing.confidence = min(1.0, existing.confidence + 0.05)
                 session.commit()
+                self._invalidate_bundles([subject_id])
                 return True
             
             fact = Fact(
@@ -247,6 +472,7 @@ class KnowledgeGraph:
             )
             session.add(fact)
             session.commit()
+            self._invalidate_bundles([subject_id])
             return True
         finally:
             session.close()
@@ -256,22 +482,25 @@ class KnowledgeGraph:
         subject_id = self._entity_cache.get(subject.lower())
         if not subject_id:
             return []
-        
+        return self._facts_by_subject([subject_id]).get(subject_id, [])
+    
+    def _facts_by_subject(self, subject_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Facts for several entities in one query, each list ordered by confidence"""
         session = self.Session()
         try:
-            facts = session.query(Fact).filter_by(subject_id=subject_id).order_by(
+            facts = session.query(Fact).filter(Fact.subject_id.in_(subject_ids)).order_by(
                 Fact.confidence.desc()
             ).all()
             
-            return [
-                {
+            grouped: Dict[int, List[Dict]] = defaultdict(list)
+            for f in facts:
+                grouped[f.subject_id].append({
                     "predicate": f.predicate,
                     "value": f.object_value,
                     "confidence": f.confidence,
                     "verified": f.verified
-                }
-                for f in facts
-            ]
+                })
+            return grouped
         finally:
             session.close()
     
@@ -279,79 +508,534 @@ class KnowledgeGraph:
     
     def learn_from_text(self, text: str, source: str = "web") -> int:
         """Extract entities, relationships, and facts from text"""
+        return self.learn_from_texts([text], source=source)
+    
+    def learn_from_texts(self, texts: List[str], source: str = "web",
+                         batch_size: int = 200) -> int:
+        """
+        Bulk ingestion: extract from many documents, dedupe in memory and
+        upsert each batch in one transaction.
+        """
+        extracted = [extract_knowledge(t) for t in texts]
+        
         learned_count = 0
+        for batch in _chunks(extracted, batch_size):
+            learned_count += self._ingest_batch(batch, source)
         
-        # Extract key terms (simple approach - can be enhanced)
-        words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        
-        for word in set(words):
-            if len(word) > 2:
-                self.add_entity(word, "concept", source=source)
-                learned_count += 1
-        
-        # Extract patterns like "X is Y" or "X are Y"
-        is_patterns = re.findall(r'(\w+)\s+(?:is|are)\s+(?:a|an|the)?\s*(\w+)', text.lower())
-        for subject, obj in is_patterns:
-            if len(subject) > 2 and len(obj) > 2:
-                self.add_fact(subject, "is_a", obj, source=source)
-                learned_count += 1
-        
-        # Extract "used for" patterns
-        used_for = re.findall(r'(\w+)\s+(?:is used for|used for|for)\s+(\w+)', text.lower())
-        for subject, purpose in used_for:
-            if len(subject) > 2 and len(purpose) > 2:
-                self.add_fact(subject, "used_for", purpose, source=source)
-                learned_count += 1
-        
-        logger.info(f"Learned {learned_count} items from text ({source})")
+        logger.info(f"Learned {learned_count} items from {len(texts)} text(s) ({source})")
         return learned_count
     
+    def learn_from_sentences(self, sentences: List[AnalyzedSentence], source: str = "web") -> int:
+        """Learner hook for text_analysis.feed_learners (one batch, one transaction)"""
+        return self._ingest_batch([extract_from_sentences(sentences)], source)
+    
+    def _ingest_batch(self, batch: List[Dict[str, list]], source: str) -> int:
+        """Merge extracted items and write them with INSERT ... ON CONFLICT"""
+        entities: Dict[str, str] = {}
+        facts: Dict[Tuple[str, str], list] = {}
+        relationships: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        learned = 0
+        
+        for doc in batch:
+            for name in doc["entities"]:
+                entities.setdefault(name.lower().strip(), name)
+            for subject, predicate, obj in doc["facts"]:
+                entities.setdefault(subject.lower(), subject)  # facts auto-create entities
+                entry = facts.setdefault((subject.lower(), predicate), [obj, 0])
+                entry[1] += 1
+            for a, b, rel_type in doc["relationships"]:
+                relationships[(a.lower(), b.lower(), rel_type)] += 1
+            learned += len(doc["entities"]) + len(doc["facts"])
+        
+        session = self.Session()
+        try:
+            new_names = [name for key, name in entities.items() if key not in self._entity_cache]
+            for chunk in _chunks(new_names, 500):
+                session.execute(insert(Entity).values([
+                    {"name": name, "entity_type": "concept", "description": "",
+                     "properties": {}, "importance": 0.5,
+                     "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+                    for name in chunk
+                ]).on_conflict_do_nothing(index_elements=["name"]))
+                for entity_id, name in session.query(Entity.id, Entity.name).filter(Entity.name.in_(chunk)):
+                    self._entity_cache.setdefault(name.lower(), entity_id)
+                    self._entity_names[entity_id] = name
+                    if entity_id not in self.sampler:
+                        self._sampler_add(entity_id, entity_weight(0.5, 0), "concept")
+            
+            fact_rows = [
+                {"subject_id": self._entity_cache[subject], "predicate": predicate,
+                 "object_value": obj, "confidence": min(1.0, 0.8 + 0.05 * (count - 1)),
+                 "source": source, "verified": count - 1, "created_at": datetime.utcnow()}
+                for (subject, predicate), (obj, count) in facts.items()
+                if subject in self._entity_cache
+            ]
+            for chunk in _chunks(fact_rows, 500):
+                stmt = insert(Fact).values(chunk)
+                session.execute(stmt.on_conflict_do_update(
+                    index_elements=["subject_id", "predicate"],
+                    set_={
+                        "verified": Fact.verified + stmt.excluded.verified + 1,
+                        "confidence": func.min(1.0, Fact.confidence + 0.05 * (stmt.excluded.verified + 1)),
+                    }
+                ))
+            
+            rel_rows = [
+                {"source_id": self._entity_cache[a], "target_id": self._entity_cache[b],
+                 "relationship_type": rel_type, "strength": min(1.0, 0.3 + 0.1 * (count - 1)),
+                 "context": source, "created_at": datetime.utcnow()}
+                for (a, b, rel_type), count in relationships.items()
+                if a in self._entity_cache and b in self._entity_cache
+            ]
+            edges = []
+            for chunk in _chunks(rel_rows, 500):
+                stmt = insert(Relationship).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["source_id", "target_id", "relationship_type"],
+                    set_={"strength": func.min(1.0, Relationship.strength + 0.1 + (stmt.excluded.strength - 0.3))}
+                ).returning(Relationship.source_id, Relationship.target_id,
+                            Relationship.relationship_type, Relationship.strength)
+                edges.extend(session.execute(stmt).all())
+            
+            session.commit()
+        finally:
+            session.close()
+        
+        for source_id, target_id, rel_type, strength in edges:
+            self.graph.add_edge(source_id, target_id, rel_type, strength)
+        
+        touched = {name.lower().strip() for name in new_names}
+        touched.update(row["subject_id"] for row in fact_rows)
+        for source_id, target_id, _, _ in edges:
+            touched.update((source_id, target_id))
+        self._invalidate_bundles(touched)
+        
+        return learned
+    
     # === CONTENT RETRIEVAL ===
     
     def get_knowledge_about(self, topic: str, depth: int = 2) -> Dict:
         """Get comprehensive knowledge about a topic for content generation"""
-        result = {
-            "topic": topic,
-            "description": "",
-            "facts": [],
-            "related_topics": [],
-            "related_facts": []
+        return self.get_knowledge_about_many([topic], depth=depth)[topic]
+    
+    def get_knowledge_about_many(self, topics: List[str], depth: int = 2,
+                                 related_limit: int = 10) -> Dict[str, Dict]:
+        """
+        get_knowledge_about for a batch of topics. Bundles are served from the
+        bundle cache; misses are built together with a fixed number of queries
+        (entities, facts) however many topics there are. Neighborhoods come
+        from the in-memory index.
+        """
+        results = {}
+        missing = []
+        for topic in dict.fromkeys(topics):
+            bundle = self.bundles.get((topic, depth, related_limit))
+            if bundle is MISSING:
+                missing.append(topic)
+            else:
+                results[topic] = bundle
+        if missing:
+            results.update(self._build_bundles(missing, depth, related_limit))
+        
+        self._count_access([
+            entity_id for entity_id in (self._entity_cache.get(t.lower().strip()) for t in topics)
+            if entity_id
+        ])
+        return results
+    
+    def _build_bundles(self, topics: List[str], depth: int, related_limit: int) -> Dict[str, Dict]:
+        generation = self._bundle_generation
+        topic_ids = {topic: self._entity_cache.get(topic.lower().strip()) for topic in topics}
+        neighbors = {
+            entity_id: self.graph.neighbors(entity_id, limit=related_limit)
+            for entity_id in set(topic_ids.values()) if entity_id
         }
         
-        entity = self.get_entity(topic)
-        if entity:
-            result["description"] = entity.description
-        
-        result["facts"] = self.get_facts(topic)
-        
-        # Get related entities
-        related = self.get_related_entities(topic, limit=10)
-        for ent, rel_type, strength in related:
-            result["related_topics"].append({
-                "name": ent.name,
-                "type": ent.entity_type,
-                "relationship": rel_type,
-                "description": ent.description[:200] if ent.description else ""
-            })
-            
-            # Get facts about related entities
-            if depth > 1:
-                related_facts = self.get_facts(ent.name)[:3]
-                result["related_facts"].extend(related_facts)
+        ids = set(neighbors)
+        for row in neighbors.values():
+            ids.update(other_id for other_id, _, _ in row)
+        entities = self._entities_by_id(list(ids)) if ids else {}
+        
+        fact_ids = [entity_id for entity_id in neighbors if entity_id in entities]
+        if depth > 1:
+            fact_ids += [other_id for row in neighbors.values() for other_id, _, _ in row]
+        facts = self._facts_by_subject(list(set(fact_ids))) if fact_ids else {}
         
-        return result
+        results = {}
+        for topic, entity_id in topic_ids.items():
+            result = {
+                "topic": topic,
+                "description": "",
+                "facts": [],
+                "related_topics": [],
+                "related_facts": []
+            }
+            deps = [entity_id] if entity_id else [topic.lower().strip()]
+            entity = entities.get(entity_id)
+            if entity:
+                result["description"] = entity.description
+                result["facts"] = facts.get(entity_id, [])
+                for other_id, rel_type, strength in neighbors[entity_id]:
+                    ent = entities.get(other_id)
+                    if ent is None:
+                        continue
+                    deps.append(other_id)
+                    result["related_topics"].append({
+                        "name": ent.name,
+                        "type": ent.entity_type,
+                        "relationship": rel_type,
+                        "description": ent.description[:200] if ent.description else ""
+                    })
+                    
+                    # Get facts about related entities
+                    if depth > 1:
+                        result["related_facts"].extend(facts.get(other_id, [])[:3])
+            results[topic] = result
+            self._cache_bundle((topic, depth, related_limit), result, deps, generation)
+        return results
+    
+    def get_random_knowledge(self, entity_type: str = None, limit: int = 5,
+                             weighted: bool = True) -> List[Entity]:
+        """
+        Get random entities for content inspiration. Sampled from the in-memory
+        alias table (favoring important, often-used entities unless weighted=False),
+        then loaded with a single IN query.
+        """
+        ids = self.sampler.sample(limit, group=entity_type if entity_type else ALL, weighted=weighted)
+        if not ids:
+            return []
+        entities = self._entities_by_id(ids)
+        return [entities[entity_id] for entity_id in ids if entity_id in entities]
     
-    def get_random_knowledge(self, entity_type: str = None, limit: int = 5) -> List[Entity]:
-        """Get random entities for content inspiration"""
+    def get_central_entities(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Most central entities as (name, pagerank), from the in-memory scores"""
+        if not self.centrality:
+            session = self.Session()
+            try:
+                rows = session.query(Entity.name, Entity.importance).order_by(
+                    Entity.importance.desc()
+                ).limit(limit).all()
+                return [(name, importance) for name, importance in rows]
+            finally:
+                session.close()
+        
+        top = heapq.nlargest(limit, self.centrality.items(), key=lambda item: item[1])
+        return [(self._entity_names[entity_id], score) for entity_id, score in top
+                if entity_id in self._entity_names]
+    
+    def apply_centrality(self, scores: Dict[int, float], importance: Dict[int, float],
+                         min_change: float = 0.01) -> int:
+        """Store PageRank scores and bulk-write changed importance values"""
         session = self.Session()
         try:
-            from sqlalchemy.sql.expression import func
-            query = session.query(Entity)
-            if entity_type:
-                query = query.filter_by(entity_type=entity_type)
-            return query.order_by(func.random()).limit(limit).all()
+            current = dict(session.query(Entity.id, Entity.importance))
         finally:
             session.close()
+        
+        rows = [
+            {"entity_id": entity_id, "new_importance": value}
+            for entity_id, value in importance.items()
+            if entity_id in current and abs((current[entity_id] or 0) - value) >= min_change
+        ]
+        if rows:
+            with self.engine.begin() as conn:
+                conn.execute(_UPDATE_IMPORTANCE, rows)
+        
+        self.centrality = scores
+        if rows:
+            self._load_sampler()
+        return len(rows)
+    
+    # === BUNDLE CACHE ===
+    
+    def _cache_bundle(self, key: tuple, bundle: Dict, deps: List[Hashable], generation: int):
+        with self._bundle_lock:
+            # A write landed while this bundle was being built; it may be stale
+            if generation != self._bundle_generation:
+                return
+            if len(self._bundle_deps) > 16 * self.bundles.maxsize:
+                # Dependencies of expired/evicted bundles pile up; start over
+                self.bundles.clear()
+                self._bundle_deps.clear()
+            self.bundles.set(key, bundle)
+            for dep in deps:
+                self._bundle_deps[dep].add(key)
+    
+    def _invalidate_bundles(self, deps):
+        """Drop bundles built from these entity ids / topic names"""
+        with self._bundle_lock:
+            self._bundle_generation += 1
+            for dep in deps:
+                for key in self._bundle_deps.pop(dep, ()):
+                    self.bundles.invalidate(key)
+    
+    # === ACCESS COUNTS ===
+    
+    def _count_access(self, entity_ids: List[int]):
+        """Record lookups; a full batch is written on a background thread"""
+        if not entity_ids:
+            return
+        with self._access_lock:
+            for entity_id in entity_ids:
+                self._access_counts[entity_id] = self._access_counts.get(entity_id, 0) + 1
+            self._access_pending += len(entity_ids)
+            if self._access_pending < self._access_flush_every:
+                return
+            if self._access_flusher is not None and self._access_flusher.is_alive():
+                return
+            self._access_flusher = threading.Thread(
+                target=self._flush_access_background, name="kg-access-flush", daemon=True
+            )
+            self._access_flusher.start()
+    
+    def _flush_access_background(self):
+        try:
+            self.flush_access_counts()
+        except Exception as e:
+            logger.error(f"Knowledge graph access flush failed: {e}")
+    
+    def flush_access_counts(self) -> int:
+        """Write accumulated access counts in one batched UPDATE and refresh sampler weights"""
+        with self._access_lock:
+            counts, self._access_counts = self._access_counts, {}
+            self._access_pending = 0
+        if not counts:
+            return 0
+        
+        with self.engine.begin() as conn:
+            conn.execute(_ADD_ACCESS, [
+                {"entity_id": entity_id, "hits": hits} for entity_id, hits in counts.items()
+            ])
+            rows = conn.execute(
+                Entity.__table__.select().with_only_columns(
+                    Entity.id, Entity.entity_type, Entity.importance, Entity.access_count
+                ).where(Entity.id.in_(list(counts)))
+            ).all()
+        for entity_id, entity_type, importance, accessed in rows:
+            self._sampler_add(entity_id, entity_weight(importance, accessed), entity_type)
+        return len(counts)
+    
+    # === SNAPSHOTS ===
+    
+    def _fingerprint(self) -> Dict:
+        """Cheap summary of the tables, used to tell whether a snapshot is current"""
+        with self.engine.connect() as conn:
+            entities, max_entity = conn.exec_driver_sql(
+                "SELECT count(*), max(id) FROM entities").one()
+            relationships, max_relationship = conn.exec_driver_sql(
+                "SELECT count(*), max(id) FROM entity_relationships").one()
+            facts, max_fact = conn.exec_driver_sql("SELECT count(*), max(id) FROM facts").one()
+            last_entity = conn.exec_driver_sql(
+                "SELECT name FROM entities WHERE id = ?", (max_entity,)).scalar()
+            last_edge = conn.exec_driver_sql(
+                "SELECT source_id, target_id FROM entity_relationships WHERE id = ?",
+                (max_relationship,)).first()
+            # Catches in-place updates (strength, importance, ...) the counts cannot
+            changes = conn.exec_driver_sql("SELECT counter FROM graph_changes WHERE id = 1").scalar()
+        return {
+            "entities": entities, "max_entity_id": max_entity or 0, "last_entity": last_entity,
+            "relationships": relationships, "max_relationship_id": max_relationship or 0,
+            "last_edge": list(last_edge) if last_edge else None,
+            "facts": facts, "max_fact_id": max_fact or 0,
+            "changes": changes or 0,
+        }
+    
+    def export_snapshot(self, path: Path = None) -> Path:
+        """
+        Write entities, the packed edge list, the CSR adjacency, sampler tables
+        and facts to one memory-mappable file (see brain.snapshot).
+        """
+        path = Path(path or self.snapshot_path or Path(self.db_path).with_suffix(".snap"))
+        self.flush_access_counts()
+        if self.graph.pending_edges:
+            self.graph.rebuild()
+        graph = self.graph
+        rel_code = {rel_type: code for code, rel_type in enumerate(graph.rel_types)}
+        
+        with self.engine.connect() as conn:
+            entities = conn.exec_driver_sql(
+                "SELECT id, name, entity_type, description, properties, importance, access_count "
+                "FROM entities ORDER BY id").all()
+            relationships = conn.exec_driver_sql(
+                "SELECT source_id, target_id, relationship_type, strength, context, id "
+                "FROM entity_relationships ORDER BY id").all()
+            facts = conn.exec_driver_sql(
+                "SELECT subject_id, predicate, object_value, confidence, source, verified, id "
+                "FROM facts ORDER BY id").all()
+        fingerprint = self._fingerprint()
+        
+        entity_types = sorted({row[2] for row in entities}, key=lambda t: (t is None, t or ""))
+        type_code = {entity_type: code for code, entity_type in enumerate(entity_types)}
+        for row in relationships:
+            rel_code.setdefault(row[2], len(rel_code))
+        rel_types = sorted(rel_code, key=rel_code.get)
+        
+        ids = array("q", (row[0] for row in entities))
+        lookup = sorted(self._entity_cache.items())
+        sections = {
+            "entity.id": ids,
+            "entity.type": array("i", (type_code[row[2]] for row in entities)),
+            "entity.importance": array("d", (row[5] if row[5] is not None else 0.5 for row in entities)),
+            "entity.access_count": array("q", (row[6] or 0 for row in entities)),
+            "entity.name": pack_strings(row[1] for row in entities),
+            "entity.description": pack_strings(row[3] for row in entities),
+            "entity.properties": pack_strings(row[4] for row in entities),
+            "entity.lookup_key": pack_strings(key for key, _ in lookup),
+            "entity.lookup_id": array("q", (entity_id for _, entity_id in lookup)),
+            "entity.weight": array("d", (
+                self.sampler.weight(row[0], entity_weight(row[5], row[6])) for row in entities
+            )),
+            "edge.source": array("q", (row[0] for row in relationships)),
+            "edge.target": array("q", (row[1] for row in relationships)),
+            "edge.type": array("i", (rel_code[row[2]] for row in relationships)),
+            "edge.strength": array("d", (row[3] if row[3] is not None else 0.5 for row in relationships)),
+            "edge.context": pack_strings(row[4] for row in relationships),
+            "edge.id": array("q", (row[5] for row in relationships)),
+            "csr.indptr": graph.indptr,
+            "csr.indices": graph.indices,
+            "csr.weights": graph.weights,
+            "csr.rel_codes": graph.rel_codes,
+            "fact.subject": array("q", (row[0] for row in facts)),
+            "fact.predicate": pack_strings(row[1] for row in facts),
+            "fact.object": pack_strings(row[2] for row in facts),
+            "fact.confidence": array("d", (row[3] or 0.0 for row in facts)),
+            "fact.source": pack_strings(row[4] for row in facts),
+            "fact.verified": array("q", (row[5] or 0 for row in facts)),
+            "fact.id": array("q", (row[6] for row in facts)),
+        }
+        if self.centrality:
+            sections["entity.centrality"] = array("d", (self.centrality.get(i, 0.0) for i in ids))
+        
+        sampler_groups = []
+        for index, (key, table) in enumerate(self.sampler.tables().items()):
+            sampler_groups.append({"all": key is ALL, "key": None if key is ALL else key,
+                                   "total": table.total})
+            sections[f"sampler.{index}.ids"] = table.ids
+            sections[f"sampler.{index}.prob"] = table.prob
+            sections[f"sampler.{index}.alias"] = table.alias
+        
+        write_snapshot(path, SNAPSHOT_VERSION, {
+            "created_at": datetime.utcnow().isoformat(),
+            "fingerprint": fingerprint,
+            "entity_types": entity_types,
+            "rel_types": rel_types,
+            "csr_edges": graph.edge_count,
+            "sampler_groups": sampler_groups,
+        }, sections)
+        logger.info(f"Exported knowledge snapshot: {len(entities)} entities, "
+                    f"{len(relationships)} relationships, {len(facts)} facts -> {path}")
+        return path
+    
+    def load_snapshot(self, path: Path) -> bool:
+        """
+        Map a snapshot and adopt it as the in-memory state. An empty database is
+        restored from it first (new host); if the database's row counts or change
+        counter no longer match the snapshot, nothing is loaded and False is returned.
+        """
+        try:
+            meta, sections, mapping = read_snapshot(path, SNAPSHOT_VERSION)
+        except (OSError, ValueError, SnapshotError) as e:
+            logger.warning(f"Ignoring knowledge snapshot {path}: {e}")
+            return False
+        
+        fingerprint = self._fingerprint()
+        if fingerprint["entities"] == 0 and meta["fingerprint"]["entities"]:
+            self._restore_from_snapshot(meta, sections)
+            fingerprint = self._fingerprint()
+        if fingerprint != meta["fingerprint"]:
+            logger.warning(f"Knowledge snapshot {path} is stale, loading from the database")
+            return False
+        
+        ids = sections["entity.id"].tolist()
+        self._entity_names = dict(zip(ids, unpack_strings(sections["entity.name"], len(ids))))
+        # Lowercase names are stored pre-sorted: no hashing a million keys on load
+        lookup_ids = sections["entity.lookup_id"]
+        self._entity_cache = SortedStringMap(
+            unpack_strings(sections["entity.lookup_key"], len(lookup_ids)), lookup_ids)
+        
+        self.graph.load_arrays(sections["csr.indptr"], sections["csr.indices"], sections["csr.weights"],
+                               sections["csr.rel_codes"], meta["rel_types"], meta["csr_edges"])
+        
+        entity_types = meta["entity_types"]
+        tables = {
+            ALL if group["all"] else group["key"]: AliasTable.from_arrays(
+                sections[f"sampler.{index}.ids"], sections[f"sampler.{index}.prob"],
+                sections[f"sampler.{index}.alias"], group["total"])
+            for index, group in enumerate(meta["sampler_groups"])
+        }
+        weights, types = sections["entity.weight"], sections["entity.type"]
+        sampler = WeightedSampler()
+        sampler.restore(tables, lambda: (
+            dict(zip(ids, weights.tolist())),
+            dict(zip(ids, [entity_types[code] for code in types.tolist()])),
+        ))
+        with self._sampler_lock:
+            self.sampler = sampler
+        
+        if "entity.centrality" in sections:
+            self.centrality = dict(zip(ids, sections["entity.centrality"].tolist()))
+        
+        self._snapshot_map = mapping
+        logger.info(f"Loaded knowledge snapshot {path} ({len(ids)} entities, {meta['csr_edges']} edges)")
+        return True
+    
+    def _restore_from_snapshot(self, meta: Dict, sections: Dict[str, memoryview]):
+        """Bulk-insert a snapshot's tables into an empty database"""
+        entity_count = meta["fingerprint"]["entities"]
+        edge_count = len(sections["edge.source"])
+        fact_count = len(sections["fact.subject"])
+        entity_types = meta["entity_types"]
+        rel_types = meta["rel_types"]
+        now = datetime.utcnow()
+        
+        entities = zip(
+            sections["entity.id"].tolist(),
+            unpack_strings(sections["entity.name"], entity_count),
+            (entity_types[code] for code in sections["entity.type"].tolist()),
+            unpack_strings(sections["entity.description"], entity_count),
+            (properties or None for properties in unpack_strings(sections["entity.properties"], entity_count)),
+            sections["entity.importance"].tolist(),
+            sections["entity.access_count"].tolist(),
+        )
+        # Original primary keys, so the fingerprint (max ids) matches again
+        relationships = zip(
+            sections["edge.id"].tolist(),
+            sections["edge.source"].tolist(),
+            sections["edge.target"].tolist(),
+            (rel_types[code] for code in sections["edge.type"].tolist()),
+            sections["edge.strength"].tolist(),
+            unpack_strings(sections["edge.context"], edge_count),
+        )
+        facts = zip(
+            sections["fact.id"].tolist(),
+            sections["fact.subject"].tolist(),
+            unpack_strings(sections["fact.predicate"], fact_count),
+            unpack_strings(sections["fact.object"], fact_count),
+            sections["fact.confidence"].tolist(),
+            unpack_strings(sections["fact.source"], fact_count),
+            sections["fact.verified"].tolist(),
+        )
+        
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO entities (id, name, entity_type, description, properties, importance, "
+                "access_count, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now, now) for row in entities])
+            if edge_count:
+                conn.exec_driver_sql(
+                    "INSERT INTO entity_relationships (id, source_id, target_id, relationship_type, "
+                    "strength, context, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [row + (now,) for row in relationships])
+            if fact_count:
+                conn.exec_driver_sql(
+                    "INSERT INTO facts (id, subject_id, predicate, object_value, confidence, source, "
+                    "verified, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row + (now,) for row in facts])
+            # The inserts above bumped the counter; the data now matches the snapshot's
+            conn.exec_driver_sql("UPDATE graph_changes SET counter = ? WHERE id = 1",
+                                 (meta["fingerprint"].get("changes", 0),))
+        logger.info(f"Restored {entity_count} entities, {edge_count} relationships and "
+                    f"{fact_count} facts from snapshot")
     
     # === STATISTICS ===
     
@@ -363,15 +1047,13 @@ class KnowledgeGraph:
                 "entities": session.query(Entity).count(),
                 "relationships": session.query(Relationship).count(),
                 "facts": session.query(Fact).count(),
-                "top_entities": [
-                    e.name for e in session.query(Entity).order_by(
-                        Entity.access_count.desc()
-                    ).limit(10).all()
-                ]
+                "indexed_edges": self.graph.edge_count,
+                "sampler": self.sampler.get_stats(),
+                "top_entities": [name for name, _ in self.get_central_entities(10)]
             }
         finally:
             session.close()
 
 
 # Global knowledge graph instance
-knowledge_graph = KnowledgeGraph()
+knowledge_graph = KnowledgeGraph(snapshot_path=DATA_DIR / "knowledge_graph.snap")
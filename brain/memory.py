@@ -5,18 +5,24 @@ Long-term and short-term memory management
 
 import asyncio
 import json
+import re
+import threading
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 from enum import Enum
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, Index, UniqueConstraint
+from sqlalchemy import select, bindparam, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from loguru import logger
 
 from config.settings import config, DATA_DIR
+from brain.storage import create_sqlite_engine
+from brain.cache import LRUCache, MISSING
+from brain.migrations import migrate, find_full_scans
 
 Base = declarative_base()
 
@@ -34,9 +40,13 @@ class MemoryType(str, Enum):
 class Memory(Base):
     """Long-term memory storage"""
     __tablename__ = "memories"
+    __table_args__ = (
+        Index("ix_memories_type_key", "memory_type", "key"),
+        Index("ix_memories_type_importance", "memory_type", "importance"),
+    )
     
     id = Column(Integer, primary_key=True)
-    memory_type = Column(String(50), index=True)
+    memory_type = Column(String(50))
     key = Column(String(255), index=True)
     value = Column(Text)
     meta_data = Column(JSON, default={})
@@ -82,6 +92,10 @@ class Account(Base):
 class Goal(Base):
     """Goals and objectives"""
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_status_priority", "status", "priority"),
+        Index("ix_goals_status_category_priority", "status", "category", "priority"),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(255))
@@ -109,7 +123,20 @@ class ActionLog(Base):
     result = Column(String(50))  # success, failure, pending
     details = Column(JSON)
     duration_seconds = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ActionRollup(Base):
+    """Per-day aggregate of old action logs (written by compaction)"""
+    __tablename__ = "action_rollups"
+    __table_args__ = (UniqueConstraint("day", "action_type", "result"),)
+    
+    id = Column(Integer, primary_key=True)
+    day = Column(String(10))  # YYYY-MM-DD
+    action_type = Column(String(100))  # "" when the action had none
+    result = Column(String(50))  # "" when the action had none (NULLs would not upsert)
+    count = Column(Integer, default=0)
+    total_duration_seconds = Column(Float, default=0.0)
 
 
 class Relationship(Base):
@@ -128,19 +155,175 @@ class Relationship(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# Hot-path statements, built once so SQLAlchemy's compiled cache and the
+# sqlite3 per-connection statement cache are hit on every call
+_MEMORY_BY_TYPE_KEY = select(Memory).where(
+    Memory.memory_type == bindparam("memory_type"), Memory.key == bindparam("key")
+).limit(1)
+_RECALL_BY_KEY = select(Memory.id, Memory.value).where(
+    Memory.key == bindparam("key")
+).limit(1)
+_RECALL_BY_TYPE_KEY = select(Memory.id, Memory.value).where(
+    Memory.memory_type == bindparam("memory_type"), Memory.key == bindparam("key")
+).limit(1)
+_ADD_ACCESS = Memory.__table__.update().where(
+    Memory.__table__.c.id == bindparam("memory_id")
+).values(accessed_count=Memory.__table__.c.accessed_count + bindparam("hits"))
+_INSERT_ACTION = ActionLog.__table__.insert()
+
+
+def _apply_step(session, step):
+    """Run one operation step on a sync Session (see JephthahMemory._run)"""
+    kind = step[0]
+    if kind == "first":
+        return session.scalars(step[1], step[2]).first()
+    if kind == "all":
+        return session.scalars(step[1], step[2]).all()
+    if kind == "row":
+        row = session.execute(step[1], step[2]).first()
+        return tuple(row) if row else None
+    if kind == "get":
+        return session.get(step[1], step[2])
+    if kind == "add":
+        return session.add(step[1])
+    if kind == "execute":
+        return session.execute(step[1], step[2])
+    if kind == "commit":
+        return session.commit()
+    raise ValueError(f"Unknown memory step: {kind}")
+
+
+# Public JephthahMemory methods built on a shared operation (_op_<name>);
+# AsyncJephthahMemory exposes each of them as a coroutine
+OPERATIONS = (
+    "learn_skill", "get_skills", "register_account", "get_account", "update_account_stats",
+    "set_goal", "update_goal_progress", "get_active_goals", "log_action", "get_recent_actions",
+    "remember", "recall", "search_memories", "flush_access_counts",
+)
+
+# Schema migrations for databases created before the index layout above.
+# Fresh databases get the same indexes from create_all.
+MEMORY_MIGRATIONS = [
+    (1, "composite indexes for memory hot paths", [
+        "CREATE INDEX IF NOT EXISTS ix_memories_type_key ON memories (memory_type, key)",
+        "CREATE INDEX IF NOT EXISTS ix_memories_type_importance ON memories (memory_type, importance)",
+        # Prefix of ix_memories_type_key, no longer needed
+        "DROP INDEX IF EXISTS ix_memories_memory_type",
+        "CREATE INDEX IF NOT EXISTS ix_action_logs_created_at ON action_logs (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_goals_status_priority ON goals (status, priority)",
+        "CREATE INDEX IF NOT EXISTS ix_goals_status_category_priority ON goals (status, category, priority)",
+        "CREATE INDEX IF NOT EXISTS ix_accounts_platform ON accounts (platform)",
+        "ANALYZE",
+    ]),
+    (2, "merge action rollups keyed by NULL into the '' sentinel", [
+        "INSERT INTO action_rollups (day, action_type, result, count, total_duration_seconds) "
+        "SELECT day, COALESCE(action_type, ''), COALESCE(result, ''), SUM(count), "
+        "SUM(total_duration_seconds) FROM action_rollups "
+        "WHERE action_type IS NULL OR result IS NULL GROUP BY 1, 2, 3 "
+        "ON CONFLICT (day, action_type, result) DO UPDATE SET "
+        "count = count + excluded.count, "
+        "total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds",
+        "DELETE FROM action_rollups WHERE action_type IS NULL OR result IS NULL",
+    ]),
+]
+
+# Full-text index over memories, kept in sync by triggers (external content table)
+_FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+        key, value, content='memories', content_rowid='id', tokenize='unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+        INSERT INTO memories_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, key, value)
+        VALUES ('delete', old.id, old.key, old.value);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_au AFTER UPDATE OF key, value ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, key, value)
+        VALUES ('delete', old.id, old.key, old.value);
+        INSERT INTO memories_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+    END""",
+]
+
+_FTS_TOKEN = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def build_fts_query(query: str) -> str:
+    """
+    Turn a user search string into a safe FTS5 MATCH expression.
+    "quoted text" is a phrase, a trailing * is a prefix search, and
+    everything else is an AND of plain terms.
+    """
+    parts = []
+    for phrase, word in _FTS_TOKEN.findall(query):
+        if phrase:
+            parts.append('"' + phrase.replace('"', '') + '"')
+            continue
+        prefix = word.endswith("*")
+        word = re.sub(r"[^\w]+", " ", word).strip()
+        if word:
+            parts.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
 class JephthahMemory:
     """Memory management for Jephthah"""
     
-    def __init__(self):
-        db_path = DATA_DIR / "memory.db"
-        self.engine = create_engine(f"sqlite:///{db_path}")
+    def __init__(self, db_path: Path = None, engine: Engine = None,
+                 cache_size: int = 2048, cache_ttl: float = 300,
+                 access_flush_every: int = 200):
+        db_path = db_path or DATA_DIR / "memory.db"
+        self.db_path = db_path
+        self.engine = engine or create_sqlite_engine(db_path)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        self.schema_version = migrate(self.engine, MEMORY_MIGRATIONS, "memory.db")
+        # Objects handed back to callers stay readable after the session closes
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        
+        # Write-behind state (off until enable_write_behind is called)
+        self._write_behind = False
+        self._flush_interval = 0.5
+        self._max_batch = 200
+        self._max_pending = 5000
+        self._pending_memories: Dict[tuple, Dict] = {}
+        self._pending_actions: List[Dict] = []
+        self._inflight_memories: Dict[tuple, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        
+        # Read-through cache for recall/get_account/get_active_goals.
+        # recall() access counts are summed here and written in batches.
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._access_counts: Dict[int, int] = {}
+        self._access_pending = 0
+        self._access_flush_every = access_flush_every
+        
+        self.fts_enabled = self._init_search_index()
         
         # Initialize owner relationship
         self._init_owner()
         logger.info(f"Memory system initialized at {db_path}")
     
+    def _init_search_index(self) -> bool:
+        """Create the FTS5 index and backfill it from existing rows on first run"""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+                ).first()
+                for statement in _FTS_SCHEMA:
+                    conn.exec_driver_sql(statement)
+                if not exists:
+                    conn.exec_driver_sql("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+                    logger.info("Built full-text index for memories")
+            return True
+        except Exception as e:
+            logger.warning(f"FTS5 unavailable, search_memories falls back to LIKE: {e}")
+            return False
+    
     def _init_owner(self):
         """Initialize relationship with owner"""
         session = self.Session()
@@ -167,87 +350,268 @@ class JephthahMemory:
         finally:
             session.close()
     
+    # === WRITE-BEHIND ===
+    
+    def enable_write_behind(self, flush_interval_ms: int = 500, max_batch: int = 200,
+                            max_pending: int = 5000):
+        """Queue remember/log_action writes and flush them in batched transactions"""
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_batch = max_batch
+        self._max_pending = max_pending
+        self._write_behind = True
+        
+        if not self._flusher or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="memory-write-behind", daemon=True
+            )
+            self._flusher.start()
+        logger.info(f"Memory write-behind enabled ({flush_interval_ms}ms / {max_batch} rows)")
+    
+    def _flush_loop(self):
+        while self._write_behind:
+            self._flush_wakeup.wait(self._flush_interval)
+            self._flush_wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Memory write-behind flush failed: {e}")
+    
+    def _pending_count(self) -> int:
+        return len(self._pending_memories) + len(self._pending_actions)
+    
+    def _queued(self) -> bool:
+        """
+        Called after queueing a write: wakes the flusher, or returns True when
+        the caller must flush itself (backpressure). Operations yield ("flush",)
+        for that, so the async driver flushes off the event loop.
+        """
+        pending = self._pending_count()
+        if pending >= self._max_pending:
+            # Bounded memory: the caller pays for the flush
+            return True
+        if pending >= self._max_batch:
+            self._flush_wakeup.set()
+        return False
+    
+    def flush(self) -> int:
+        """Write all queued writes in a single transaction, returns rows written"""
+        self.flush_access_counts()
+        with self._flush_lock:
+            with self._pending_lock:
+                if not self._pending_memories and not self._pending_actions:
+                    return 0
+                memories = self._pending_memories
+                actions = self._pending_actions
+                self._pending_memories = {}
+                self._pending_actions = []
+                # Still visible to recall until committed
+                self._inflight_memories = memories
+            
+            session = self.Session()
+            try:
+                if memories:
+                    keys = list({key for _, key in memories})
+                    existing = {
+                        (m.memory_type, m.key): m
+                        for m in session.query(Memory).filter(Memory.key.in_(keys))
+                    }
+                    for ident, entry in memories.items():
+                        memory = existing.get(ident)
+                        if memory:
+                            memory.value = entry["value"]
+                            memory.importance = entry["importance"]
+                            memory.meta_data = entry["meta_data"]
+                            memory.accessed_count += entry["writes"] + entry["reads"]
+                        else:
+                            session.add(Memory(
+                                memory_type=ident[0],
+                                key=ident[1],
+                                value=entry["value"],
+                                importance=entry["importance"],
+                                meta_data=entry["meta_data"],
+                                accessed_count=entry["writes"] - 1 + entry["reads"]
+                            ))
+                if actions:
+                    session.execute(_INSERT_ACTION, actions)
+                session.commit()
+                # Drop rows cached before the commit, while still in flight
+                for memory_type, key in memories:
+                    self._invalidate_recall(key, memory_type)
+            except Exception:
+                session.rollback()
+                with self._pending_lock:
+                    # Requeue, keeping any newer write for the same key
+                    for ident, entry in memories.items():
+                        self._pending_memories.setdefault(ident, entry)
+                    self._pending_actions[:0] = actions
+                raise
+            finally:
+                session.close()
+                with self._pending_lock:
+                    self._inflight_memories = {}
+            
+            logger.debug(f"Flushed {len(memories)} memories, {len(actions)} actions")
+            return len(memories) + len(actions)
+    
+    def _pending_lookup(self, key: str, memory_type: MemoryType = None) -> Optional[Dict]:
+        """Find a queued (not yet committed) memory for read-your-writes"""
+        with self._pending_lock:
+            for source in (self._pending_memories, self._inflight_memories):
+                if memory_type:
+                    entry = source.get((memory_type.value, key))
+                else:
+                    entry = next((e for (_, k), e in source.items() if k == key), None)
+                if entry:
+                    entry["reads"] += 1
+                    return entry
+        return None
+    
+    def _count_access(self, memory_id: int) -> bool:
+        """Record a recall hit, returns True once a batch is due for flushing"""
+        with self._pending_lock:
+            self._access_counts[memory_id] = self._access_counts.get(memory_id, 0) + 1
+            self._access_pending += 1
+            return self._access_pending >= self._access_flush_every
+    
+    def _drain_access_counts(self) -> List[Dict]:
+        with self._pending_lock:
+            counts = self._access_counts
+            self._access_counts = {}
+            self._access_pending = 0
+        return [{"memory_id": memory_id, "hits": hits} for memory_id, hits in counts.items()]
+    
+    def flush_access_counts(self) -> int:
+        """Write accumulated recall() access counts in one batched UPDATE"""
+        return self._run(self._op_flush_access_counts())
+    
+    def _op_flush_access_counts(self):
+        counts = self._drain_access_counts()
+        if not counts:
+            return 0
+        yield ("execute", _ADD_ACCESS, counts)
+        yield ("commit",)
+        return len(counts)
+    
+    def close(self):
+        """Flush queued writes and stop the write-behind thread"""
+        self._write_behind = False
+        self._flush_wakeup.set()
+        if self._flusher and self._flusher.is_alive():
+            self._flusher.join(timeout=5)
+        self._flusher = None
+        self.flush()
+    
+    # === OPERATIONS ===
+    #
+    # Every public read/write is written once, as a generator that yields the
+    # database steps it needs (see _run). JephthahMemory drives them on a
+    # sync Session; AsyncJephthahMemory drives the same generators on an
+    # AsyncSession, so the two APIs cannot drift apart.
+    
+    def _run(self, op):
+        """Drive an operation generator on a sync Session"""
+        session = None
+        result = None
+        try:
+            while True:
+                step = op.send(result)
+                if step[0] == "flush":
+                    result = self.flush()
+                    continue
+                if session is None:
+                    session = self.Session()
+                result = _apply_step(session, step)
+        except StopIteration as done:
+            return done.value
+        finally:
+            if session is not None:
+                session.close()
+    
     # === SKILLS ===
     
     def learn_skill(self, name: str, category: str, source: str = None) -> Skill:
         """Add a new skill or update existing"""
-        session = self.Session()
-        try:
-            skill = session.query(Skill).filter_by(name=name).first()
-            if skill:
-                skill.proficiency = min(100.0, skill.proficiency + 5.0)
-                skill.hours_practiced += 0.5
-                skill.last_used = datetime.utcnow()
-            else:
-                skill = Skill(
-                    name=name,
-                    category=category,
-                    source=source,
-                    proficiency=10.0,
-                    hours_practiced=0.5,
-                    last_used=datetime.utcnow()
-                )
-                session.add(skill)
-            session.commit()
-            logger.info(f"Learned/improved skill: {name} ({skill.proficiency}%)")
-            return skill
-        finally:
-            session.close()
+        return self._run(self._op_learn_skill(name, category, source))
+    
+    def _op_learn_skill(self, name, category, source=None):
+        skill = yield ("first", select(Skill).filter_by(name=name), None)
+        if skill:
+            skill.proficiency = min(100.0, skill.proficiency + 5.0)
+            skill.hours_practiced += 0.5
+            skill.last_used = datetime.utcnow()
+        else:
+            skill = Skill(
+                name=name,
+                category=category,
+                source=source,
+                proficiency=10.0,
+                hours_practiced=0.5,
+                last_used=datetime.utcnow()
+            )
+            yield ("add", skill)
+        yield ("commit",)
+        logger.info(f"Learned/improved skill: {name} ({skill.proficiency}%)")
+        return skill
     
     def get_skills(self, category: str = None) -> List[Skill]:
         """Get all skills, optionally filtered by category"""
-        session = self.Session()
-        try:
-            query = session.query(Skill)
-            if category:
-                query = query.filter_by(category=category)
-            return query.order_by(Skill.proficiency.desc()).all()
-        finally:
-            session.close()
+        return self._run(self._op_get_skills(category))
+    
+    def _op_get_skills(self, category=None):
+        stmt = select(Skill)
+        if category:
+            stmt = stmt.filter_by(category=category)
+        return (yield ("all", stmt.order_by(Skill.proficiency.desc()), None))
     
     # === ACCOUNTS ===
     
     def register_account(self, platform: str, username: str, email: str, 
                         password_key: str, profile_url: str = None) -> Account:
         """Register a new account"""
-        session = self.Session()
-        try:
-            account = Account(
-                platform=platform,
-                username=username,
-                email=email,
-                password_key=password_key,
-                profile_url=profile_url,
-                status="active",
-                last_login=datetime.utcnow()
-            )
-            session.add(account)
-            session.commit()
-            logger.info(f"Registered account: {platform} - {username}")
-            return account
-        finally:
-            session.close()
+        return self._run(self._op_register_account(platform, username, email, password_key, profile_url))
+    
+    def _op_register_account(self, platform, username, email, password_key, profile_url=None):
+        account = Account(
+            platform=platform,
+            username=username,
+            email=email,
+            password_key=password_key,
+            profile_url=profile_url,
+            status="active",
+            last_login=datetime.utcnow()
+        )
+        yield ("add", account)
+        yield ("commit",)
+        self.cache.invalidate(("account", platform))
+        logger.info(f"Registered account: {platform} - {username}")
+        return account
     
     def get_account(self, platform: str) -> Optional[Account]:
         """Get account for a platform"""
-        session = self.Session()
-        try:
-            return session.query(Account).filter_by(platform=platform).first()
-        finally:
-            session.close()
+        return self._run(self._op_get_account(platform))
+    
+    def _op_get_account(self, platform):
+        cache_key = ("account", platform)
+        account = self.cache.get(cache_key)
+        if account is not MISSING:
+            return account
+        
+        account = yield ("first", select(Account).filter_by(platform=platform), None)
+        self.cache.set(cache_key, account)
+        return account
     
     def update_account_stats(self, platform: str, followers: int = None):
         """Update account statistics"""
-        session = self.Session()
-        try:
-            account = session.query(Account).filter_by(platform=platform).first()
-            if account:
-                if followers is not None:
-                    account.followers = followers
-                account.last_login = datetime.utcnow()
-                session.commit()
-        finally:
-            session.close()
+        return self._run(self._op_update_account_stats(platform, followers))
+    
+    def _op_update_account_stats(self, platform, followers=None):
+        account = yield ("first", select(Account).filter_by(platform=platform), None)
+        if account:
+            if followers is not None:
+                account.followers = followers
+            account.last_login = datetime.utcnow()
+            yield ("commit",)
+            self.cache.invalidate(("account", platform))
     
     # === GOALS ===
     
@@ -255,145 +619,274 @@ class JephthahMemory:
                 target_value: float, unit: str, deadline: datetime = None,
                 priority: int = 5, parent_goal_id: int = None) -> Goal:
         """Create a new goal"""
-        session = self.Session()
-        try:
-            goal = Goal(
-                title=title,
-                description=description,
-                category=category,
-                target_value=target_value,
-                unit=unit,
-                deadline=deadline,
-                priority=priority,
-                parent_goal_id=parent_goal_id
-            )
-            session.add(goal)
-            session.commit()
-            logger.info(f"New goal: {title} ({target_value} {unit})")
-            return goal
-        finally:
-            session.close()
+        return self._run(self._op_set_goal(title, description, category, target_value, unit,
+                                           deadline, priority, parent_goal_id))
+    
+    def _op_set_goal(self, title, description, category, target_value, unit,
+                     deadline=None, priority=5, parent_goal_id=None):
+        goal = Goal(
+            title=title,
+            description=description,
+            category=category,
+            target_value=target_value,
+            unit=unit,
+            deadline=deadline,
+            priority=priority,
+            parent_goal_id=parent_goal_id
+        )
+        yield ("add", goal)
+        yield ("commit",)
+        self._invalidate_goals()
+        logger.info(f"New goal: {title} ({target_value} {unit})")
+        return goal
     
     def update_goal_progress(self, goal_id: int, new_value: float):
         """Update progress on a goal"""
-        session = self.Session()
-        try:
-            goal = session.query(Goal).filter_by(id=goal_id).first()
-            if goal:
-                goal.current_value = new_value
-                if new_value >= goal.target_value:
-                    goal.status = "completed"
-                    goal.completed_at = datetime.utcnow()
-                session.commit()
-                logger.info(f"Goal progress: {goal.title} - {new_value}/{goal.target_value}")
-        finally:
-            session.close()
+        return self._run(self._op_update_goal_progress(goal_id, new_value))
+    
+    def _op_update_goal_progress(self, goal_id, new_value):
+        goal = yield ("get", Goal, goal_id)
+        if goal:
+            goal.current_value = new_value
+            if new_value >= goal.target_value:
+                goal.status = "completed"
+                goal.completed_at = datetime.utcnow()
+            yield ("commit",)
+            self._invalidate_goals()
+            logger.info(f"Goal progress: {goal.title} - {new_value}/{goal.target_value}")
     
     def get_active_goals(self, category: str = None) -> List[Goal]:
         """Get all active goals"""
-        session = self.Session()
-        try:
-            query = session.query(Goal).filter_by(status="active")
-            if category:
-                query = query.filter_by(category=category)
-            return query.order_by(Goal.priority.desc()).all()
-        finally:
-            session.close()
+        return self._run(self._op_get_active_goals(category))
+    
+    def _op_get_active_goals(self, category=None):
+        cache_key = ("goals", category)
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            return list(cached)
+        
+        stmt = select(Goal).filter_by(status="active")
+        if category:
+            stmt = stmt.filter_by(category=category)
+        goals = yield ("all", stmt.order_by(Goal.priority.desc()), None)
+        self.cache.set(cache_key, goals)
+        return list(goals)
+    
+    def _invalidate_goals(self):
+        self.cache.invalidate_where(lambda k: k[0] == "goals")
     
     # === ACTIONS ===
     
     def log_action(self, action_type: str, description: str, target: str,
                   result: str, details: Dict = None, duration: float = 0):
         """Log an action taken"""
-        session = self.Session()
-        try:
-            log = ActionLog(
-                action_type=action_type,
-                description=description,
-                target=target,
-                result=result,
-                details=details or {},
-                duration_seconds=duration
-            )
-            session.add(log)
-            session.commit()
-        finally:
-            session.close()
+        return self._run(self._op_log_action(action_type, description, target, result, details, duration))
+    
+    def _op_log_action(self, action_type, description, target, result, details=None, duration=0):
+        row = {
+            "action_type": action_type,
+            "description": description,
+            "target": target,
+            "result": result,
+            "details": details or {},
+            "duration_seconds": duration
+        }
+        
+        if self._write_behind:
+            row["created_at"] = datetime.utcnow()
+            with self._pending_lock:
+                self._pending_actions.append(row)
+            if self._queued():
+                yield ("flush",)
+            return
+        
+        yield ("execute", _INSERT_ACTION, row)
+        yield ("commit",)
     
     def get_recent_actions(self, limit: int = 100) -> List[ActionLog]:
         """Get recent action logs"""
-        session = self.Session()
-        try:
-            return session.query(ActionLog).order_by(
-                ActionLog.created_at.desc()
-            ).limit(limit).all()
-        finally:
-            session.close()
+        return self._run(self._op_get_recent_actions(limit))
+    
+    def _op_get_recent_actions(self, limit=100):
+        if self._write_behind:
+            yield ("flush",)
+        stmt = select(ActionLog).order_by(ActionLog.created_at.desc()).limit(limit)
+        return (yield ("all", stmt, None))
     
     # === KNOWLEDGE ===
     
     def remember(self, key: str, value: Any, memory_type: MemoryType, 
                 importance: float = 0.5, extra_data: Dict = None):
         """Store something in memory"""
-        session = self.Session()
-        try:
-            # Check if exists
-            memory = session.query(Memory).filter_by(
-                memory_type=memory_type.value, key=key
-            ).first()
-            
-            if memory:
-                memory.value = json.dumps(value) if not isinstance(value, str) else value
-                memory.importance = importance
-                memory.meta_data = extra_data or {}
-                memory.accessed_count += 1
-            else:
-                memory = Memory(
-                    memory_type=memory_type.value,
-                    key=key,
-                    value=json.dumps(value) if not isinstance(value, str) else value,
-                    importance=importance,
-                    meta_data=extra_data or {}
-                )
-                session.add(memory)
-            
-            session.commit()
-            logger.debug(f"Remembered: {memory_type.value}/{key}")
-        finally:
-            session.close()
+        return self._run(self._op_remember(key, value, memory_type, importance, extra_data))
+    
+    def _op_remember(self, key, value, memory_type, importance=0.5, extra_data=None):
+        self._invalidate_recall(key, memory_type.value)
+        if self._write_behind:
+            ident = (memory_type.value, key)
+            with self._pending_lock:
+                entry = self._pending_memories.get(ident)
+                self._pending_memories[ident] = {
+                    "value": json.dumps(value) if not isinstance(value, str) else value,
+                    "importance": importance,
+                    "meta_data": extra_data or {},
+                    "writes": entry["writes"] + 1 if entry else 1,
+                    "reads": entry["reads"] if entry else 0,
+                }
+            if self._queued():
+                yield ("flush",)
+            return
+        
+        # Check if exists
+        memory = yield ("first", _MEMORY_BY_TYPE_KEY, {
+            "memory_type": memory_type.value, "key": key
+        })
+        
+        if memory:
+            memory.value = json.dumps(value) if not isinstance(value, str) else value
+            memory.importance = importance
+            memory.meta_data = extra_data or {}
+            memory.accessed_count += 1
+        else:
+            yield ("add", Memory(
+                memory_type=memory_type.value,
+                key=key,
+                value=json.dumps(value) if not isinstance(value, str) else value,
+                importance=importance,
+                meta_data=extra_data or {}
+            ))
+        
+        yield ("commit",)
+        # Again after the commit: a recall between the two may have cached the old row
+        self._invalidate_recall(key, memory_type.value)
+        logger.debug(f"Remembered: {memory_type.value}/{key}")
     
     def recall(self, key: str, memory_type: MemoryType = None) -> Optional[Any]:
         """Recall something from memory"""
-        session = self.Session()
-        try:
-            query = session.query(Memory).filter_by(key=key)
-            if memory_type:
-                query = query.filter_by(memory_type=memory_type.value)
-            
-            memory = query.first()
-            if memory:
-                memory.accessed_count += 1
-                session.commit()
+        return self._run(self._op_recall(key, memory_type))
+    
+    def _op_recall(self, key, memory_type=None):
+        if self._write_behind:
+            entry = self._pending_lookup(key, memory_type)
+            if entry:
                 try:
-                    return json.loads(memory.value)
+                    return json.loads(entry["value"])
                 except:
-                    return memory.value
-            return None
-        finally:
-            session.close()
+                    return entry["value"]
+        
+        cache_key = ("recall", key, memory_type.value if memory_type else None)
+        row = self.cache.get(cache_key)
+        if row is MISSING:
+            if memory_type:
+                row = yield ("row", _RECALL_BY_TYPE_KEY, {
+                    "memory_type": memory_type.value, "key": key
+                })
+            else:
+                row = yield ("row", _RECALL_BY_KEY, {"key": key})
+            self.cache.set(cache_key, row)
+        
+        if row:
+            memory_id, value = row
+            if self._count_access(memory_id):
+                yield from self._op_flush_access_counts()
+            try:
+                return json.loads(value)
+            except:
+                return value
+        return None
+    
+    def _invalidate_recall(self, key: str, memory_type: str):
+        self.cache.invalidate(("recall", key, memory_type))
+        self.cache.invalidate(("recall", key, None))
     
     def search_memories(self, query: str, memory_type: MemoryType = None) -> List[Memory]:
-        """Search memories by keyword"""
-        session = self.Session()
-        try:
-            q = session.query(Memory).filter(
+        """
+        Search memories by keyword, ranked by BM25 relevance weighted by importance.
+        Supports "exact phrases" and prefix* terms.
+        """
+        return self._run(self._op_search_memories(query, memory_type))
+    
+    def _op_search_memories(self, query, memory_type=None):
+        if self._write_behind:
+            yield ("flush",)
+        
+        stmt = self._search_statement(query, memory_type)
+        if stmt is None:
+            return []
+        return (yield ("all", stmt, None))
+    
+    def _search_statement(self, query: str, memory_type: MemoryType = None):
+        """Build the search_memories query (FTS5 when available, else LIKE)"""
+        if not self.fts_enabled:
+            stmt = select(Memory).where(
                 Memory.key.contains(query) | Memory.value.contains(query)
             )
             if memory_type:
-                q = q.filter_by(memory_type=memory_type.value)
-            return q.order_by(Memory.importance.desc()).limit(50).all()
-        finally:
-            session.close()
+                stmt = stmt.where(Memory.memory_type == memory_type.value)
+            return stmt.order_by(Memory.importance.desc()).limit(50)
+        
+        match = build_fts_query(query)
+        if not match:
+            return None
+        sql = (
+            "SELECT memories.* FROM memories_fts "
+            "JOIN memories ON memories.id = memories_fts.rowid "
+            "WHERE memories_fts MATCH :match "
+        )
+        params = {"match": match}
+        if memory_type:
+            sql += "AND memories.memory_type = :memory_type "
+            params["memory_type"] = memory_type.value
+        # bm25() is negative (lower is better); scaling by importance
+        # pulls important memories up among equally relevant hits
+        sql += "ORDER BY bm25(memories_fts, 2.0, 1.0) * (1 + memories.importance) LIMIT 50"
+        return select(Memory).from_statement(text(sql).bindparams(**params))
+    
+    # === QUERY PLANS ===
+    
+    def hot_queries(self) -> Dict[str, tuple]:
+        """The statements JephthahMemory runs most, with sample parameters"""
+        knowledge = {"memory_type": MemoryType.KNOWLEDGE.value, "key": "k"}
+        return {
+            "recall": (_RECALL_BY_TYPE_KEY, knowledge),
+            "recall_any_type": (_RECALL_BY_KEY, {"key": "k"}),
+            "remember_lookup": (_MEMORY_BY_TYPE_KEY, knowledge),
+            "access_count_update": (_ADD_ACCESS, {"memory_id": 1, "hits": 1}),
+            "recent_actions": (
+                select(ActionLog).order_by(ActionLog.created_at.desc()).limit(100), {}
+            ),
+            "active_goals": (
+                select(Goal).where(Goal.status == "active").order_by(Goal.priority.desc()), {}
+            ),
+            "active_goals_by_category": (
+                select(Goal).where(Goal.status == "active", Goal.category == "income")
+                .order_by(Goal.priority.desc()), {}
+            ),
+            "account_by_platform": (
+                select(Account).where(Account.platform == "github").limit(1), {}
+            ),
+            "skill_by_name": (select(Skill).where(Skill.name == "python").limit(1), {}),
+        }
+    
+    def check_query_plans(self) -> Dict[str, List[str]]:
+        """Return hot queries whose EXPLAIN QUERY PLAN shows a full table scan (empty = healthy)"""
+        offenders = find_full_scans(self.engine, self.hot_queries())
+        for name, plan in offenders.items():
+            logger.warning(f"Memory query '{name}' does a full scan: {plan}")
+        return offenders
+    
+    # === STATISTICS ===
+    
+    def get_stats(self) -> Dict:
+        """Get memory cache and write queue statistics"""
+        return {
+            "cache": self.cache.stats(),
+            "pending_writes": self._pending_count(),
+            "pending_access_counts": self._access_pending,
+            "write_behind": self._write_behind,
+            "full_text_search": self.fts_enabled,
+            "schema_version": self.schema_version,
+        }
 
 
 # Global memory instance
@@ -0,0 +1,73 @@
+"""
+Jephthah Schema Migrations
+Versioned, forward-only schema changes for the SQLite databases
+
+Each database keeps its schema version in PRAGMA user_version. A migration is
+(version, description, steps) where steps is a list of SQL strings or a
+callable taking a connection. Pending migrations run in order, each in its
+own transaction, on startup.
+"""
+
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+from sqlalchemy.engine import Connection, Engine
+from loguru import logger
+
+
+Step = Union[str, Callable[[Connection], None]]
+Migration = Tuple[int, str, Sequence[Step]]
+
+
+def get_schema_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def migrate(engine: Engine, migrations: Sequence[Migration], name: str = "db") -> int:
+    """Apply every migration newer than the stored version, returns the new version"""
+    current = get_schema_version(engine)
+
+    for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.exec_driver_sql(step)
+            # PRAGMA does not take bound parameters; version is always an int
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+        current = version
+        logger.info(f"Migrated {name} to v{version}: {description}")
+
+    return current
+
+
+# === QUERY PLANS ===
+
+def explain(engine: Engine, stmt, params: Dict = None) -> List[str]:
+    """EXPLAIN QUERY PLAN for a SQLAlchemy statement, one detail line per step"""
+    params = params or {}
+    compiled = stmt.compile(dialect=engine.dialect)
+    args = tuple(
+        params.get(key, compiled.params.get(key)) for key in (compiled.positiontup or [])
+    )
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, args).all()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(detail: str) -> bool:
+    """'SCAN t' is a full table scan; 'SCAN t USING [COVERING] INDEX' is an ordered index walk"""
+    return detail.startswith("SCAN ") and " USING " not in detail
+
+
+def find_full_scans(engine: Engine, queries: Dict[str, Tuple[object, Dict]]) -> Dict[str, List[str]]:
+    """Return {query name: plan} for every query whose plan contains a full table scan"""
+    offenders = {}
+    for name, (stmt, params) in queries.items():
+        plan = explain(engine, stmt, params)
+        if any(is_full_scan(line) for line in plan):
+            offenders[name] = plan
+    return offenders
@@ -1,46 +1,248 @@
 import asyncio
+import bisect
+import itertools
+import time
 from datetime import datetime
-from typing import Dict, List, Callable, Any
-from collections import deque
+from typing import Dict, List, Callable, Any, Optional
+from collections import defaultdict, deque
 from loguru import logger
 
 
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds in, milliseconds out)"""
+    
+    BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)  # last bucket: above the top bound
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+    
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (capped at the max seen)"""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return round(min(float(self.BOUNDS_MS[i]), self.max_ms) if i < len(self.BOUNDS_MS) else self.max_ms, 3)
+        return self.max_ms
+    
+    def to_dict(self) -> Dict:
+        labels = [f"<={b}ms" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class TaskEntry:
+    """One submitted coroutine; await it (or its future) for the result"""
+    
+    __slots__ = ("id", "name", "coro", "timeout", "future", "task", "submitted", "started", "state")
+    
+    def __init__(self, task_id: int, name: str, coro, timeout: Optional[float], future: asyncio.Future):
+        self.id = task_id
+        self.name = name
+        self.coro = coro
+        self.timeout = timeout
+        self.future = future          # resolves to the result (None on failure)
+        self.task: Optional[asyncio.Task] = None
+        self.submitted = time.monotonic()
+        self.started = 0.0
+        self.state = "queued"         # queued, running, done, failed, timeout, cancelled
+    
+    def __await__(self):
+        return self.future.__await__()
+    
+    def done(self) -> bool:
+        return self.future.done()
+    
+    def result(self) -> Any:
+        return self.future.result()
+
+
 class MultiTasker:
-    def __init__(self, max_concurrent: int = 10):
+    """
+    Bounded executor for background coroutines.
+    max_concurrent workers pull from a queue of at most max_queued entries;
+    run() waits for room when the queue is full, so producers slow down
+    instead of piling up tasks.
+    """
+    
+    def __init__(self, max_concurrent: int = 10, max_queued: int = 100,
+                 default_timeout: Optional[float] = None):
         self.max_concurrent = max_concurrent
-        self.running_tasks = {}
+        self.max_queued = max_queued
+        self.default_timeout = default_timeout
+        self.running_tasks: Dict[int, TaskEntry] = {}
+        self.pending: Dict[int, TaskEntry] = {}
         self.completed = deque(maxlen=1000)
         self.failed = deque(maxlen=100)
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
-    async def run(self, name: str, coro):
-        task = asyncio.create_task(self._execute(name, coro))
-        self.running_tasks[name] = task
-        return task
+        self.counts = defaultdict(int)  # done, failed, timeout, cancelled
+        self.latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)  # run time per name
+        self.queue_wait = LatencyHistogram()
+    
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None and (self.pending or self.running_tasks):
+            raise RuntimeError(
+                f"MultiTasker has {len(self.pending) + len(self.running_tasks)} unfinished tasks "
+                "on another event loop; await join() or shutdown() there first"
+            )
+        # First use, or a new event loop with nothing left on the old one
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrent)]
+    
+    async def run(self, name: str, coro, timeout: Optional[float] = None) -> TaskEntry:
+        """
+        Queue coro under name, waiting while the queue is full (backpressure).
+        Returns its entry: entry.id for cancel(), await entry for the result.
+        """
+        try:
+            self._ensure_workers()
+        except RuntimeError:
+            coro.close()
+            raise
+        entry = TaskEntry(next(self._ids), name, coro,
+                          timeout if timeout is not None else self.default_timeout,
+                          self._loop.create_future())
+        self.pending[entry.id] = entry
+        try:
+            await self._queue.put(entry)
+        except asyncio.CancelledError:
+            self.pending.pop(entry.id, None)
+            coro.close()
+            raise
+        return entry
+    
+    def cancel(self, task_id: int) -> bool:
+        """Cancel a queued or running task by id"""
+        entry = self.pending.pop(task_id, None)
+        if entry is not None:
+            # Still queued: the worker drops it when it comes up
+            self._finish(entry, "cancelled")
+            entry.coro.close()
+            return True
+        entry = self.running_tasks.get(task_id)
+        if entry is not None and entry.task is not None:
+            entry.task.cancel()
+            return True
+        return False
+    
+    async def _worker(self):
+        while True:
+            entry = await self._queue.get()
+            try:
+                if entry.state == "queued":
+                    await self._execute(entry)
+            finally:
+                self._queue.task_done()
     
-    async def _execute(self, name: str, coro):
+    async def _execute(self, entry: TaskEntry):
+        self.pending.pop(entry.id, None)
+        entry.state = "running"
+        entry.started = time.monotonic()
+        self.queue_wait.observe(entry.started - entry.submitted)
+        self.running_tasks[entry.id] = entry
+        entry.task = asyncio.ensure_future(asyncio.wait_for(entry.coro, entry.timeout))
+        waited = False
         try:
-            result = await coro
-            self.completed.append({"name": name, "result": result, "time": datetime.utcnow().isoformat()})
-            return result
+            # wait() rather than await: cancelling the task must not end the worker
+            await asyncio.wait([entry.task])
+            waited = True
+            result = entry.task.result()
+            self.completed.append({"id": entry.id, "name": entry.name, "result": result,
+                                   "time": datetime.utcnow().isoformat()})
+            self._finish(entry, "done", result)
+        except asyncio.CancelledError:
+            if waited:
+                self._finish(entry, "cancelled")
+            else:
+                # The worker itself is being cancelled (shutdown)
+                entry.task.cancel()
+                self._finish(entry, "cancelled")
+                raise
+        except asyncio.TimeoutError:
+            self.failed.append({"id": entry.id, "name": entry.name, "error": f"timeout after {entry.timeout}s",
+                                "time": datetime.utcnow().isoformat()})
+            self._finish(entry, "timeout")
         except Exception as e:
-            self.failed.append({"name": name, "error": str(e), "time": datetime.utcnow().isoformat()})
-            return None
+            self.failed.append({"id": entry.id, "name": entry.name, "error": str(e),
+                                "time": datetime.utcnow().isoformat()})
+            self._finish(entry, "failed")
         finally:
-            if name in self.running_tasks:
-                del self.running_tasks[name]
+            self.running_tasks.pop(entry.id, None)
+            self.latency[entry.name].observe(time.monotonic() - entry.started)
+    
+    def _finish(self, entry: TaskEntry, state: str, result: Any = None):
+        entry.state = state
+        self.counts[state] += 1
+        if entry.future.done():
+            return
+        if state == "cancelled":
+            entry.future.cancel()
+        else:
+            entry.future.set_result(result)
     
     async def run_all(self, tasks: List[tuple]):
-        coros = [self.run(name, coro) for name, coro in tasks]
-        return await asyncio.gather(*coros, return_exceptions=True)
+        """Run (name, coro) pairs through the pool, results in order (None for failures)"""
+        entries = [await self.run(name, coro) for name, coro in tasks]
+        return await asyncio.gather(*(entry.future for entry in entries), return_exceptions=True)
+    
+    async def join(self):
+        """Wait until everything queued so far has finished"""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def shutdown(self):
+        """Cancel queued and running tasks and stop the workers"""
+        for task_id in list(self.pending) + list(self.running_tasks):
+            self.cancel(task_id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
     
     def active_count(self) -> int:
         return len(self.running_tasks)
     
     def status(self) -> Dict:
         return {
-            "running": list(self.running_tasks.keys()),
-            "completed_count": len(self.completed),
-            "failed_count": len(self.failed)
+            "running": [entry.name for entry in self.running_tasks.values()],
+            "queued": len(self.pending),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "completed_count": self.counts["done"],
+            "failed_count": self.counts["failed"],
+            "timeout_count": self.counts["timeout"],
+            "cancelled_count": self.counts["cancelled"],
+            "queue_wait": self.queue_wait.to_dict(),
+            "latency": {name: hist.to_dict() for name, hist in self.latency.items()},
         }
 
 
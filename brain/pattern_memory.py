@@ -10,17 +10,36 @@ This allows Jephthah to:
 """
 
 import json
-import random
+import re
+import threading
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Index, bindparam, func, select
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from loguru import logger
 
 from config.settings import DATA_DIR
+from brain.bandit import ThompsonSelector
+from brain.dedup import MinHashLSH
+from brain.migrations import migrate
+from brain.storage import create_sqlite_engine
+from brain.text_analysis import AnalyzedSentence, analyze
+from brain.templates import TemplateError, validate_template
+
+# Generalization patterns, compiled once
+_NUMBER = re.compile(r'\d+')
+_TECH_TERM = re.compile(
+    r'\b(?:python|javascript|react|nodejs|django|flask|ai|ml)\b', re.IGNORECASE
+)
+_URL = re.compile(r'https?://\S+')
+
+_INTRO_WORDS = ('introduction', 'welcome', 'today', 'let me')
+_CONCLUSION_WORDS = ('conclusion', 'finally', 'in summary', 'bottom line')
+_CTA_WORDS = ('connect', 'follow', 'subscribe', 'contact')
 
 Base = declarative_base()
 
@@ -28,6 +47,9 @@ Base = declarative_base()
 class SentencePattern(Base):
     """A reusable sentence structure"""
     __tablename__ = "sentence_patterns"
+    __table_args__ = (
+        Index("ix_sentence_patterns_pool", "pattern_type", "category", "success_score"),
+    )
     
     id = Column(Integer, primary_key=True)
     pattern = Column(Text)  # Template with {PLACEHOLDERS}
@@ -36,6 +58,8 @@ class SentencePattern(Base):
     tone = Column(String(50))  # professional, casual, persuasive, informative
     success_score = Column(Float, default=0.5)  # 0-1 how successful this pattern is
     usage_count = Column(Integer, default=0)
+    successes = Column(Integer, default=0)  # Outcomes, the bandit's Beta posterior
+    failures = Column(Integer, default=0)
     source = Column(String(255))  # Where learned from
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -87,17 +111,149 @@ class EmailPattern(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+def _add_outcome_columns(conn):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(sentence_patterns)")}
+    for column in ("successes", "failures"):
+        if column not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE sentence_patterns ADD COLUMN {column} INTEGER DEFAULT 0")
+
+
+# Pseudo-outcomes a learned success_score is worth when seeding the counts
+OUTCOME_PSEUDO_COUNT = 8
+
+
+def _seed_outcome_counts(conn):
+    """
+    Turn each learned success_score into successes/failures whose posterior
+    mean (1 + s) / (2 + k) matches it, so the first flush does not reset it.
+    Patterns still at the 0.5 default keep the uniform prior.
+    """
+    k = OUTCOME_PSEUDO_COUNT
+    seeded = f"MIN({k}, MAX(0, CAST(ROUND(success_score * {k + 2} - 1) AS INTEGER)))"
+    conn.exec_driver_sql(
+        f"UPDATE sentence_patterns SET successes = {seeded}, failures = {k} - {seeded} "
+        "WHERE COALESCE(successes, 0) = 0 AND COALESCE(failures, 0) = 0 "
+        "AND success_score IS NOT NULL AND success_score != 0.5"
+    )
+
+
+_MERGE_PATTERN = SentencePattern.__table__.update().where(
+    SentencePattern.id == bindparam("pattern_id")
+).values(
+    usage_count=bindparam("merged_uses"),
+    successes=bindparam("merged_wins"),
+    failures=bindparam("merged_losses"),
+    success_score=bindparam("merged_score"),
+)
+_DELETE_PATTERN = SentencePattern.__table__.delete().where(
+    SentencePattern.id == bindparam("pattern_id")
+)
+
+
+def _pool_key(row) -> Tuple[str, Optional[str], Optional[str]]:
+    """Dedup scope of a pattern: patterns are only compared within one pool"""
+    return row.pattern_type, row.category, row.tone
+
+
+def merge_near_duplicates(conn, threshold: float = 0.8) -> int:
+    """
+    Fold near-duplicate sentence patterns into one survivor (the best scored,
+    then oldest), summing their usage and outcome counts. Only patterns of the
+    same pool (pattern_type, category, tone) are merged. Returns rows removed.
+    """
+    rows = conn.execute(
+        SentencePattern.__table__.select().order_by(
+            SentencePattern.success_score.desc(), SentencePattern.id
+        )
+    ).all()
+    index = MinHashLSH(threshold=threshold)
+    survivors = {}
+    removed = []
+    for row in rows:
+        found = index.add_unique(row.id, row.pattern or "", _pool_key(row))
+        if found is None:
+            survivors[row.id] = [row.usage_count or 0, row.successes or 0, row.failures or 0,
+                                 row.success_score, False]
+            continue
+        merged = survivors[found[0]]
+        merged[0] += row.usage_count or 0
+        merged[1] += row.successes or 0
+        merged[2] += row.failures or 0
+        merged[4] = True
+        removed.append({"pattern_id": row.id})
+
+    if removed:
+        updates = []
+        for pattern_id, (uses, wins, losses, score, changed) in survivors.items():
+            if not changed:
+                continue
+            if wins + losses:
+                score = (1.0 + wins) / (2.0 + wins + losses)
+            updates.append({"pattern_id": pattern_id, "merged_uses": uses, "merged_wins": wins,
+                            "merged_losses": losses, "merged_score": score})
+        conn.execute(_MERGE_PATTERN, updates)
+        conn.execute(_DELETE_PATTERN, removed)
+    return len(removed)
+
+
+PATTERN_MIGRATIONS = [
+    (1, "outcome counts and pool index for bandit selection", [
+        _add_outcome_columns,
+        "CREATE INDEX IF NOT EXISTS ix_sentence_patterns_pool "
+        "ON sentence_patterns (pattern_type, category, success_score)",
+    ]),
+    (2, "merge near-duplicate sentence patterns", [
+        merge_near_duplicates,
+    ]),
+    (3, "seed outcome counts from learned success scores", [
+        _seed_outcome_counts,
+    ]),
+]
+
+# Adds the outcomes gathered since the last flush; success_score becomes the
+# posterior mean (1 + successes) / (2 + successes + failures)
+_FLUSH_PATTERN = SentencePattern.__table__.update().where(
+    SentencePattern.id == bindparam("pattern_id")
+).values(
+    usage_count=SentencePattern.usage_count + bindparam("uses"),
+    successes=SentencePattern.successes + bindparam("wins"),
+    failures=SentencePattern.failures + bindparam("losses"),
+    success_score=(1.0 + SentencePattern.successes + bindparam("wins")) /
+                  (2.0 + SentencePattern.successes + bindparam("wins") +
+                   SentencePattern.failures + bindparam("losses")),
+)
+
+
 class PatternMemory:
     """
     Pattern-based memory for generating content without API.
     Learns from successful outputs and improves over time.
     """
     
-    def __init__(self):
-        db_path = DATA_DIR / "patterns.db"
-        self.engine = create_engine(f"sqlite:///{db_path}")
+    def __init__(self, db_path: Path = None, pool_size: int = 50, flush_interval: float = 30,
+                 dedup_threshold: float = 0.8):
+        db_path = db_path or DATA_DIR / "patterns.db"
+        self.engine = create_sqlite_engine(db_path)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        migrate(self.engine, PATTERN_MIGRATIONS, "patterns.db")
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        
+        # Thompson-sampling selection; pools are loaded once per
+        # (pattern_type, category, tone) and outcomes flushed in the background
+        self.selector = ThompsonSelector()
+        self.pool_size = pool_size
+        self._pattern_text: Dict[int, str] = {}
+        self._flush_interval = flush_interval
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="pattern-flush", daemon=True)
+        self._flusher.start()
+        
+        # Near-duplicate check for new patterns, built from the table on first use
+        self.dedup = MinHashLSH(threshold=dedup_threshold)
+        self._dedup_loaded = False
+        self._dedup_lock = threading.Lock()
+        self.duplicates_rejected = 0
         
         # Initialize with base patterns if empty
         self._init_base_patterns()
@@ -141,6 +297,7 @@ class PatternMemory:
                 ]
                 
                 for pattern, ptype, category, tone in base_patterns:
+                    validate_template(pattern)
                     p = SentencePattern(
                         pattern=pattern,
                         pattern_type=ptype,
@@ -180,6 +337,8 @@ class PatternMemory:
                 ]
                 
                 for template in base_proposals:
+                    for field in ("opening", "experience_section", "approach_section", "closing"):
+                        validate_template(template[field])
                     p = ProposalTemplate(**template)
                     session.add(p)
                 
@@ -214,6 +373,8 @@ class PatternMemory:
                 ]
                 
                 for template in base_emails:
+                    for text in [template["subject_pattern"], template["greeting"], *template["body_structure"]]:
+                        validate_template(text)
                     body_json = json.dumps(template.pop("body_structure"))
                     template["body_structure"] = body_json
                     e = EmailPattern(**template)
@@ -231,21 +392,35 @@ class PatternMemory:
     def add_sentence_pattern(self, pattern: str, pattern_type: str, 
                             category: str = "general", tone: str = "professional",
                             source: str = "learned") -> int:
-        """Add a new sentence pattern"""
-        session = self.Session()
-        try:
-            p = SentencePattern(
-                pattern=pattern,
-                pattern_type=pattern_type,
-                category=category,
-                tone=tone,
-                source=source
-            )
-            session.add(p)
-            session.commit()
-            return p.id
-        finally:
-            session.close()
+        """
+        Add a new sentence pattern (TemplateError if it uses an unknown slot).
+        A near-duplicate of a stored pattern is not added; its id is returned.
+        """
+        validate_template(pattern)
+        index = self._dedup_index()
+        signature = index.hasher.signature(pattern)
+        pool = (pattern_type, category, tone)
+        with self._dedup_lock:
+            found = index.query(pattern, signature, pool)
+            if found is not None:
+                self.duplicates_rejected += 1
+                return found[0]
+            session = self.Session()
+            try:
+                p = SentencePattern(
+                    pattern=pattern,
+                    pattern_type=pattern_type,
+                    category=category,
+                    tone=tone,
+                    source=source
+                )
+                session.add(p)
+                session.commit()
+                index.add(p.id, pattern, signature, pool)
+            finally:
+                session.close()
+        self._invalidate_pools(pattern_type)
+        return p.id
     
     def get_patterns(self, pattern_type: str = None, category: str = None,
                     tone: str = None, limit: int = 10) -> List[SentencePattern]:
@@ -264,40 +439,113 @@ class PatternMemory:
         finally:
             session.close()
     
-    def get_random_pattern(self, pattern_type: str, category: str = None) -> Optional[str]:
-        """Get a random pattern of a specific type"""
-        patterns = self.get_patterns(pattern_type=pattern_type, category=category, limit=20)
-        if patterns:
-            # Weight by success score
-            weights = [p.success_score for p in patterns]
-            selected = random.choices(patterns, weights=weights, k=1)[0]
+    def _load_pool(self, key: Tuple[str, Optional[str], Optional[str]]):
+        """One query: the top pool_size candidates for key, with their outcome counts"""
+        self._load_pools([key])
+    
+    def _load_pools(self, keys: List[Tuple[str, Optional[str], Optional[str]]]):
+        """
+        Load several pools with one query per (category, tone): candidates are
+        ranked within each pattern_type by a window function
+        """
+        groups = defaultdict(set)
+        for pattern_type, category, tone in keys:
+            groups[(category, tone)].add(pattern_type)
+        
+        for (category, tone), pattern_types in groups.items():
+            rank = func.row_number().over(
+                partition_by=SentencePattern.pattern_type,
+                order_by=(SentencePattern.success_score.desc(), SentencePattern.id),
+            ).label("rank")
+            query = select(
+                SentencePattern.id, SentencePattern.pattern, SentencePattern.pattern_type,
+                SentencePattern.successes, SentencePattern.failures, rank
+            ).where(SentencePattern.pattern_type.in_(pattern_types))
+            if category:
+                query = query.where(SentencePattern.category == category)
+            if tone:
+                query = query.where(SentencePattern.tone == tone)
+            ranked = query.subquery()
             
-            # Update usage count
-            session = self.Session()
-            try:
-                p = session.query(SentencePattern).filter_by(id=selected.id).first()
-                if p:
-                    p.usage_count += 1
-                    session.commit()
-            finally:
-                session.close()
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(ranked).where(ranked.c.rank <= self.pool_size).order_by(
+                        ranked.c.pattern_type, ranked.c.rank
+                    )
+                ).all()
             
-            return selected.pattern
-        return None
+            pools = {pattern_type: [] for pattern_type in pattern_types}
+            for row in rows:
+                self._pattern_text[row.id] = row.pattern
+                pools[row.pattern_type].append(
+                    (row.id, 1.0 + (row.successes or 0), 1.0 + (row.failures or 0))
+                )
+            for pattern_type, arms in pools.items():
+                self.selector.set_pool((pattern_type, category, tone), arms)
+    
+    def prefetch_pools(self, pattern_types: List[str], category: str = None, tone: str = None):
+        """Load every missing pool for pattern_types up front (e.g. before a batch)"""
+        keys = [(pattern_type, category, tone) for pattern_type in pattern_types
+                if not self.selector.has_pool((pattern_type, category, tone))]
+        if keys:
+            self._load_pools(keys)
+    
+    def _invalidate_pools(self, pattern_type: str):
+        """New patterns: reload affected pools on their next use"""
+        self.selector.drop_pools(key for key in self.selector.pools() if key[0] == pattern_type)
+    
+    def select_pattern(self, pattern_type: str, category: str = None,
+                       tone: str = None) -> Optional[Tuple[int, str]]:
+        """
+        Thompson-sample a pattern as (id, pattern). Served from memory once the
+        pool is loaded; report the outcome with update_pattern_success(id, ...).
+        """
+        key = (pattern_type, category, tone)
+        if not self.selector.has_pool(key):
+            self._load_pool(key)
+        pattern_id = self.selector.select(key)
+        if pattern_id is None:
+            return None
+        return pattern_id, self._pattern_text[pattern_id]
+    
+    def get_random_pattern(self, pattern_type: str, category: str = None) -> Optional[str]:
+        """Get a pattern of a specific type, favoring ones that have worked"""
+        selected = self.select_pattern(pattern_type, category)
+        return selected[1] if selected else None
     
     def update_pattern_success(self, pattern_id: int, success: bool):
-        """Update pattern success score based on outcome"""
-        session = self.Session()
-        try:
-            p = session.query(SentencePattern).filter_by(id=pattern_id).first()
-            if p:
-                if success:
-                    p.success_score = min(1.0, p.success_score + 0.05)
-                else:
-                    p.success_score = max(0.1, p.success_score - 0.03)
-                session.commit()
-        finally:
-            session.close()
+        """Update pattern success based on outcome (in memory, flushed periodically)"""
+        self.selector.record(pattern_id, success)
+    
+    def _flush_loop(self):
+        while not self._stop.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Pattern flush failed: {e}")
+    
+    def flush(self) -> int:
+        """Write accumulated usage and outcome counts in one executemany UPDATE"""
+        with self._flush_lock:
+            pending = self.selector.drain()
+            if not pending:
+                return 0
+            rows = [
+                {"pattern_id": pattern_id, "uses": uses, "wins": wins, "losses": losses}
+                for pattern_id, (uses, wins, losses) in pending.items()
+            ]
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(_FLUSH_PATTERN, rows)
+            except Exception:
+                self.selector.restore(pending)
+                raise
+            return len(rows)
+    
+    def close(self):
+        """Stop the flusher and write what's pending"""
+        self._stop.set()
+        self.flush()
     
     # === PROPOSAL TEMPLATES ===
     
@@ -372,47 +620,117 @@ class PatternMemory:
     
     def learn_from_article(self, article_text: str, source: str = "web"):
         """Extract and store patterns from an article"""
-        sentences = article_text.split('.')
-        
+        return self.learn_from_sentences(analyze(article_text), source)
+    
+    def learn_from_sentences(self, sentences: List[AnalyzedSentence], source: str = "web") -> int:
+        """Store generalized patterns from analyzed sentences in one transaction"""
+        patterns = []
         for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) < 20 or len(sentence) > 200:
+            if len(sentence.text) < 20 or len(sentence.text) > 200:
                 continue
             
             # Detect pattern type by position and keywords
-            if any(w in sentence.lower() for w in ['introduction', 'welcome', 'today', 'let me']):
+            lower = sentence.lower
+            if any(w in lower for w in _INTRO_WORDS):
                 pattern_type = "intro"
-            elif any(w in sentence.lower() for w in ['conclusion', 'finally', 'in summary', 'bottom line']):
+            elif any(w in lower for w in _CONCLUSION_WORDS):
                 pattern_type = "conclusion"
-            elif any(w in sentence.lower() for w in ['connect', 'follow', 'subscribe', 'contact']):
+            elif any(w in lower for w in _CTA_WORDS):
                 pattern_type = "cta"
             else:
                 pattern_type = "body"
             
             # Generalize the sentence into a pattern
-            generalized = self._generalize_sentence(sentence)
-            if generalized:
-                self.add_sentence_pattern(
+            generalized = self._generalize_sentence(sentence.text)
+            if generalized and self._is_renderable(generalized):
+                patterns.append(SentencePattern(
                     pattern=generalized,
                     pattern_type=pattern_type,
                     category="general",
+                    tone="professional",
                     source=source
-                )
+                ))
+        
+        if not patterns:
+            return 0
+        
+        index = self._dedup_index()
+        with self._dedup_lock:
+            # Drop near-duplicates of stored patterns and of each other; new
+            # ones are indexed under a placeholder key until they have an id
+            unique = []
+            for p in patterns:
+                signature = index.hasher.signature(p.pattern)
+                pool = _pool_key(p)
+                if index.query(p.pattern, signature, pool) is not None:
+                    self.duplicates_rejected += 1
+                    continue
+                index.add(("new", len(unique)), p.pattern, signature, pool)
+                unique.append((p, signature))
+            
+            session = self.Session()
+            try:
+                session.add_all([p for p, _ in unique])
+                session.commit()
+            finally:
+                session.close()
+                for i in range(len(unique)):
+                    index.remove(("new", i))
+            for p, signature in unique:
+                index.add(p.id, p.pattern, signature, _pool_key(p))
+        
+        for pattern_type in {p.pattern_type for p, _ in unique}:
+            self._invalidate_pools(pattern_type)
+        return len(unique)
+    
+    def _dedup_index(self) -> MinHashLSH:
+        """The near-duplicate index, loaded from the table the first time"""
+        if not self._dedup_loaded:
+            with self._dedup_lock:
+                if not self._dedup_loaded:
+                    session = self.Session()
+                    try:
+                        rows = session.query(
+                            SentencePattern.id, SentencePattern.pattern, SentencePattern.pattern_type,
+                            SentencePattern.category, SentencePattern.tone,
+                        ).all()
+                    finally:
+                        session.close()
+                    for row in rows:
+                        self.dedup.add(row.id, row.pattern or "", scope=_pool_key(row))
+                    self._dedup_loaded = True
+        return self.dedup
+    
+    def deduplicate(self) -> int:
+        """Merge near-duplicates already in the table, returns rows removed"""
+        self.flush()
+        with self._dedup_lock:
+            with self.engine.begin() as conn:
+                removed = merge_near_duplicates(conn, self.dedup.threshold)
+            self.dedup = MinHashLSH(threshold=self.dedup.threshold)
+            self._dedup_loaded = False
+        if removed:
+            self.selector.drop_pools(self.selector.pools())
+            logger.info(f"Merged {removed} near-duplicate sentence patterns")
+        return removed
+    
+    def _is_renderable(self, pattern: str) -> bool:
+        try:
+            validate_template(pattern)
+            return True
+        except TemplateError:
+            return False
     
     def _generalize_sentence(self, sentence: str) -> Optional[str]:
         """Convert a specific sentence into a reusable pattern"""
-        import re
-        
         # Replace specific numbers with placeholder
-        pattern = re.sub(r'\d+', '{NUMBER}', sentence)
+        pattern = _NUMBER.sub('{NUMBER}', sentence)
         
         # Replace specific technologies with placeholder
-        tech_terms = ['python', 'javascript', 'react', 'nodejs', 'django', 'flask', 'ai', 'ml']
-        for tech in tech_terms:
-            pattern = re.sub(rf'\b{tech}\b', '{TECHNOLOGY}', pattern, flags=re.IGNORECASE)
+        pattern = _TECH_TERM.sub('{TECHNOLOGY}', pattern)
         
         # Replace URLs
-        pattern = re.sub(r'https?://\S+', '{URL}', pattern)
+        pattern = _URL.sub('{URL}', pattern)
         
         # Only return if it has at least one placeholder
         if '{' in pattern:
@@ -430,6 +748,8 @@ class PatternMemory:
                 "article_templates": session.query(ArticleTemplate).count(),
                 "proposal_templates": session.query(ProposalTemplate).count(),
                 "email_patterns": session.query(EmailPattern).count(),
+                "selector": self.selector.get_stats(),
+                "dedup": dict(self.dedup.get_stats(), rejected=self.duplicates_rejected),
                 "best_patterns": [
                     p.pattern[:50] + "..." for p in session.query(SentencePattern).order_by(
                         SentencePattern.success_score.desc()
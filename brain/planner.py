@@ -1,9 +1,26 @@
 """
 Jephthah Task Planner
 Autonomous task scheduling and prioritization
+
+Tasks are ordered earliest virtual deadline first. A task's virtual
+deadline is its creation time plus a slack that grows as its priority
+drops, pulled earlier to (deadline - DEADLINE_LEAD) when it has a real
+deadline. The key is fixed when the task is created, so heap operations
+stay O(log n), yet a waiting low-priority task ages: newer tasks get later
+keys, and once they are later than its key it goes first. Ties go to the
+older task, then to the one added first.
+
+run_schedule runs tasks in parallel. Each task type belongs to a pool with
+its own concurrency limit (browser work is one at a time, I/O-only work
+runs side by side); failures are retried with exponential backoff and
+jitter, and throughput is tracked per task type.
 """
 
 import asyncio
+import itertools
+import random
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Callable
 import heapq
@@ -13,6 +30,7 @@ from loguru import logger
 
 from brain.memory import memory
 from brain.goals import goals, GoalCategory
+from brain.jobstore import JobStore, job_store
 
 
 class TaskPriority(int, Enum):
@@ -23,6 +41,36 @@ class TaskPriority(int, Enum):
     IDLE = 5
 
 
+# How long a task of each priority may wait before it outranks newer work
+# (a task waits at most the gap between its slack and CRITICAL's)
+PRIORITY_SLACK = {
+    TaskPriority.CRITICAL: timedelta(0),
+    TaskPriority.HIGH: timedelta(hours=1),
+    TaskPriority.MEDIUM: timedelta(hours=4),
+    TaskPriority.LOW: timedelta(hours=16),
+    TaskPriority.IDLE: timedelta(hours=48),
+}
+
+# Start deadline tasks this long before the deadline
+DEADLINE_LEAD = timedelta(minutes=10)
+
+_task_seq = itertools.count()
+
+# Concurrency pools: name -> tasks in flight; browser-driven types share one browser
+DEFAULT_POOLS = {"browser": 1, "io": 8}
+TASK_POOLS = {
+    "social": "browser",
+    "freelance": "browser",
+    "content": "browser",
+    "learning": "browser",
+    "trading": "browser",
+    "email": "io",
+    "communication": "io",
+}
+# Pause a pool slot after each task (human-like pacing for browser actions)
+POOL_GAP_SECONDS = {"browser": 5}
+
+
 class Task:
     """Represents a task to be executed"""
     
@@ -42,10 +90,20 @@ class Task:
         self.attempts = 0
         self.max_attempts = 3
         self.status = "pending"
+        self.key = None  # job store key, set when persisted
+        self.seq = next(_task_seq)
+        self.refresh_order()
+    
+    def refresh_order(self):
+        """Recompute the queue key (after changing created_at, priority or deadline)"""
+        virtual = self.created_at + PRIORITY_SLACK[self.priority]
+        if self.deadline is not None:
+            virtual = min(virtual, self.deadline - DEADLINE_LEAD)
+        self.order = (virtual, self.created_at, self.seq)
     
     def __lt__(self, other):
-        # For priority queue: lower priority value = higher importance
-        return self.priority.value < other.priority.value
+        # For priority queue: earliest virtual deadline first, then oldest
+        return self.order < other.order
     
     def to_dict(self) -> Dict:
         return {
@@ -57,13 +115,51 @@ class Task:
             "details": self.details,
             "status": self.status
         }
+    
+    def to_payload(self) -> Dict:
+        """Everything needed to rebuild the task from the job store"""
+        payload = self.to_dict()
+        payload.update({
+            "goal_id": self.goal_id,
+            "deadline": self.deadline.isoformat() if self.deadline else None,
+            "created_at": self.created_at.isoformat(),
+        })
+        return payload
+    
+    @classmethod
+    def from_stored(cls, row: Dict) -> "Task":
+        payload = row["payload"]
+        task = cls(
+            name=payload["name"],
+            task_type=payload["type"],
+            action=payload["action"],
+            priority=TaskPriority[payload["priority"]],
+            target=payload.get("target"),
+            details=payload.get("details"),
+            deadline=datetime.fromisoformat(payload["deadline"]) if payload.get("deadline") else None,
+            goal_id=payload.get("goal_id"),
+        )
+        task.created_at = datetime.fromisoformat(payload["created_at"])
+        task.refresh_order()
+        task.attempts = row["attempts"]
+        task.max_attempts = row["max_attempts"]
+        task.key = row["key"]
+        return task
 
 
 class TaskScheduler:
-    """Manages and schedules tasks"""
+    """
+    Manages and schedules tasks.
+    With a JobStore, queued tasks survive restarts and each one is claimed in
+    the store before it runs, so processes sharing the store never double-run.
+    """
     
-    def __init__(self):
+    def __init__(self, store: Optional[JobStore] = None, max_parallel: int = 8,
+                 pools: Dict[str, int] = None, task_pools: Dict[str, str] = None,
+                 default_pool_limit: int = 2, retry_base_seconds: float = 30,
+                 retry_max_seconds: float = 1800):
         self.task_queue: List[Task] = []
+        self.store = store
         self.completed_today = 0
         self.daily_targets = {
             "social": 10,      # Social media actions
@@ -74,30 +170,109 @@ class TaskScheduler:
         }
         self.task_handlers: Dict[str, Callable] = {}
         
+        # Parallel dispatch
+        self.max_parallel = max_parallel
+        self.pools = dict(DEFAULT_POOLS if pools is None else pools)
+        self.task_pools = dict(TASK_POOLS if task_pools is None else task_pools)
+        self.pool_gaps = dict(POOL_GAP_SECONDS)
+        self.default_pool_limit = default_pool_limit  # types without a pool get their own
+        self.pool_busy: Dict[str, int] = defaultdict(int)
+        self.pool_queued: Dict[str, int] = defaultdict(int)  # tasks in task_queue per pool
+        self.running: Dict[int, Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        # Retries wait here until due: (monotonic ready time, seq, task)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.delayed: List[tuple] = []
+        
+        # Per task type: completed, failed, retried, busy seconds, first start, last end
+        self.type_stats: Dict[str, Dict] = defaultdict(
+            lambda: {"completed": 0, "failed": 0, "retried": 0, "busy_seconds": 0.0,
+                     "first_start": None, "last_end": None}
+        )
+        
+        if self.store is not None:
+            self.recover()
+        
         logger.info("Task scheduler initialized")
     
     def register_handler(self, task_type: str, handler: Callable):
         """Register a handler for a task type"""
         self.task_handlers[task_type] = handler
     
-    def add_task(self, task: Task):
-        """Add a task to the queue"""
-        heapq.heappush(self.task_queue, task)
+    def add_task(self, task: Task) -> bool:
+        """
+        Add a task to the queue; False if the store has it queued or running
+        already. A task that finished earlier today (done or failed) is planned
+        again, so routine tasks repeat on every planning round.
+        """
+        if self.store is not None and task.key is None:
+            task.key = f"{task.created_at:%Y-%m-%d}:{task.name}"
+            values = dict(payload=task.to_payload(), priority=task.priority.value,
+                          max_attempts=task.max_attempts)
+            if not self.store.add(task.key, "planner", task.name, time.time(), **values):
+                stored = self.store.get(task.key)
+                if stored is not None and stored["status"] in ("pending", "claimed"):
+                    logger.debug(f"Task already planned: {task.name}")
+                    return False
+                self.store.add(task.key, "planner", task.name, time.time(), replace=True, **values)
+        self._enqueue(task)
         logger.debug(f"Task added: {task.name} (Priority: {task.priority.name})")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+    
+    def recover(self) -> int:
+        """Queue the store's pending tasks (after a restart), returns how many"""
+        tasks = [Task.from_stored(row) for row in self.store.recover("planner")]
+        for task in tasks:
+            self._enqueue(task)
+        return len(tasks)
+    
+    def _enqueue(self, task: Task):
+        heapq.heappush(self.task_queue, task)
+        self.pool_queued[self.pool_for(task.task_type)] += 1
+    
+    def _dequeue(self) -> Task:
+        task = heapq.heappop(self.task_queue)
+        self.pool_queued[self.pool_for(task.task_type)] -= 1
+        return task
     
     def get_next_task(self) -> Optional[Task]:
         """Get the next task to execute"""
+        self._promote_due()
         while self.task_queue:
-            task = heapq.heappop(self.task_queue)
-            
-            if task.attempts >= task.max_attempts:
-                logger.warning(f"Task failed max attempts: {task.name}")
-                continue
-            
-            return task
+            task = self._dequeue()
+            if self._claim(task):
+                return task
         
         return None
     
+    def _runnable(self, task: Task) -> bool:
+        if task.attempts >= task.max_attempts:
+            logger.warning(f"Task failed max attempts: {task.name}")
+            return False
+        return True
+    
+    def _claim(self, task: Task) -> bool:
+        """Final checks before a popped task runs (blocking; run_schedule claims in _run_in_pool)"""
+        if not self._runnable(task):
+            return False
+        
+        if self.store is not None and not self.store.claim(task.key):
+            logger.debug(f"Task claimed elsewhere: {task.name}")
+            return False
+        
+        return True
+    
+    def _promote_due(self) -> Optional[float]:
+        """Move retries whose backoff has passed into the queue; seconds until the next one"""
+        now = time.monotonic()
+        while self.delayed and self.delayed[0][0] <= now:
+            self._enqueue(heapq.heappop(self.delayed)[2])
+        return self.delayed[0][0] - now if self.delayed else None
+    
     def plan_day(self):
         """Generate tasks for the day based on goals"""
         logger.info("Planning daily tasks")
@@ -174,11 +349,18 @@ class TaskScheduler:
         if not handler:
             logger.warning(f"No handler for task type: {task.task_type}")
             task.status = "skipped"
+            await self._release(task, error="no handler")
             return False
         
+        stats = self.type_stats[task.task_type]
+        started = time.monotonic()
+        if stats["first_start"] is None:
+            stats["first_start"] = started
         try:
             result = await handler(task)
             task.status = "completed" if result else "failed"
+            await self._release(task, error=None if result else "handler returned False")
+            stats["completed" if result else "failed"] += 1
             
             if result:
                 self.completed_today += 1
@@ -194,35 +376,135 @@ class TaskScheduler:
             logger.error(f"Task execution error: {e}")
             task.status = "error"
             
-            # Re-add to queue if attempts remaining
+            # Retry after a backoff if attempts remaining
             if task.attempts < task.max_attempts:
-                self.add_task(task)
+                delay = self.retry_delay(task.attempts)
+                await self._release(task, error=str(e), retry_at=time.time() + delay)
+                heapq.heappush(self.delayed, (time.monotonic() + delay, task.seq, task))
+                stats["retried"] += 1
+                logger.info(f"Retrying {task.name} in {delay:.0f}s (attempt {task.attempts})")
+            else:
+                await self._release(task, error=str(e))
+                stats["failed"] += 1
             
             return False
+        
+        finally:
+            ended = time.monotonic()
+            stats["busy_seconds"] += ended - started
+            stats["last_end"] = ended
+    
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with full-range jitter (0.5x to 1.5x)"""
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+    
+    async def _release(self, task: Task, error: Optional[str] = None, retry_at: float = None):
+        """Record the outcome of a claimed task in the store (off the event loop)"""
+        if self.store is None or task.key is None:
+            return
+        if error is None:
+            await asyncio.to_thread(self.store.complete, task.key)
+        else:
+            await asyncio.to_thread(self.store.fail, task.key, error, retry_at)
+    
+    # === PARALLEL DISPATCH ===
     
-    async def run_schedule(self, duration_hours: float = 24):
-        """Run the scheduler for a duration"""
+    def pool_for(self, task_type: str) -> str:
+        """Concurrency pool of a task type; unknown types get a pool of their own"""
+        pool = self.task_pools.get(task_type, task_type)
+        if pool not in self.pools:
+            self.pools[pool] = self.default_pool_limit
+        return pool
+    
+    def _start_ready(self) -> List[asyncio.Task]:
+        """
+        Start queued tasks in order while slots are free. A task whose pool is
+        full is passed over (kept queued) so other pools are not blocked, and
+        the scan stops once no pool with queued tasks has a free slot.
+        """
+        started, held = [], []
+        # Queued tasks that could start now: those in pools with a free slot
+        startable = sum(count for pool, count in self.pool_queued.items()
+                        if count and self.pool_busy[pool] < self.pools[pool])
+        while startable and len(self.running) < self.max_parallel:
+            task = self._dequeue()
+            pool = self.pool_for(task.task_type)
+            if self.pool_busy[pool] >= self.pools[pool]:
+                held.append(task)
+                continue
+            startable -= 1
+            if not self._runnable(task):
+                continue
+            self.pool_busy[pool] += 1
+            if self.pool_busy[pool] >= self.pools[pool]:
+                startable -= self.pool_queued[pool]
+            self.running[task.seq] = task
+            started.append(asyncio.ensure_future(self._run_in_pool(task, pool)))
+        for task in held:
+            self._enqueue(task)
+        return started
+    
+    async def _run_in_pool(self, task: Task, pool: str):
+        try:
+            if self.store is not None and not await asyncio.to_thread(self.store.claim, task.key):
+                logger.debug(f"Task claimed elsewhere: {task.name}")
+                return
+            logger.info(f"Executing: {task.name}")
+            await self.execute_task(task)
+            gap = self.pool_gaps.get(pool, 0)
+            if gap:
+                await asyncio.sleep(gap)
+        finally:
+            self.pool_busy[pool] -= 1
+            self.running.pop(task.seq, None)
+    
+    async def run_schedule(self, duration_hours: float = 24, stop_when_idle: bool = False):
+        """
+        Run tasks in parallel for a duration. With stop_when_idle, return once
+        nothing is queued, waiting for a retry or running (instead of re-planning).
+        """
         logger.info(f"Starting scheduler for {duration_hours} hours")
         
         end_time = datetime.utcnow() + timedelta(hours=duration_hours)
+        self._wakeup = asyncio.Event()
+        inflight = set()
         
-        while datetime.utcnow() < end_time:
-            task = self.get_next_task()
-            
-            if task:
-                logger.info(f"Executing: {task.name}")
-                await self.execute_task(task)
+        try:
+            while datetime.utcnow() < end_time:
+                self._wakeup.clear()
+                next_retry = self._promote_due()
+                inflight.update(self._start_ready())
                 
-                # Small delay between tasks
-                await asyncio.sleep(5)
-            else:
-                # No tasks, wait and plan more
-                logger.info("No tasks in queue, waiting...")
-                await asyncio.sleep(60)
+                if not inflight and not self.task_queue:
+                    if next_retry is None and stop_when_idle:
+                        break
+                    if next_retry is None:
+                        # No tasks, wait and plan more
+                        logger.info("No tasks in queue, waiting...")
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), 60)
+                        except asyncio.TimeoutError:
+                            pass
+                        
+                        # Re-plan if needed
+                        if not self.task_queue and not self.delayed:
+                            self.plan_day()
+                        continue
                 
-                # Re-plan if needed
-                if not self.task_queue:
-                    self.plan_day()
+                # Sleep until a task finishes, a task is added or a retry is due
+                timeout = min(next_retry if next_retry is not None else 60,
+                              (end_time - datetime.utcnow()).total_seconds())
+                waiter = asyncio.ensure_future(self._wakeup.wait())
+                done, _ = await asyncio.wait(inflight | {waiter}, timeout=max(0, timeout),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                inflight -= done
+            
+            if inflight:
+                await asyncio.gather(*inflight, return_exceptions=True)
+        finally:
+            self._wakeup = None
         
         logger.info(f"Scheduler complete. Tasks done today: {self.completed_today}")
     
@@ -231,9 +513,28 @@ class TaskScheduler:
         return {
             "pending_tasks": len(self.task_queue),
             "completed_today": self.completed_today,
-            "next_task": self.task_queue[0].name if self.task_queue else None
+            "next_task": self.task_queue[0].name if self.task_queue else None,
+            "running": [task.name for task in self.running.values()],
+            "waiting_retry": len(self.delayed),
+            "pools": {pool: f"{self.pool_busy[pool]}/{limit}" for pool, limit in self.pools.items()},
+            "throughput": self.get_throughput(),
         }
+    
+    def get_throughput(self) -> Dict:
+        """Per task type: outcomes, mean run time and completed tasks per hour"""
+        result = {}
+        for task_type, stats in self.type_stats.items():
+            runs = stats["completed"] + stats["failed"] + stats["retried"]
+            span = (stats["last_end"] or 0) - (stats["first_start"] or 0)
+            result[task_type] = {
+                "completed": stats["completed"],
+                "failed": stats["failed"],
+                "retried": stats["retried"],
+                "mean_seconds": round(stats["busy_seconds"] / runs, 3) if runs else 0.0,
+                "per_hour": round(stats["completed"] / span * 3600, 1) if span > 0 else 0.0,
+            }
+        return result
 
 
 # Global scheduler instance
-scheduler = TaskScheduler()
+scheduler = TaskScheduler(store=job_store)
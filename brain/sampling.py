@@ -0,0 +1,250 @@
+"""
+Jephthah Sampling
+O(1) weighted random sampling over cached ids (Vose alias method)
+
+Items live in groups (e.g. entity_type); every group plus the "all" group has
+its own alias table. New items go into a small per-group delta with a prefix
+sum and are folded into the alias table once the delta (or the number of
+weight changes) passes a fraction of the table size, so adds stay cheap and
+samples stay O(1) amortized.
+"""
+
+import random
+from array import array
+from bisect import bisect_right
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+ALL = object()  # group key for "every item"
+
+
+class AliasTable:
+    """Static alias table: build O(n), sample O(1)"""
+
+    def __init__(self, items: Iterable[Tuple[int, float]] = ()):
+        self.ids = array("q")
+        self.prob = array("d")
+        self.alias = array("q")
+        self.total = 0.0
+
+        weights = array("d")
+        for item_id, weight in items:
+            self.ids.append(item_id)
+            weights.append(weight)
+        n = len(self.ids)
+        if not n:
+            return
+
+        self.total = sum(weights)
+        if self.total <= 0:
+            weights = array("d", [1.0]) * n
+            self.total = float(n)
+
+        self.prob = array("d", (w * n / self.total for w in weights))
+        self.alias = array("q", range(n))
+        small = [i for i in range(n) if self.prob[i] < 1.0]
+        large = [i for i in range(n) if self.prob[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            self.alias[s] = l
+            self.prob[l] -= 1.0 - self.prob[s]
+            if self.prob[l] < 1.0:
+                small.append(large.pop())
+        for i in small + large:  # leftovers are 1.0 up to rounding
+            self.prob[i] = 1.0
+
+    @classmethod
+    def from_arrays(cls, ids, prob, alias, total: float) -> "AliasTable":
+        """Adopt a prebuilt table (e.g. memoryviews over a snapshot)"""
+        table = cls()
+        table.ids, table.prob, table.alias, table.total = ids, prob, alias, total
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def sample(self, rng: random.Random) -> int:
+        column = rng.randrange(len(self.ids))
+        if rng.random() < self.prob[column]:
+            return self.ids[column]
+        return self.ids[self.alias[column]]
+
+
+class _Group:
+    __slots__ = ("table", "delta_ids", "delta_cumulative", "stale")
+
+    def __init__(self):
+        self.table = AliasTable()
+        self.delta_ids: List[int] = []
+        self.delta_cumulative: List[float] = []
+        self.stale = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.table) + len(self.delta_ids)
+
+    @property
+    def delta_total(self) -> float:
+        return self.delta_cumulative[-1] if self.delta_cumulative else 0.0
+
+
+class WeightedSampler:
+    """Weighted (or uniform) sampling of ids, optionally restricted to a group"""
+
+    def __init__(self, rebuild_ratio: float = 0.1, min_rebuild: int = 256,
+                 seed: Optional[int] = None):
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+        self.rng = random.Random(seed)
+
+        self._weight_map: Dict[int, float] = {}
+        self._group_map: Dict[int, Hashable] = {}
+        self._state_loader: Optional[Callable[[], Tuple[Dict, Dict]]] = None
+        self._groups: Dict[Hashable, _Group] = {}
+        self.rebuilds = 0
+
+    @property
+    def _weights(self) -> Dict[int, float]:
+        if self._state_loader is not None:
+            self._materialize()
+        return self._weight_map
+
+    @property
+    def _item_group(self) -> Dict[int, Hashable]:
+        if self._state_loader is not None:
+            self._materialize()
+        return self._group_map
+
+    def _materialize(self):
+        loader, self._state_loader = self._state_loader, None
+        self._weight_map, self._group_map = loader()
+
+    # === UPDATES ===
+
+    def load(self, items: Iterable[Tuple[int, float, Hashable]]):
+        """Replace everything with (id, weight, group) rows and build all tables"""
+        self._state_loader = None
+        self._weight_map = {}
+        self._group_map = {}
+        for item_id, weight, group in items:
+            self._weight_map[item_id] = max(weight, 0.0)
+            self._group_map[item_id] = group
+        self._groups = {}
+        for key in set(self._group_map.values()) | {ALL}:
+            self._rebuild(key)
+
+    def restore(self, tables: Dict[Hashable, AliasTable],
+                state_loader: Callable[[], Tuple[Dict[int, float], Dict[int, Hashable]]]):
+        """
+        Adopt previously exported tables without rebuilding them. The per-item
+        weight/group maps only matter for updates, so state_loader is called
+        lazily on the first add or rebuild.
+        """
+        groups = {}
+        for key, table in tables.items():
+            entry = _Group()
+            entry.table = table
+            groups[key] = entry
+        self._groups = groups
+        self._state_loader = state_loader
+
+    def tables(self) -> Dict[Hashable, AliasTable]:
+        """Every group's alias table, rebuilt first wherever adds are pending"""
+        for key, entry in list(self._groups.items()):
+            if entry.delta_ids or entry.stale:
+                self._rebuild(key)
+        return {key: entry.table for key, entry in self._groups.items()}
+
+    def add(self, item_id: int, weight: float, group: Hashable = None):
+        """Add an item, or change its weight (applied at the next rebuild)"""
+        weight = max(weight, 0.0)
+        if item_id in self._weights:
+            if self._weights[item_id] != weight:
+                self._weights[item_id] = weight
+                for key in (self._item_group[item_id], ALL):
+                    self._touch(key)
+            return
+
+        self._weights[item_id] = weight
+        self._item_group[item_id] = group
+        for key in (group, ALL):
+            entry = self._groups.setdefault(key, _Group())
+            entry.delta_ids.append(item_id)
+            entry.delta_cumulative.append(entry.delta_total + weight)
+            self._maybe_rebuild(key)
+
+    def _touch(self, key: Hashable):
+        self._groups[key].stale += 1
+        self._maybe_rebuild(key)
+
+    def _maybe_rebuild(self, key: Hashable):
+        entry = self._groups[key]
+        pending = len(entry.delta_ids) + entry.stale
+        if pending > max(self.min_rebuild, self.rebuild_ratio * len(entry.table)):
+            self._rebuild(key)
+
+    def _rebuild(self, key: Hashable):
+        if key is ALL:
+            items = self._weights.items()
+        else:
+            items = ((i, w) for i, w in self._weights.items() if self._item_group[i] == key)
+        entry = _Group()
+        entry.table = AliasTable(items)
+        self._groups[key] = entry
+        self.rebuilds += 1
+
+    # === SAMPLING ===
+
+    def _draw(self, entry: _Group, weighted: bool) -> int:
+        if not weighted:
+            index = self.rng.randrange(entry.size)
+            if index < len(entry.table):
+                return entry.table.ids[index]
+            return entry.delta_ids[index - len(entry.table)]
+
+        delta_total = entry.delta_total
+        if entry.table.total + delta_total <= 0:
+            return self._draw(entry, False)
+        point = self.rng.random() * (entry.table.total + delta_total)
+        if point < entry.table.total or not delta_total:
+            return entry.table.sample(self.rng)
+        index = bisect_right(entry.delta_cumulative, point - entry.table.total)
+        return entry.delta_ids[min(index, len(entry.delta_ids) - 1)]
+
+    def sample(self, k: int, group: Hashable = ALL, weighted: bool = True) -> List[int]:
+        """Up to k distinct ids, drawn in proportion to weight (or uniformly)"""
+        entry = self._groups.get(group)
+        if entry is None or not entry.size or k <= 0:
+            return []
+        if k >= entry.size:
+            ids = list(entry.table.ids) + entry.delta_ids
+            self.rng.shuffle(ids)
+            return ids
+
+        chosen = {}
+        attempts = 0
+        # Rejection of repeats; bounded so heavily skewed weights cannot spin
+        while len(chosen) < k and attempts < 20 * k:
+            chosen.setdefault(self._draw(entry, weighted), None)
+            attempts += 1
+        return list(chosen)
+
+    def __len__(self) -> int:
+        if self._state_loader is not None:
+            entry = self._groups.get(ALL)
+            return entry.size if entry else 0
+        return len(self._weight_map)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._weights
+
+    def weight(self, item_id: int, default: Optional[float] = None) -> Optional[float]:
+        return self._weights.get(item_id, default)
+
+    def get_stats(self) -> Dict:
+        return {
+            "items": len(self),
+            "groups": len(self._groups) - 1,
+            "rebuilds": self.rebuilds,
+        }
@@ -1,57 +1,378 @@
+"""
+Jephthah Scheduler
+Heap-ordered one-shot and recurring jobs, dispatched concurrently
+
+Jobs sit in a min-heap keyed by their next run time (monotonic clock), so
+adding a job is O(log n) and the next due job is always at the top. The run
+loop sleeps until exactly that time with loop.call_at, and is woken early
+when a sooner job is added; nothing polls.
+
+Due runs are started as tasks, so a slow job never holds up the others:
+- max_concurrency caps runs in flight across all jobs (the rest queue)
+- max_instances caps concurrent runs of one job (extra runs are skipped)
+- a run that cannot start within misfire_grace_seconds of its time is dropped
+- coalesce folds several missed runs of a recurring job into one
+
+With a JobStore attached, jobs are persisted by key: recurring jobs resume
+their stored next run after a restart, one-shot jobs added with persist=True
+come back through restore(), and every run is claimed in the store first so two processes
+sharing it never run the same job. The store holds one claim per key, so a
+persisted job runs one instance at a time: max_instances > 1 needs persist=False.
+"""
+
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Callable
+import heapq
+import itertools
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Callable, Optional
 from loguru import logger
 
+from brain.jobstore import JobStore, job_store
+
+
+class Job:
+    """One scheduled callable; interval is None for one-shot jobs"""
+    
+    __slots__ = ("id", "name", "func", "run_at", "interval", "max_instances",
+                 "misfire_grace", "coalesce", "key", "running", "runs", "cancelled")
+    
+    def __init__(self, job_id: int, name: str, func: Callable, run_at: float,
+                 interval: Optional[float] = None, max_instances: int = 1,
+                 misfire_grace: Optional[float] = None, coalesce: bool = True,
+                 key: Optional[str] = None):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.run_at = run_at              # time.monotonic() seconds
+        self.interval = interval          # seconds between runs
+        self.max_instances = max_instances
+        self.misfire_grace = misfire_grace  # None: run however late
+        self.coalesce = coalesce
+        self.key = key                    # job store key, None when not persisted
+        self.running = 0
+        self.runs = 0
+        self.cancelled = False
+    
+    @property
+    def recurring(self) -> bool:
+        return self.interval is not None
+
 
 class Scheduler:
-    def __init__(self):
-        self.tasks = []
-        self.recurring = []
-        self.completed = 0
+    def __init__(self, max_concurrency: int = 10, misfire_grace_seconds: Optional[float] = None,
+                 max_catch_up: int = 100, lag_window: int = 1000,
+                 store: Optional[JobStore] = None, queue: str = "scheduler"):
+        self._heap: List[tuple] = []          # (run_at, seq, job)
+        self._jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: set = set()
+        self.max_concurrency = max_concurrency
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.max_catch_up = max_catch_up  # missed runs replayed per wakeup when not coalescing
+        self.store = store
+        self.queue = queue                # this scheduler's rows in the store
+        self._recovered: Optional[List[Dict]] = None
         
-    def add(self, name: str, func: Callable, delay_seconds: int = 0):
-        run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
-        self.tasks.append({"name": name, "func": func, "run_at": run_at})
-        self.tasks.sort(key=lambda x: x["run_at"])
+        self.completed = 0
+        self.failed = 0
+        self.misfired = 0
+        self.skipped = 0                  # max_instances reached
+        self.coalesced = 0                # missed runs folded into one
+        self.contended = 0                # runs another process claimed first
+        self.queued = 0                   # dispatched, waiting for a slot
+        self.running = 0
+        # How late runs start vs their scheduled time (seconds), recent window
+        self.lateness_max = 0.0
+        self._lags: Deque[float] = deque(maxlen=lag_window)
+    
+    # === ADDING / REMOVING ===
+    
+    def add(self, name: str, func: Callable, delay_seconds: float = 0,
+            misfire_grace_seconds: Optional[float] = None, persist: bool = False) -> Job:
+        """
+        One-shot job. With persist and a store it is persisted under a fresh
+        key; after a restart restore() brings it back if a handler for name is
+        given. Only persist jobs whose owner calls restore(), or the row stays
+        pending in the store.
+        """
+        key = f"{name}:{uuid.uuid4().hex[:12]}" if self.store is not None and persist else None
+        job = Job(
+            next(self._ids), name, func, time.monotonic() + delay_seconds,
+            misfire_grace=self._grace(misfire_grace_seconds), key=key,
+        )
+        if key is not None:
+            self.store.add(key, self.queue, name, _to_wall(job.run_at))
+        return self._schedule(job)
+    
+    def add_recurring(self, name: str, func: Callable, interval_minutes: float,
+                      first_delay_seconds: float = 0, max_instances: int = 1,
+                      misfire_grace_seconds: Optional[float] = None,
+                      coalesce: bool = True, persist: bool = True) -> Job:
+        """
+        First run after first_delay_seconds (immediately by default), then every
+        interval. With a store the job is keyed by name and, if it was stored
+        before, resumes at its stored next run time. A stored job holds a single
+        claim, so max_instances > 1 requires persist=False.
+        """
+        interval = interval_minutes * 60
+        run_at = time.monotonic() + first_delay_seconds
+        key = name if self.store is not None and persist else None
+        if key is not None:
+            if max_instances > 1:
+                raise ValueError(f"{name}: max_instances > 1 cannot be used with a job store (pass persist=False)")
+            self._recover()
+            stored = self.store.get(key)
+            if stored is not None and stored["status"] in ("pending", "claimed"):
+                run_at = _to_monotonic(stored["next_run_at"])
+            else:
+                self.store.add(key, self.queue, name, _to_wall(run_at), interval=interval, replace=True)
+        return self._schedule(Job(
+            next(self._ids), name, func, run_at,
+            interval=interval, max_instances=max_instances,
+            misfire_grace=self._grace(misfire_grace_seconds), coalesce=coalesce, key=key,
+        ))
+    
+    def restore(self, handlers: Dict[str, Callable]) -> int:
+        """Re-schedule stored one-shot jobs whose name has a handler, returns how many"""
+        if self.store is None:
+            return 0
+        restored = 0
+        for row in self._recover():
+            func = handlers.get(row["name"])
+            if row["interval"] is not None or func is None:
+                continue
+            self._schedule(Job(
+                next(self._ids), row["name"], func, _to_monotonic(row["next_run_at"]),
+                misfire_grace=self.misfire_grace_seconds, key=row["key"],
+            ))
+            restored += 1
+        return restored
+    
+    def _recover(self) -> List[Dict]:
+        """Run the store's startup pass once (releases claims of dead processes)"""
+        if self._recovered is None:
+            self._recovered = self.store.recover(self.queue)
+        return self._recovered
+    
+    def _grace(self, seconds: Optional[float]) -> Optional[float]:
+        return seconds if seconds is not None else self.misfire_grace_seconds
+    
+    def _schedule(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+            earliest = not self._heap or job.run_at < self._heap[0][0]
+            heapq.heappush(self._heap, (job.run_at, next(self._seq), job))
+        if earliest:
+            self._wake()
+        return job
+    
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job; its heap entry is dropped lazily when it reaches the top"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job.cancelled = True
+        if job.key is not None:
+            self.store.remove(job.key)
+        return True
+    
+    def _wake(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    # === DUE RUNS ===
+    
+    def next_run_time(self) -> Optional[float]:
+        """Monotonic time of the earliest live job, or None"""
+        with self._lock:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+    
+    def _pop_due(self, now: float) -> Optional[Job]:
+        with self._lock:
+            while self._heap:
+                run_at, _, job = self._heap[0]
+                if job.cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+                if run_at > now:
+                    return None
+                heapq.heappop(self._heap)
+                return job
+            return None
+    
+    def _due_runs(self, job: Job, now: float) -> List[float]:
+        """
+        Scheduled times of the runs job owes at `now`, and reschedule it.
+        A recurring job that missed several runs owes one (the latest) when
+        coalescing, otherwise each of them up to max_catch_up.
+        """
+        if not job.recurring:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            return [job.run_at]
         
-    def add_recurring(self, name: str, func: Callable, interval_minutes: int):
-        self.recurring.append({
-            "name": name,
-            "func": func,
-            "interval": timedelta(minutes=interval_minutes),
-            "last_run": None
-        })
+        missed = int(math.floor((now - job.run_at) / job.interval)) + 1
+        if job.coalesce:
+            times = [job.run_at + (missed - 1) * job.interval]
+            self.coalesced += missed - 1
+        else:
+            first = max(0, missed - self.max_catch_up)
+            times = [job.run_at + k * job.interval for k in range(first, missed)]
+        # Fixed rate: the next run stays on the original grid
+        job.run_at += missed * job.interval
+        with self._lock:
+            if not job.cancelled:
+                heapq.heappush(self._heap, (job.run_at, next(self._seq), job))
+        return times
+    
+    # === RUNNING ===
     
     async def run_next(self) -> bool:
-        now = datetime.utcnow()
-        for task in self.tasks:
-            if task["run_at"] <= now:
-                try:
-                    await task["func"]()
-                    self.completed += 1
-                    logger.info(f"Task done: {task['name']}")
-                except Exception as e:
-                    logger.error(f"Task error {task['name']}: {e}")
-                self.tasks.remove(task)
-                return True
-        for rec in self.recurring:
-            if rec["last_run"] is None or (now - rec["last_run"]) >= rec["interval"]:
-                try:
-                    await rec["func"]()
-                    self.completed += 1
-                    rec["last_run"] = now
-                    logger.info(f"Recurring done: {rec['name']}")
-                except Exception as e:
-                    logger.error(f"Recurring error {rec['name']}: {e}")
-                return True
-        return False
+        """Run the earliest due job inline (for stepping by hand), if any"""
+        now = time.monotonic()
+        job = self._pop_due(now)
+        if job is None:
+            return False
+        for scheduled in self._due_runs(job, now):
+            await self._execute(job, scheduled)
+        return True
+    
+    def dispatch_due(self) -> int:
+        """Start every due run as a task (must be called on the loop), returns how many"""
+        now = time.monotonic()
+        started = 0
+        while True:
+            job = self._pop_due(now)
+            if job is None:
+                return started
+            for scheduled in self._due_runs(job, now):
+                if job.running >= job.max_instances:
+                    self.skipped += 1
+                    logger.warning(f"Skipped {job.name}: {job.running} instance(s) still running")
+                    continue
+                job.running += 1
+                self.queued += 1
+                task = asyncio.ensure_future(self._run_slot(job, scheduled))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                started += 1
+    
+    async def _run_slot(self, job: Job, scheduled: float):
+        try:
+            async with self._slots:
+                self.queued -= 1
+                await self._execute(job, scheduled, counted=True)
+        finally:
+            job.running -= 1
+    
+    async def _execute(self, job: Job, scheduled: float, counted: bool = False):
+        lateness = time.monotonic() - scheduled
+        if job.misfire_grace is not None and lateness > job.misfire_grace:
+            self.misfired += 1
+            logger.warning(f"Misfire {job.name}: {lateness:.1f}s late (grace {job.misfire_grace}s)")
+            if job.key is not None and not job.recurring and await asyncio.to_thread(self.store.claim, job.key):
+                await asyncio.to_thread(self.store.fail, job.key, f"misfired {lateness:.1f}s late")
+            return
+        # Store calls are SQLite round trips: keep them off the loop
+        if job.key is not None and not await asyncio.to_thread(self.store.claim, job.key):
+            self.contended += 1
+            logger.debug(f"Skipped {job.name}: claimed elsewhere")
+            return
+        self.lateness_max = max(self.lateness_max, lateness)
+        self._lags.append(lateness)
+        
+        if not counted:
+            job.running += 1
+        self.running += 1
+        kind = "Recurring" if job.recurring else "Task"
+        try:
+            await job.func()
+            job.runs += 1
+            self.completed += 1
+            if job.key is not None:
+                await asyncio.to_thread(self.store.complete, job.key,
+                                        _to_wall(job.run_at) if job.recurring else None)
+            logger.info(f"{kind} done: {job.name}")
+        except Exception as e:
+            self.failed += 1
+            if job.key is not None:
+                await asyncio.to_thread(self.store.fail, job.key, e,
+                                        _to_wall(job.run_at) if job.recurring else None)
+            logger.error(f"{kind} error {job.name}: {e}")
+        finally:
+            self.running -= 1
+            if not counted:
+                job.running -= 1
     
     async def run_forever(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
         while True:
-            ran = await self.run_next()
-            if not ran:
-                await asyncio.sleep(1)
+            self.dispatch_due()
+            
+            when = self.next_run_time()
+            timer = None
+            if when is not None:
+                # loop.time() and time.monotonic() share a clock by default; convert anyway
+                timer = self._loop.call_at(self._loop.time() + (when - time.monotonic()),
+                                           self._wakeup.set)
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if timer is not None:
+                timer.cancel()
+    
+    # === INTROSPECTION ===
+    
+    @property
+    def tasks(self) -> List[Job]:
+        """Pending one-shot jobs, soonest first"""
+        return sorted((j for j in self._jobs.values() if not j.recurring), key=lambda j: j.run_at)
+    
+    @property
+    def recurring(self) -> List[Job]:
+        return [j for j in self._jobs.values() if j.recurring]
+    
+    def get_stats(self) -> Dict:
+        lags = sorted(self._lags)
+        return {
+            "jobs": len(self._jobs),
+            "recurring": sum(1 for j in self._jobs.values() if j.recurring),
+            "queue_depth": self.queued,
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "misfired": self.misfired,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "contended": self.contended,
+            "lag_mean_ms": round(sum(lags) / len(lags) * 1000, 3) if lags else 0.0,
+            "lag_p95_ms": round(lags[int(0.95 * (len(lags) - 1))] * 1000, 3) if lags else 0.0,
+            "lag_max_ms": round(self.lateness_max * 1000, 3),
+        }
+
+
+def _to_wall(monotonic_time: float) -> float:
+    """Monotonic run time -> unix seconds, for the store"""
+    return time.time() + (monotonic_time - time.monotonic())
+
+
+def _to_monotonic(wall_time: float) -> float:
+    return time.monotonic() + (wall_time - time.time())
 
 
 class ActionQueue:
@@ -108,6 +429,6 @@ class WorkSession:
         }
 
 
-task_scheduler = Scheduler()
+task_scheduler = Scheduler(store=job_store)
 action_queue = ActionQueue()
 work_session = WorkSession()
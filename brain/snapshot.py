@@ -0,0 +1,151 @@
+"""
+Jephthah Snapshots
+Versioned, memory-mappable binary files of typed arrays
+
+Layout:
+    magic (8 bytes) | format version (u32) | header length (u32) | header JSON
+    | sections, each 8-byte aligned
+
+The header holds free-form metadata plus a directory of
+{section: [offset, byte length, typecode]}. Numeric sections are returned as
+memoryviews over the mapped file (zero-copy, copy-on-write); string columns
+are NUL-joined UTF-8 blobs.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+MAGIC = b"JEPHSNAP"
+_PREAMBLE = struct.Struct("<8sII")
+
+Section = Union[array, bytes, memoryview]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def pack_strings(values: Iterable[str]) -> bytes:
+    """NUL-joined UTF-8 (NULs inside values are dropped)"""
+    return "\x00".join((v or "").replace("\x00", "") for v in values).encode("utf-8")
+
+
+def unpack_strings(blob: memoryview, count: int) -> List[str]:
+    if not count:
+        return []
+    return bytes(blob).decode("utf-8").split("\x00")
+
+
+def write_snapshot(path: Path, version: int, meta: Dict, sections: Dict[str, Section]):
+    """Write atomically (temp file + rename) so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    views = {name: memoryview(data) for name, data in sections.items()}
+    directory = {}
+    offset = 0
+    for name, view in views.items():
+        directory[name] = [offset, view.nbytes, view.format]
+        offset += view.nbytes + (-view.nbytes % 8)
+
+    header = json.dumps({"meta": meta, "sections": directory}).encode("utf-8")
+    header += b" " * (-(len(header) + _PREAMBLE.size) % 8)
+    base = _PREAMBLE.size + len(header)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, version, len(header)))
+        f.write(header)
+        for name, view in views.items():
+            f.seek(base + directory[name][0])
+            f.write(view)
+        f.truncate(base + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path, version: int) -> Tuple[Dict, Dict[str, memoryview], mmap.mmap]:
+    """
+    Map a snapshot, returns (meta, sections, mapping). Keep the mapping
+    alive as long as any section view is in use.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if len(mapping) < _PREAMBLE.size:
+        raise SnapshotError(f"{path} is not a snapshot")
+    magic, file_version, header_len = _PREAMBLE.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not a snapshot")
+    if file_version != version:
+        raise SnapshotError(f"{path} is format v{file_version}, expected v{version}")
+
+    header = json.loads(mapping[_PREAMBLE.size:_PREAMBLE.size + header_len])
+    base = _PREAMBLE.size + header_len
+    view = memoryview(mapping)
+    sections = {}
+    for name, (offset, length, typecode) in header["sections"].items():
+        section = view[base + offset:base + offset + length]
+        sections[name] = section.cast(typecode) if typecode != "B" else section
+    return header["meta"], sections, mapping
+
+
+class SortedStringMap(MutableMapping):
+    """
+    str -> int mapping over a sorted key list and a parallel value array (e.g.
+    straight from a snapshot), so loading costs one split instead of hashing
+    every key. Lookups bisect; writes and deletes go to a small overlay.
+    """
+
+    def __init__(self, sorted_keys: List[str], values):
+        self._keys = sorted_keys
+        self._values = values
+        self._overlay: Dict[str, int] = {}
+        self._deleted = set()
+
+    def _base_index(self, key: str) -> int:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return -1
+
+    def __getitem__(self, key: str) -> int:
+        if key in self._overlay:
+            return self._overlay[key]
+        if key not in self._deleted:
+            i = self._base_index(key)
+            if i >= 0:
+                return self._values[i]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: int):
+        self._deleted.discard(key)
+        self._overlay[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._overlay:
+            del self._overlay[key]
+            if self._base_index(key) >= 0:
+                self._deleted.add(key)
+        elif key not in self._deleted and self._base_index(key) >= 0:
+            self._deleted.add(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys:
+            if key not in self._overlay and key not in self._deleted:
+                yield key
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        base = len(self._keys) - len(self._deleted)
+        return base + sum(1 for key in self._overlay if self._base_index(key) < 0)
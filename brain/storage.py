@@ -0,0 +1,109 @@
+"""
+Jephthah Storage Engine
+Shared SQLite engine setup for all of Jephthah's databases
+
+Every database gets:
+- A bounded connection pool instead of a connection per session
+- WAL journaling so readers never block the writer
+- Tuned synchronous / mmap / cache pragmas
+- A per-connection prepared statement cache
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+# Pragmas applied to every new pooled connection
+DEFAULT_PRAGMAS: Dict[str, object] = {
+    "journal_mode": "WAL",        # concurrent readers + one writer
+    "synchronous": "NORMAL",      # fsync on checkpoint only (safe with WAL)
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,         # negative = KiB, so ~64 MB page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,         # ms to wait on a locked db before failing
+}
+
+
+def create_sqlite_engine(db_path: Path, pool_size: int = 10, max_overflow: int = 20,
+                         statement_cache: int = 512,
+                         pragmas: Optional[Dict[str, object]] = None) -> Engine:
+    """Create a pooled, WAL-mode SQLite engine for db_path"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=False,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 30,
+            # sqlite3 keeps this many compiled statements per connection
+            "cached_statements": statement_cache,
+        },
+    )
+
+    _install_pragmas(engine, pragmas)
+    return engine
+
+
+def create_async_sqlite_engine(db_path: Path, pool_size: int = 10, max_overflow: int = 20,
+                               statement_cache: int = 512,
+                               pragmas: Optional[Dict[str, object]] = None) -> AsyncEngine:
+    """Async (aiosqlite) counterpart of create_sqlite_engine, same pragmas"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={"timeout": 30, "cached_statements": statement_cache},
+    )
+    _install_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+
+def _install_pragmas(engine: Engine, pragmas: Optional[Dict[str, object]]):
+    settings = dict(DEFAULT_PRAGMAS)
+    settings.update(pragmas or {})
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in settings.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def get_pragma(engine: Engine, name: str):
+    """Read back a pragma value (useful for stats and debugging)"""
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+class QueryCounter:
+    """Counts statements sent to SQLite on the given engines while active"""
+
+    def __init__(self, *engines: Engine):
+        self.engines = engines
+        self.count = 0
+
+    def _count(self, *_args):
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *_exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._count)
@@ -0,0 +1,144 @@
+"""
+Jephthah Templates
+Pattern placeholders ({TOPIC}, {SKILLS}, ...) parsed once and rendered with one join
+
+A template compiles to its static segments and slot names. Compiled forms are
+cached per stored pattern, and slots are checked against the known slot
+vocabulary when a pattern is learned, so rendering never has to guess.
+"""
+
+import re
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+from brain.cache import LRUCache, MISSING
+
+
+SLOT = re.compile(r"\{([A-Z][A-Z0-9_]*)\}")
+
+# Every slot a stored pattern may use, with the text used when the caller
+# has nothing better for it
+SLOT_DEFAULTS: Dict[str, str] = {
+    # Articles
+    "TOPIC": "this topic",
+    "INDUSTRY": "tech",
+    "PROBLEM": "getting started",
+    "BENEFIT": "improved efficiency",
+    "KEY_POINT": "the core principles",
+    "MISTAKE": "skipping the fundamentals",
+    "CLAIM": "consistency beats intensity",
+    "REASON": "small improvements compound",
+    "DIFFERENTIATOR": "its practical focus",
+    "AUDIENCE": "developers and businesses",
+    "SUMMARY": "the fundamentals matter",
+    "RECOMMENDATION": "start small and iterate",
+    "ACTION": "staying informed and practicing regularly",
+    "SURPRISING_FACT": "most experts started as beginners",
+    "TIME_PERIOD": "years",
+    # Learned (generalized) sentences
+    "NUMBER": "several",
+    "TECHNOLOGY": "modern tools",
+    "URL": "",
+    # Proposals
+    "JOB_SPECIFIC_HOOK": "the requirements align perfectly with my expertise",
+    "YEARS": "3+",
+    "SKILLS": "software development",
+    "RECENT_PROJECT": "delivered a similar solution for a client",
+    "FIRST_STEP": "analyzing requirements",
+    "SECOND_STEP": "building a robust solution",
+    "SPECIFIC_REASON": "it matches my experience",
+    "GOAL": "your goals",
+    "EXPERIENCE": "years of hands-on development",
+    "EXAMPLE": "similar client projects",
+    "DETAILED_APPROACH": "clear milestones, regular updates and thorough testing",
+    "SPECIALTY": "software development",
+    "PROJECT_GOAL": "your project",
+    "TECH_STACK": "modern web technologies",
+    "ACHIEVEMENT": "ship reliable products",
+    "DELIVERABLE": "a working solution",
+    "TIMELINE": "the agreed timeline",
+    "PROCESS": "planning, building and testing",
+    # Emails
+    "NAME": "there",
+    "BUSINESS_TYPE": "company",
+    "OBSERVATION_ABOUT_COMPANY": "your impressive work",
+    "VALUE_PROPOSITION": "achieve your goals faster",
+    "SIMILAR_CLIENT": "a recent client",
+    "RESULT": "20% growth",
+    "NEW_VALUE_ADD": "I have new insights to share",
+}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class CompiledTemplate:
+    """Static segments and slot names of one template"""
+
+    __slots__ = ("source", "statics", "slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = SLOT.split(source)
+        # split() with one group alternates: static, slot, static, ..., static
+        self.statics: Tuple[str, ...] = tuple(parts[0::2])
+        self.slots: Tuple[str, ...] = tuple(parts[1::2])
+
+    def unknown_slots(self, known: Iterable[str] = SLOT_DEFAULTS) -> List[str]:
+        known = set(known)
+        return [slot for slot in dict.fromkeys(self.slots) if slot not in known]
+
+    def render(self, values: Mapping[str, str] = None,
+               defaults: Mapping[str, str] = SLOT_DEFAULTS) -> str:
+        """Fill every slot (values first, then defaults) in a single join"""
+        if not self.slots:
+            return self.source
+        values = values or {}
+        parts = [self.statics[0]]
+        for slot, static in zip(self.slots, self.statics[1:]):
+            value = values.get(slot)
+            if value is None:
+                value = defaults.get(slot, "")
+            parts.append(value)
+            parts.append(static)
+        return "".join(parts)
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    return CompiledTemplate(text or "")
+
+
+def validate_template(text: str, known: Iterable[str] = SLOT_DEFAULTS) -> CompiledTemplate:
+    """Compile text, raising TemplateError if it uses a slot nobody can fill"""
+    compiled = compile_template(text)
+    unknown = compiled.unknown_slots(known)
+    if unknown:
+        raise TemplateError(f"Unknown template slots {unknown} in: {text[:80]}")
+    return compiled
+
+
+class TemplateCache:
+    """Compiled templates keyed by stored pattern, e.g. ("sentence", 42)"""
+
+    def __init__(self, maxsize: int = 8192):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key: Hashable, text: str) -> CompiledTemplate:
+        compiled = self._cache.get(key)
+        if compiled is MISSING or compiled.source != text:
+            compiled = compile_template(text)
+            self._cache.set(key, compiled)
+        return compiled
+
+    def render(self, key: Hashable, text: str, values: Mapping[str, str] = None) -> str:
+        return self.get(key, text).render(values)
+
+    def invalidate(self, key: Hashable):
+        self._cache.invalidate(key)
+
+    def get_stats(self) -> Dict:
+        return self._cache.stats()
+
+
+# Global compiled template cache
+template_cache = TemplateCache()
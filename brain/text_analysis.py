@@ -0,0 +1,107 @@
+"""
+Jephthah Text Analysis
+One streaming tokenizer pass shared by every learner
+
+Text is split into sentences incrementally (a str or any iterable of chunks,
+e.g. an open file), each sentence is lowercased and tokenized once with
+precompiled patterns, and batches of analyzed sentences are handed to the
+knowledge graph, pattern memory and vocabulary learners in turn. Memory use
+is bounded by the batch size, not the document size.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Union
+
+
+SENTENCE_END = re.compile(r'[.!?]+(?=\s|$)')
+CAPITALIZED = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+IS_A = re.compile(r'(\w+)\s+(?:is|are)\s+(?:a|an|the)?\s*(\w+)')
+USED_FOR = re.compile(r'(\w+)\s+(?:is used for|used for|for)\s+(\w+)')
+WORD = re.compile(r'\b[a-z]{4,}\b')
+
+Source = Union[str, Iterable[str]]
+
+
+class AnalyzedSentence:
+    """A sentence with its tokens, computed once and shared by all learners"""
+
+    __slots__ = ("text", "lower", "entities", "words", "facts")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.entities = [w for w in dict.fromkeys(CAPITALIZED.findall(text)) if len(w) > 2]
+        self.words = WORD.findall(self.lower)
+
+        facts = []
+        for subject, obj in IS_A.findall(self.lower):
+            if len(subject) > 2 and len(obj) > 2:
+                facts.append((subject, "is_a", obj))
+        for subject, purpose in USED_FOR.findall(self.lower):
+            if len(subject) > 2 and len(purpose) > 2:
+                facts.append((subject, "used_for", purpose))
+        self.facts = facts
+
+
+def iter_sentences(source: Source, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Yield sentences from a string or a stream of text chunks. A run of text
+    longer than chunk_size without a sentence end is yielded in pieces.
+    """
+    chunks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size)) \
+        if isinstance(source, str) else source
+
+    tail = ""
+    for chunk in chunks:
+        buffer = tail + chunk
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            # A terminator at the very end may continue in the next chunk ("...")
+            if match.end() == len(buffer):
+                break
+            sentence = buffer[start:match.start()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        tail = buffer[start:]
+        if len(tail) > chunk_size:
+            # No sentence end in sight (a list, a table, minified text): emit
+            # up to the last whitespace so the tail stays bounded
+            cut = max(tail.rfind(" "), tail.rfind("\n"))
+            cut = cut if cut > 0 else len(tail)
+            sentence = tail[:cut].strip()
+            if sentence:
+                yield sentence
+            tail = tail[cut:]
+
+    tail = tail.strip().rstrip(".!?")
+    if tail:
+        yield tail
+
+
+def analyze(source: Source) -> Iterator[AnalyzedSentence]:
+    for sentence in iter_sentences(source):
+        yield AnalyzedSentence(sentence)
+
+
+def feed_learners(source: Source, learners: List, origin: str = "web",
+                  batch_sentences: int = 2000) -> int:
+    """
+    Tokenize source once and pass each batch of AnalyzedSentence objects to
+    every learner's learn_from_sentences(sentences, source). Returns the
+    number of sentences processed.
+    """
+    batch: List[AnalyzedSentence] = []
+    total = 0
+    for sentence in analyze(source):
+        batch.append(sentence)
+        if len(batch) >= batch_sentences:
+            for learner in learners:
+                learner.learn_from_sentences(batch, origin)
+            total += len(batch)
+            batch = []
+    if batch:
+        for learner in learners:
+            learner.learn_from_sentences(batch, origin)
+        total += len(batch)
+    return total
@@ -7,11 +7,183 @@ This allows Jephthah to:
 - Find synonyms for variety
 - Use industry-specific terms
 - Generate content without API
+
+Words and synonyms persist in SQLite with frequency counts. At startup the
+word lists are memory-mapped from a snapshot (rebuilt from the database when
+stale), and each category is a sorted array: O(1) random sampling, and
+lookups / prefix completion by binary search.
 """
 
+import heapq
 import random
-from typing import List, Dict, Set
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
 from pathlib import Path
+from typing import List, Dict, Set, Iterable, Tuple
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from loguru import logger
+
+from config.settings import DATA_DIR
+from brain.snapshot import SnapshotError, pack_strings, read_snapshot, unpack_strings, write_snapshot
+from brain.storage import create_sqlite_engine
+from brain.text_analysis import AnalyzedSentence, analyze
+
+Base = declarative_base()
+
+SNAPSHOT_VERSION = 1
+
+# Seeded into an empty database
+DEFAULT_WORDS: Dict[str, List[str]] = {
+    "tech": [
+        "algorithm", "api", "automation", "backend", "cloud", "data", "database",
+        "deployment", "development", "framework", "frontend", "infrastructure",
+        "integration", "microservices", "optimization", "scalability", "server",
+        "software", "stack", "system", "technology",
+    ],
+    "business": [
+        "client", "company", "customer", "deal", "enterprise", "growth", "market",
+        "opportunity", "partnership", "profit", "revenue", "roi", "sales", "service",
+        "solution", "strategy", "value", "venture",
+    ],
+    "action": [
+        "achieve", "build", "create", "deliver", "design", "develop", "execute",
+        "implement", "improve", "increase", "launch", "optimize", "scale", "solve",
+    ],
+    "quality": [
+        "advanced", "comprehensive", "efficient", "excellent", "innovative",
+        "powerful", "professional", "reliable", "robust", "scalable", "seamless",
+        "sophisticated", "strategic",
+    ],
+}
+
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "create": ["build", "develop", "design", "construct", "craft", "generate"],
+    "improve": ["enhance", "optimize", "refine", "upgrade", "boost", "elevate"],
+    "help": ["assist", "support", "aid", "enable", "facilitate"],
+    "fast": ["quick", "rapid", "swift", "speedy", "efficient"],
+    "good": ["excellent", "great", "outstanding", "superior", "quality"],
+    "important": ["critical", "essential", "vital", "crucial", "key"],
+    "new": ["modern", "latest", "cutting-edge", "innovative", "fresh"],
+    "use": ["utilize", "leverage", "employ", "apply", "implement"],
+    "make": ["create", "build", "develop", "generate", "produce"],
+    "work": ["function", "operate", "perform", "execute", "run"],
+}
+
+
+class Word(Base):
+    """A learned word and how often it has been seen, per category"""
+    __tablename__ = "words"
+    __table_args__ = (UniqueConstraint("word", "category", name="uq_words_word_category"),)
+
+    id = Column(Integer, primary_key=True)
+    word = Column(String(255), nullable=False)
+    category = Column(String(100), nullable=False, index=True)
+    frequency = Column(Integer, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Synonym(Base):
+    """word -> synonym, in insertion order"""
+    __tablename__ = "synonyms"
+    __table_args__ = (UniqueConstraint("word", "synonym", name="uq_synonyms_word_synonym"),)
+
+    id = Column(Integer, primary_key=True)
+    word = Column(String(255), nullable=False, index=True)
+    synonym = Column(String(255), nullable=False)
+
+
+_upsert = insert(Word.__table__)
+_UPSERT_WORD = _upsert.on_conflict_do_update(
+    index_elements=["word", "category"],
+    set_={"frequency": Word.__table__.c.frequency + _upsert.excluded.frequency},
+)
+
+
+class WordList:
+    """
+    One category's words: a sorted base (typically straight from the mapped
+    snapshot) with a parallel frequency array, plus a small sorted overlay of
+    words added since, merged into the base once it grows.
+    """
+
+    def __init__(self, words: List[str] = None, frequencies=None, merge_ratio: float = 0.1,
+                 min_merge: int = 1024):
+        self._words = words or []
+        self._freqs = frequencies if frequencies is not None else array("q", [1] * len(self._words))
+        self._new_words: List[str] = []
+        self._new_freqs: Dict[str, int] = {}
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+
+    def __len__(self) -> int:
+        return len(self._words) + len(self._new_words)
+
+    def _index(self, word: str) -> int:
+        i = bisect_left(self._words, word)
+        return i if i < len(self._words) and self._words[i] == word else -1
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._new_freqs or self._index(word) >= 0
+
+    def frequency(self, word: str) -> int:
+        if word in self._new_freqs:
+            return self._new_freqs[word]
+        i = self._index(word)
+        return self._freqs[i] if i >= 0 else 0
+
+    def add(self, word: str, count: int = 1) -> bool:
+        """Count an occurrence, returns True if the word is new"""
+        i = self._index(word)
+        if i >= 0:
+            self._freqs[i] += count
+            return False
+        if word in self._new_freqs:
+            self._new_freqs[word] += count
+            return False
+        insort(self._new_words, word)
+        self._new_freqs[word] = count
+        if len(self._new_words) > max(self.min_merge, self.merge_ratio * len(self._words)):
+            self._merge()
+        return True
+
+    def _merge(self):
+        words, freqs = self.export()
+        self._words, self._freqs = words, freqs
+        self._new_words, self._new_freqs = [], {}
+
+    def _at(self, index: int) -> str:
+        if index < len(self._words):
+            return self._words[index]
+        return self._new_words[index - len(self._words)]
+
+    def sample(self, k: int, rng: random.Random = random) -> List[str]:
+        """Up to k distinct words, uniformly, without copying the list"""
+        size = len(self)
+        return [self._at(i) for i in rng.sample(range(size), min(k, size))]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most frequent words starting with prefix, as (word, frequency)"""
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\U0010ffff", lo)
+        matches = [(self._words[i], self._freqs[i]) for i in range(lo, hi)]
+        lo = bisect_left(self._new_words, prefix)
+        hi = bisect_left(self._new_words, prefix + "\U0010ffff", lo)
+        matches.extend((word, self._new_freqs[word]) for word in self._new_words[lo:hi])
+        return heapq.nlargest(limit, matches, key=lambda item: item[1])
+
+    def export(self) -> Tuple[List[str], array]:
+        """Every word in sorted order with its frequency"""
+        if not self._new_words:
+            return list(self._words), array("q", self._freqs)
+        pairs = sorted(list(zip(self._words, self._freqs)) + list(self._new_freqs.items()))
+        return [word for word, _ in pairs], array("q", (freq for _, freq in pairs))
 
 
 class Vocabulary:
@@ -20,44 +192,27 @@ class Vocabulary:
     Grows over time as Jephthah reads and learns.
     """
     
-    def __init__(self):
-        # Core vocabulary by category
-        self.words: Dict[str, Set[str]] = {
-            "tech": set([
-                "algorithm", "api", "automation", "backend", "cloud", "data", "database",
-                "deployment", "development", "framework", "frontend", "infrastructure",
-                "integration", "microservices", "optimization", "scalability", "server",
-                "software", "stack", "system", "technology",
-            ]),
-            "business": set([
-                "client", "company", "customer", "deal", "enterprise", "growth", "market",
-                "opportunity", "partnership", "profit", "revenue", "roi", "sales", "service",
-                "solution", "strategy", "value", "venture",
-            ]),
-            "action": set([
-                "achieve", "build", "create", "deliver", "design", "develop", "execute",
-                "implement", "improve", "increase", "launch", "optimize", "scale", "solve",
-            ]),
-            "quality": set([
-                "advanced", "comprehensive", "efficient", "excellent", "innovative",
-                "powerful", "professional", "reliable", "robust", "scalable", "seamless",
-                "sophisticated", "strategic",
-            ]),
-        }
+    def __init__(self, db_path: Path = None, snapshot_path: Path = None):
+        db_path = db_path or DATA_DIR / "vocabulary.db"
+        self.db_path = db_path
+        self.snapshot_path = Path(snapshot_path or Path(db_path).with_suffix(".snap"))
+        self.engine = create_sqlite_engine(db_path)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self._lock = threading.Lock()
         
-        # Synonyms for variety
-        self.synonyms: Dict[str, List[str]] = {
-            "create": ["build", "develop", "design", "construct", "craft", "generate"],
-            "improve": ["enhance", "optimize", "refine", "upgrade", "boost", "elevate"],
-            "help": ["assist", "support", "aid", "enable", "facilitate"],
-            "fast": ["quick", "rapid", "swift", "speedy", "efficient"],
-            "good": ["excellent", "great", "outstanding", "superior", "quality"],
-            "important": ["critical", "essential", "vital", "crucial", "key"],
-            "new": ["modern", "latest", "cutting-edge", "innovative", "fresh"],
-            "use": ["utilize", "leverage", "employ", "apply", "implement"],
-            "make": ["create", "build", "develop", "generate", "produce"],
-            "work": ["function", "operate", "perform", "execute", "run"],
-        }
+        # Core vocabulary by category (persistent, see WordList)
+        self.words: Dict[str, WordList] = {}
+        self._snapshot_map = None
+        
+        # Synonyms for variety (persistent)
+        self.synonyms: Dict[str, List[str]] = {}
+        
+        self._seed_defaults()
+        self._load_synonyms()
+        if not (self.snapshot_path.exists() and self.load_snapshot(self.snapshot_path)):
+            self._load_words()
+            self.export_snapshot()
         
         # Professional phrases
         self.phrases: Dict[str, List[str]] = {
@@ -99,6 +254,107 @@ class Vocabulary:
                 "container", "orchestration", "monitoring", "logging",
             ]),
         }
+        
+        logger.info(f"Vocabulary initialized at {db_path}")
+    
+    # === PERSISTENCE ===
+    
+    def _seed_defaults(self):
+        """Fill an empty database with the built-in words and synonyms"""
+        session = self.Session()
+        try:
+            if session.query(Word.id).first() is None:
+                session.execute(insert(Word).values([
+                    {"word": word, "category": category, "frequency": 1, "created_at": datetime.utcnow()}
+                    for category, words in DEFAULT_WORDS.items() for word in words
+                ]).on_conflict_do_nothing())
+            if session.query(Synonym.id).first() is None:
+                session.execute(insert(Synonym).values([
+                    {"word": word, "synonym": synonym}
+                    for word, synonyms in DEFAULT_SYNONYMS.items() for synonym in synonyms
+                ]).on_conflict_do_nothing())
+            session.commit()
+        finally:
+            session.close()
+    
+    def _load_synonyms(self):
+        session = self.Session()
+        try:
+            for word, synonym in session.query(Synonym.word, Synonym.synonym).order_by(Synonym.id):
+                self.synonyms.setdefault(word, []).append(synonym)
+        finally:
+            session.close()
+    
+    def _load_words(self):
+        """Build the word lists from the database (already sorted by the query)"""
+        lists: Dict[str, Tuple[List[str], array]] = {}
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT category, word, frequency FROM words ORDER BY category, word"
+            )
+            for category, word, frequency in rows:
+                words, freqs = lists.setdefault(category, ([], array("q")))
+                words.append(word)
+                freqs.append(frequency or 0)
+        self.words = {category: WordList(words, freqs) for category, (words, freqs) in lists.items()}
+    
+    def _fingerprint(self) -> Dict:
+        with self.engine.connect() as conn:
+            count, max_id, total = conn.exec_driver_sql(
+                "SELECT count(*), max(id), total(frequency) FROM words"
+            ).one()
+        return {"words": count, "max_id": max_id or 0, "frequency": int(total)}
+    
+    def export_snapshot(self, path: Path = None) -> Path:
+        """Write every category's sorted words and frequencies to a mappable file"""
+        path = Path(path or self.snapshot_path)
+        with self._lock:
+            sections = {}
+            counts = {}
+            for category, word_list in self.words.items():
+                words, freqs = word_list.export()
+                sections[f"{category}.words"] = pack_strings(words)
+                sections[f"{category}.freq"] = freqs
+                counts[category] = len(words)
+            write_snapshot(path, SNAPSHOT_VERSION, {
+                "categories": counts,
+                "fingerprint": self._fingerprint(),
+            }, sections)
+        return path
+    
+    def load_snapshot(self, path: Path) -> bool:
+        """Adopt a snapshot's word lists if it matches the database, else False"""
+        try:
+            meta, sections, mapping = read_snapshot(path, SNAPSHOT_VERSION)
+        except (OSError, ValueError, SnapshotError) as e:
+            logger.warning(f"Ignoring vocabulary snapshot {path}: {e}")
+            return False
+        if meta["fingerprint"] != self._fingerprint():
+            logger.info(f"Vocabulary snapshot {path} is stale, loading from the database")
+            return False
+        
+        self.words = {
+            category: WordList(unpack_strings(sections[f"{category}.words"], count),
+                               sections[f"{category}.freq"])
+            for category, count in meta["categories"].items()
+        }
+        self._snapshot_map = mapping
+        return True
+    
+    def _save_words(self, counts: Dict[Tuple[str, str], int]):
+        """Upsert (word, category) -> occurrences with one executemany"""
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            conn.execute(_UPSERT_WORD, [
+                {"word": word, "category": category, "frequency": count, "created_at": now}
+                for (word, category), count in counts.items()
+            ])
+    
+    def close(self):
+        """Write a fresh snapshot so the next start maps it instead of querying"""
+        self.export_snapshot()
+    
+    # === LOOKUPS ===
     
     def get_synonym(self, word: str) -> str:
         """Get a random synonym for variety"""
@@ -109,10 +365,25 @@ class Vocabulary:
     def get_words(self, category: str, count: int = 5) -> List[str]:
         """Get random words from a category"""
         if category in self.words:
-            available = list(self.words[category])
-            return random.sample(available, min(count, len(available)))
+            return self.words[category].sample(count)
         return []
     
+    def lookup(self, word: str) -> Dict[str, int]:
+        """Frequency of a word in each category that has it"""
+        word = word.lower()
+        return {category: word_list.frequency(word)
+                for category, word_list in self.words.items() if word in word_list}
+    
+    def complete(self, prefix: str, category: str = None, limit: int = 10) -> List[str]:
+        """Autocomplete: the most frequent known words starting with prefix"""
+        prefix = prefix.lower()
+        lists = [self.words[category]] if category else list(self.words.values())
+        totals: Counter = Counter()
+        for word_list in lists:
+            for word, frequency in word_list.complete(prefix, limit):
+                totals[word] += frequency
+        return [word for word, _ in totals.most_common(limit)]
+    
     def get_transition(self) -> str:
         """Get a random transition phrase"""
         return random.choice(self.phrases["transition"])
@@ -123,11 +394,19 @@ class Vocabulary:
             return random.choice(self.phrases[phrase_type])
         return ""
     
+    # === LEARNING ===
+    
     def add_word(self, word: str, category: str):
         """Learn a new word"""
-        if category not in self.words:
-            self.words[category] = set()
-        self.words[category].add(word.lower())
+        self._add_counts({(word.lower(), category): 1})
+    
+    def _add_counts(self, counts: Dict[Tuple[str, str], int]):
+        with self._lock:
+            for (word, category), count in counts.items():
+                if category not in self.words:
+                    self.words[category] = WordList()
+                self.words[category].add(word, count)
+        self._save_words(counts)
     
     def add_synonym(self, word: str, synonym: str):
         """Learn a synonym relationship"""
@@ -136,6 +415,12 @@ class Vocabulary:
             self.synonyms[word] = []
         if synonym not in self.synonyms[word]:
             self.synonyms[word].append(synonym)
+            session = self.Session()
+            try:
+                session.execute(insert(Synonym).values(word=word, synonym=synonym).on_conflict_do_nothing())
+                session.commit()
+            finally:
+                session.close()
     
     def get_technical_terms(self, domain: str, count: int = 3) -> List[str]:
         """Get technical terms for a domain"""
@@ -146,16 +431,26 @@ class Vocabulary:
     
     def expand_vocabulary(self, text: str):
         """Learn words from text"""
-        import re
-        words = re.findall(r'\b[a-z]{4,}\b', text.lower())
-        for word in set(words):
+        self.learn_from_sentences(analyze(text))
+    
+    def learn_from_sentences(self, sentences: Iterable[AnalyzedSentence], source: str = "web"):
+        """Learner hook for text_analysis.feed_learners (one write per batch)"""
+        words = Counter()
+        for sentence in sentences:
+            words.update(sentence.words)
+        counts = {}
+        for word, count in words.items():
             # Categorize based on context (simple heuristic)
             if any(tech in word for tech in ['code', 'data', 'soft', 'tech']):
-                self.add_word(word, "tech")
+                category = "tech"
             elif any(biz in word for biz in ['business', 'market', 'sale', 'client']):
-                self.add_word(word, "business")
+                category = "business"
             else:
-                self.add_word(word, "general")
+                category = "general"
+            key = (word.lower(), category)
+            counts[key] = counts.get(key, 0) + count
+        if counts:
+            self._add_counts(counts)
     
     def get_stats(self) -> Dict:
         """Get vocabulary statistics"""
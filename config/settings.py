@@ -108,6 +108,8 @@ class InfraConfig(BaseModel):
     github_username: str = os.getenv("GITHUB_USERNAME", "kingtechies")
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     database_url: str = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR}/memory.db")
+    memory_write_behind: bool = os.getenv("MEMORY_WRITE_BEHIND", "false").lower() == "true"
+    memory_flush_ms: int = int(os.getenv("MEMORY_FLUSH_MS", "500"))
 
 
 class JephthahConfig:
@@ -10,6 +10,8 @@ logger.add("data/logs/jephthah_{time}.log", rotation="1 day", retention="30 days
 
 from config.settings import config
 from brain.memory import memory
+from brain.compaction import memory_compactor
+from brain.centrality import centrality_job
 from brain.infinite import infinite_brain
 from brain.consciousness import consciousness
 from brain.content import content_creator
@@ -58,6 +60,8 @@ class Jephthah:
         consciousness.set_focus("awakening", "become the ultimate human")
         smart.init()
         opus.init()
+        if config.infra.memory_write_behind:
+            memory.enable_write_behind(flush_interval_ms=config.infra.memory_flush_ms)
         logger.info("JEPHTHAH - TRUE HUMAN - INITIALIZED - OPUS ENABLED")
     
     async def wake_up(self):
@@ -88,6 +92,8 @@ class Jephthah:
         asyncio.create_task(self._job_email_outreach())        # Scrape job company emails & email them
         asyncio.create_task(self._check_emails())              # Monitor inbox for replies
         asyncio.create_task(self._send_daily_stats())          # Report to Telegram
+        asyncio.create_task(memory_compactor.run_forever())     # Keep memory.db compact
+        asyncio.create_task(centrality_job.run_forever())       # PageRank -> entity importance
         
         # === DISABLED - Social posting not working ===
         # asyncio.create_task(self._post_forever())
@@ -98,6 +104,10 @@ class Jephthah:
     
     async def shutdown(self):
         self.running = False
+        memory.close()  # flush queued memory writes first
+        knowledge_graph.export_snapshot()  # fast cold start next time (flushes access counts)
+        pattern_memory.close()  # flush pattern usage / outcome counts
+        vocabulary.close()  # snapshot word lists for a mapped start
         await perception.stop_watching()
         await browser.close()
         await bestie.stop()
@@ -155,8 +165,7 @@ class Jephthah:
                 news_items = await news_follower.check_news()
                 for item in news_items[:2]:
                     if item.get("description"):
-                        knowledge_graph.learn_from_text(item["description"], source="news")
-                        pattern_memory.learn_from_article(item["description"], source="news")
+                        content_engine.learn_from_text(item["description"], source="news")
                 
             except Exception as e:
                 await self._handle_error(str(e))